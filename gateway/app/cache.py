@@ -0,0 +1,179 @@
+"""Кэш ответов сервисов в памяти шлюза."""
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import Response
+
+
+@dataclass
+class CachedResponse:
+    """Полностью прочитанный ответ сервиса.
+
+    Args:
+        status_code: Код статуса ответа
+        headers: Заголовки ответа
+        body: Тело ответа
+        expires_at: Момент устаревания записи по time.monotonic()
+    """
+
+    status_code: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    expires_at: float = field(default=0.0, compare=False)
+
+    @property
+    def size(self) -> int:
+        """Примерный размер записи в байтах."""
+        return len(self.body) + sum(len(key) + len(value) for key, value in self.headers)
+
+    @property
+    def etag(self) -> str | None:
+        """ETag ответа, если сервис его вернул."""
+        return next((value for key, value in self.headers if key.lower() == "etag"), None)
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """Совпадает ли ETag ответа с одним из значений заголовка If-None-Match."""
+        if self.etag is None or if_none_match is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return self.etag.removeprefix("W/") in (
+            value.strip().removeprefix("W/") for value in if_none_match.split(",")
+        )
+
+    def to_response(self, extra_headers: dict[str, str] | None = None) -> Response:
+        """Ответ клиенту с исходными кодом статуса и заголовками."""
+        response = Response(self.body, status_code=self.status_code)
+        headers = [*self.headers, *(extra_headers or {}).items()]
+        response.raw_headers = [
+            (key.encode("latin-1"), value.encode("latin-1")) for key, value in headers
+        ]
+        return response
+
+
+def route_pattern(route: str) -> re.Pattern:
+    """Регулярное выражение для шаблона маршрута.
+
+    Шаблоны задаются в виде "/products/{id}", где {...} совпадает
+    с одним сегментом пути.
+    """
+    return re.compile("^" + re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(route)) + "/?$")
+
+
+class RouteTTLs:
+    """Время жизни записей кэша по шаблонам маршрутов (см. route_pattern)."""
+
+    def __init__(self, ttls: dict[str, float]):
+        self._rules = [(route_pattern(route), ttl) for route, ttl in ttls.items()]
+
+    def get(self, path: str) -> float | None:
+        """TTL для пути или None, если путь не кэшируется."""
+        for pattern, ttl in self._rules:
+            if pattern.match(path):
+                return ttl
+        return None
+
+
+class ResponseCache:
+    """LRU-кэш ответов, ограниченный числом записей и суммарным размером.
+
+    Записи устаревают по TTL. Счетчик поколений защищает от записи в кэш
+    ответа, запрос за которым начался до инвалидации.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self._entries: OrderedDict[tuple[str, str, str], CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(method: str, path: str, query: str) -> tuple[str, str, str]:
+        """Ключ записи; параметры запроса сортируются, чтобы порядок не влиял."""
+        params = sorted(parse_qsl(query, keep_blank_values=True))
+        return method.upper(), path.rstrip("/") or "/", urlencode(params)
+
+    def get(self, key: tuple[str, str, str]) -> CachedResponse | None:
+        """Запись по ключу, если она есть и не устарела."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: tuple[str, str, str], entry: CachedResponse, ttl: float,
+            generation: int | None = None) -> None:
+        """Сохранение записи с вытеснением давно не использованных.
+
+        Args:
+            key: Ключ записи
+            entry: Ответ сервиса
+            ttl: Время жизни записи в секундах
+            generation: Поколение кэша на момент начала запроса к сервису;
+                если с тех пор была инвалидация, ответ не сохраняется
+        """
+        if generation is not None and generation != self.generation:
+            return
+        if ttl <= 0 or entry.size > self.max_bytes:
+            return
+
+        self._remove(key)
+        entry.expires_at = time.monotonic() + ttl
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, prefix: str) -> None:
+        """Удаление всех записей, путь которых равен prefix или вложен в него."""
+        prefix = prefix.rstrip("/")
+        for key in [key for key in self._entries
+                    if key[1] == prefix or key[1].startswith(prefix + "/")]:
+            self._remove(key)
+        self.generation += 1
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        """Полная очистка кэша."""
+        self._entries.clear()
+        self._bytes = 0
+        self.generation += 1
+
+    def stats(self) -> dict:
+        """Счетчики и заполненность кэша для мониторинга."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: tuple[str, str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
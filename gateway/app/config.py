@@ -5,7 +5,71 @@ class Settings(BaseSettings):
     product_service_url: str = "http://host.docker.internal:8003"
     order_service_url: str = "http://host.docker.internal:8002"
     timeout: int = 30
-    
+
+    # Пул соединений к сервисам (один клиент на сервис на всё время жизни приложения)
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    # HTTP/2 требует установленного пакета h2 (httpx[http2])
+    http2: bool = False
+
+    # Таймауты по умолчанию; таймаут чтения берется из timeout
+    connect_timeout: float = 5.0
+    pool_timeout: float = 5.0
+    # Переопределение таймаутов для отдельных сервисов, например:
+    # UPSTREAM_TIMEOUTS='{"orders": {"connect": 2, "read": 10, "pool": 1}}'
+    upstream_timeouts: dict[str, dict[str, float]] = {}
+
+    # Потоковая передача тел запросов и ответов без разбора JSON;
+    # False возвращает прежний режим с декодированием и перекодированием JSON
+    stream_proxy: bool = True
+
+    # Кэш ответов в памяти шлюза: LRU с ограничением по числу записей и байтам.
+    # TTL в секундах задается по шаблонам маршрутов; запись в сервис
+    # (POST/PUT/PATCH/DELETE) сбрасывает кэш всего ресурса
+    cache_enabled: bool = True
+    cache_max_entries: int = 1024
+    cache_max_bytes: int = 16 * 1024 * 1024
+    cache_ttls: dict[str, float] = {"/products": 30.0, "/products/{id}": 60.0}
+
+    # Одинаковые одновременные GET-запросы выполняются одним запросом к сервису.
+    # Такие ответы читаются в память целиком, чтобы раздать их всем ожидающим,
+    # поэтому объединяются только промахи кэша (маршруты из cache_ttls)
+    # и маршруты из coalesce_routes; остальные GET передаются потоком
+    coalesce_requests: bool = True
+    coalesce_routes: list[str] = []
+
+    # Маршруты больших выгрузок: всегда передаются потоком, без кэша
+    # и объединения запросов, чтобы ответ не читался в память шлюза
+    stream_routes: list[str] = ["/orders/export"]
+
+    # Bulkhead: не более N одновременных запросов к каждому сервису;
+    # если слот не освободился за bulkhead_timeout секунд, ответ 503
+    bulkhead_max_concurrent: int = 50
+    bulkhead_timeout: float = 1.0
+
+    # Circuit breaker: размыкается после N ошибок подряд (5xx, сетевые ошибки,
+    # ответы медленнее порога в секундах) и через breaker_open_timeout
+    # пропускает пробные запросы
+    breaker_failure_threshold: int = 5
+    breaker_slow_call_threshold: float = 5.0
+    breaker_open_timeout: float = 30.0
+    breaker_half_open_max_calls: int = 1
+
+    # Повторы идемпотентных запросов при ошибках соединения и ответах 502/503/504.
+    # Бюджет: не более retry_budget_ratio повторов на запрос
+    # плюс retry_budget_min_per_second повторов в секунду
+    max_retries: int = 2
+    retry_backoff: float = 0.05
+    retry_budget_ratio: float = 0.2
+    retry_budget_min_per_second: float = 1.0
+
+    # Композиция заказов с пользователями и услугами (/orders/enriched):
+    # записи загружаются пакетами по compose_batch_size id (GET /users?ids=...),
+    # не более compose_concurrency одновременных запросов к каждому сервису
+    compose_concurrency: int = 10
+    compose_batch_size: int = 100
+
     model_config = {"env_file": ".env"}
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,17 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers.proxy import router
+from app.routers.compose import router as compose_router
+from app.routers.proxy import router, proxies, response_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Открытие пулов соединений к сервисам при старте и закрытие при остановке."""
+    for proxy in proxies:
+        await proxy.start()
+    yield
+    for proxy in proxies:
+        await proxy.close()
 
-app = FastAPI(title="API Gateway")
+app = FastAPI(title="API Gateway", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Маршруты композиции подключаются раньше прокси, чтобы не попасть под /orders{path}
+app.include_router(compose_router)
 app.include_router(router)
 
 @app.get("/")
@@ -20,4 +36,17 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    degraded = any(proxy.breaker.state != proxy.breaker.CLOSED for proxy in proxies)
+    return {
+        "status": "degraded" if degraded else "ok",
+        "upstreams": {
+            proxy.name: {
+                "breaker": proxy.breaker.stats(),
+                "bulkhead": proxy.bulkhead.stats(),
+                "retry_budget": proxy.retry_budget.stats(),
+                "pool": proxy.pool_stats(),
+                "coalescing": proxy.flights.stats(),
+            } for proxy in proxies
+        },
+        "cache": response_cache.stats() if response_cache is not None else None,
+    }
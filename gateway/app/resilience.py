@@ -0,0 +1,176 @@
+"""Изоляция сервисов друг от друга: bulkhead, circuit breaker и бюджет повторов."""
+import asyncio
+import time
+
+
+class CircuitOpenError(Exception):
+    """Запрос отклонен, так как circuit breaker разомкнут."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"circuit is open, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class BulkheadFullError(Exception):
+    """Запрос отклонен, так как все слоты bulkhead заняты."""
+
+
+class CircuitBreaker:
+    """Circuit breaker для одного сервиса.
+
+    В состоянии closed считает ошибки подряд: ответы 5xx, сетевые ошибки
+    и ответы медленнее порога. После failure_threshold ошибок размыкается
+    (open) и сразу отклоняет запросы. Через open_timeout переходит
+    в half_open и пропускает не более half_open_max_calls пробных запросов:
+    успешная проба замыкает его, ошибка снова размыкает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        slow_call_threshold: float = 5.0,
+        open_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.open_timeout = open_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probes = 0
+
+    def before_call(self) -> None:
+        """Проверка перед запросом; бросает CircuitOpenError, если запрос нельзя выполнять."""
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.open_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(self.open_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            self._probes = 0
+
+        if self.state == self.HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(0.0)
+            self._probes += 1
+
+    def record(self, ok: bool, duration: float) -> None:
+        """Учет результата запроса, разрешенного before_call."""
+        if ok and duration < self.slow_call_threshold:
+            self._on_success()
+        else:
+            self._on_failure()
+
+    def abandon(self) -> None:
+        """Учет запроса, отмененного до получения результата."""
+        if self.state == self.HALF_OPEN:
+            self._probes = max(self._probes - 1, 0)
+
+    def stats(self) -> dict:
+        """Состояние для мониторинга."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+    def _on_success(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self._probes = max(self._probes - 1, 0)
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def _on_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probes = 0
+
+
+class Bulkhead:
+    """Ограничение числа одновременных запросов к одному сервису.
+
+    Если слот не освободился за acquire_timeout, запрос отклоняется
+    с BulkheadFullError, а не ждет в очереди вместе с остальными.
+    """
+
+    def __init__(self, max_concurrent: int, acquire_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.acquire_timeout = acquire_timeout
+        self.in_use = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def acquire(self) -> None:
+        """Занятие слота; бросает BulkheadFullError, если слот не освободился вовремя."""
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise BulkheadFullError(f"all {self.max_concurrent} slots are busy")
+        self.in_use += 1
+
+    def release(self) -> None:
+        """Освобождение слота."""
+        self.in_use -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        """Занятость для мониторинга."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_use": self.in_use,
+            "rejected": self.rejected,
+        }
+
+
+class RetryBudget:
+    """Бюджет повторов запросов.
+
+    Каждый запрос добавляет ratio токена, каждый повтор тратит один токен.
+    Дополнительно бюджет пополняется на min_per_second токенов в секунду,
+    чтобы при малой нагрузке повторы тоже были возможны. Так повторы
+    не умножают нагрузку на сервис, который и так не справляется.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.exhausted = 0
+        self._tokens = max_tokens
+        self._updated_at = time.monotonic()
+
+    def deposit(self) -> None:
+        """Учет нового запроса."""
+        self._refill()
+        self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        """Списание токена на повтор; False, если бюджет исчерпан."""
+        self._refill()
+        if self._tokens < 1:
+            self.exhausted += 1
+            return False
+        self._tokens -= 1
+        return True
+
+    def stats(self) -> dict:
+        """Остаток бюджета для мониторинга."""
+        self._refill()
+        return {"tokens": round(self._tokens, 2), "exhausted": self.exhausted}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._updated_at) * self.min_per_second,
+                           self.max_tokens)
+        self._updated_at = now
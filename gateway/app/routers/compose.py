@@ -0,0 +1,59 @@
+import asyncio
+
+from fastapi import APIRouter, Request, Response, HTTPException, status
+
+from app.config import settings
+from app.routers.proxy import ServiceProxy, order_proxy, product_proxy, user_proxy
+
+router = APIRouter()
+
+
+async def _fetch_many(proxy: ServiceProxy, resource: str, ids: list[int]) -> dict[int, dict | None]:
+    """Загрузка записей сервиса по id пакетными запросами GET resource?ids=...
+
+    Пакеты не больше compose_batch_size id запрашиваются параллельно
+    с ограничением конкурентности. Отсутствующие записи возвращаются как None.
+    """
+    semaphore = asyncio.Semaphore(settings.compose_concurrency)
+
+    async def fetch_batch(batch: list[int]) -> list[dict]:
+        async with semaphore:
+            response = await proxy.get_json(resource, params={"ids": ",".join(map(str, batch))})
+        if response.status_code >= 400:
+            raise HTTPException(status.HTTP_502_BAD_GATEWAY, f"{proxy.name} lookup failed")
+        return response.json()["items"]
+
+    size = settings.compose_batch_size
+    batches = await asyncio.gather(*(fetch_batch(ids[i:i + size]) for i in range(0, len(ids), size)))
+    found = {record["id_"]: record for batch in batches for record in batch}
+    return {id_: found.get(id_) for id_ in ids}
+
+
+@router.get("/orders/enriched", tags=["orders"])
+async def enriched_orders(request: Request, response: Response) -> list[dict]:
+    """Заказы вместе с данными пользователей и услуг одним запросом.
+
+    Параметры запроса (фильтры и курсор) передаются в GET /orders
+    сервиса заказов, курсор следующей страницы возвращается в X-Next-Cursor.
+    Пользователи и услуги загружаются пакетными запросами по уникальным id,
+    вместо отдельного запроса клиента на каждую строку.
+    """
+    orders_response = await order_proxy.get_json("/orders", params=request.query_params)
+    if orders_response.status_code != status.HTTP_200_OK:
+        raise HTTPException(orders_response.status_code, orders_response.text)
+    orders = orders_response.json()
+    if "x-next-cursor" in orders_response.headers:
+        response.headers["X-Next-Cursor"] = orders_response.headers["x-next-cursor"]
+
+    users, products = await asyncio.gather(
+        _fetch_many(user_proxy, "/users", sorted({order["user_id"] for order in orders})),
+        _fetch_many(product_proxy, "/products", sorted({order["product_id"] for order in orders})),
+    )
+
+    return [
+        {
+            **order,
+            "user": users.get(order["user_id"]),
+            "product": products.get(order["product_id"]),
+        } for order in orders
+    ]
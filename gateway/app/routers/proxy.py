@@ -1,60 +1,430 @@
-from fastapi import APIRouter, Request, HTTPException
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, Request, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
 import httpx
 
+from app.cache import CachedResponse, ResponseCache, RouteTTLs, route_pattern
 from app.config import settings
+from app.resilience import Bulkhead, BulkheadFullError, CircuitBreaker, \
+    CircuitOpenError, RetryBudget
+from app.singleflight import SingleFlight
 
 router = APIRouter()
 
+# Заголовки уровня соединения, которые не передаются через прокси
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade", "host",
+})
+
+# Методы, не изменяющие данные сервиса
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Методы, повтор которых не меняет результат
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Ошибки, при которых запрос заведомо не был обработан сервисом
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+RETRYABLE_STATUSES = frozenset({502, 503, 504})
+
+# Заголовки, от которых зависит ответ сервиса при объединении запросов
+COALESCE_KEY_HEADERS = ("authorization", "cookie", "accept", "if-none-match")
+
+
+def _end_to_end_headers(items) -> list[tuple[str, str]]:
+    """Заголовки без hop-by-hop, с сохранением повторяющихся значений."""
+    return [(key, value) for key, value in items
+            if key.lower() not in HOP_BY_HOP_HEADERS]
+
+
+def _has_body(request: Request | httpx.Request) -> bool:
+    """Есть ли у запроса тело."""
+    length = request.headers.get("content-length")
+    return (length is not None and length != "0") \
+        or "transfer-encoding" in request.headers
+
+
+async def _iter_upstream(response: httpx.Response):
+    """Передача байтов ответа сервиса как есть с закрытием соединения в конце."""
+    try:
+        async for chunk in response.aiter_raw():
+            yield chunk
+    finally:
+        await response.aclose()
+
 class ServiceProxy:
-    def __init__(self, base_url: str):
+    """Прокси к одному сервису.
+
+    Держит долгоживущий httpx.AsyncClient с пулом keep-alive соединений,
+    чтобы не открывать новое TCP-соединение на каждый запрос.
+    Клиент создается при старте приложения и закрывается при остановке.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        cache: ResponseCache | None = None,
+        cache_ttls: RouteTTLs | None = None,
+    ):
+        self.name = name
         self.base_url = base_url.rstrip("/")
-    
+        self.cache = cache
+        self.cache_ttls = cache_ttls or RouteTTLs({})
+        self.flights = SingleFlight()
+        self.bulkhead = Bulkhead(settings.bulkhead_max_concurrent, settings.bulkhead_timeout)
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.breaker_failure_threshold,
+            slow_call_threshold=settings.breaker_slow_call_threshold,
+            open_timeout=settings.breaker_open_timeout,
+            half_open_max_calls=settings.breaker_half_open_max_calls,
+        )
+        self.retry_budget = RetryBudget(
+            ratio=settings.retry_budget_ratio,
+            min_per_second=settings.retry_budget_min_per_second,
+        )
+        self.stream_routes = [route_pattern(route) for route in settings.stream_routes]
+        self.coalesce_routes = [route_pattern(route) for route in settings.coalesce_routes]
+        self._client: httpx.AsyncClient | None = None
+
+    def _timeout(self) -> httpx.Timeout:
+        """Таймауты с учетом переопределений для сервиса из настроек."""
+        overrides = settings.upstream_timeouts.get(self.name, {})
+        read = overrides.get("read", settings.timeout)
+        return httpx.Timeout(
+            connect=overrides.get("connect", settings.connect_timeout),
+            read=read,
+            write=overrides.get("write", read),
+            pool=overrides.get("pool", settings.pool_timeout),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Клиент сервиса; создается при первом обращении, если еще не запущен."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=settings.http2,
+                timeout=self._timeout(),
+                limits=httpx.Limits(
+                    max_connections=settings.max_connections,
+                    max_keepalive_connections=settings.max_keepalive_connections,
+                    keepalive_expiry=settings.keepalive_expiry,
+                ),
+            )
+        return self._client
+
+    async def start(self) -> None:
+        """Создание клиента при старте приложения."""
+        self.client
+
+    async def close(self) -> None:
+        """Закрытие клиента и всех соединений пула."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def pool_stats(self) -> dict:
+        """Занятость пула соединений для мониторинга."""
+        stats = {
+            "max_connections": settings.max_connections,
+            "max_keepalive_connections": settings.max_keepalive_connections,
+            "connections": 0,
+            "active": 0,
+            "idle": 0,
+            "queued": 0,
+        }
+        if self._client is None or self._client.is_closed:
+            return stats
+
+        pool = getattr(self._client._transport, "_pool", None)
+        if pool is None:
+            return stats
+
+        connections = list(pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+        stats.update(
+            connections=len(connections),
+            active=len(connections) - idle,
+            idle=idle,
+            queued=sum(1 for request in getattr(pool, "_requests", ())
+                       if request.is_queued()),
+        )
+        return stats
+
+    async def forward(self, path: str, request: Request):
+        """Проксирование запроса в режиме, выбранном в настройках.
+
+        GET-запросы к маршрутам с TTL обслуживаются из кэша, одинаковые
+        одновременные GET-запросы к ним и к маршрутам из coalesce_routes
+        объединяются в один запрос к сервису, а любой изменяющий запрос
+        сбрасывает кэш всего ресурса. Остальные запросы, в том числе
+        маршруты выгрузок из stream_routes, передаются потоком.
+        """
+        if request.method in SAFE_METHODS and self._is_stream_route(path):
+            return await self.stream(request.method, path, request)
+
+        ttl = self._cache_ttl(path, request)
+        if ttl is not None:
+            return await self._cached(path, request, ttl)
+
+        if self._is_coalesce_route(path) and self._can_coalesce(request):
+            entry = await self._coalesced_fetch(path, request)
+            return entry.to_response()
+
+        try:
+            if settings.stream_proxy:
+                return await self.stream(request.method, path, request)
+            return await self.proxy(request.method, path, request)
+        finally:
+            if self.cache is not None and request.method not in SAFE_METHODS:
+                self.cache.invalidate("/" + path.lstrip("/").split("/")[0])
+
+    def _build_request(self, method: str, path: str, request: Request,
+                       override_headers: dict[str, str] | None = None) -> httpx.Request:
+        """Запрос к сервису с телом и заголовками входящего запроса.
+
+        Заголовки из override_headers заменяют одноименные заголовки запроса.
+        """
+        override_headers = override_headers or {}
+        replaced = {key.lower() for key in override_headers}
+        return self.client.build_request(
+            method,
+            httpx.URL(f"/{path.lstrip('/')}", query=request.url.query.encode()),
+            headers=[*((key, value) for key, value in _end_to_end_headers(request.headers.items())
+                       if key.lower() not in replaced),
+                     *override_headers.items()],
+            content=request.stream() if _has_body(request) else None,
+        )
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Слот bulkhead сервиса; если свободных слотов нет, отвечает 503."""
+        try:
+            await self.bulkhead.acquire()
+        except BulkheadFullError:
+            raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE,
+                                f"{self.name} service is overloaded")
+        try:
+            yield
+        finally:
+            self.bulkhead.release()
+
+    def _may_retry(self, upstream_request: httpx.Request, attempt: int) -> bool:
+        """Можно ли повторить запрос: идемпотентный метод без тела и есть бюджет."""
+        return upstream_request.method in IDEMPOTENT_METHODS \
+            and not _has_body(upstream_request) \
+            and attempt < settings.max_retries and self.retry_budget.withdraw()
+
+    async def _send(self, upstream_request: httpx.Request) -> httpx.Response:
+        """Отправка запроса в сервис через circuit breaker с повторами.
+
+        Тело ответа остается непрочитанным. Повторяются только запросы
+        идемпотентными методами без тела при ошибке соединения или ответе
+        502/503/504, пока позволяет бюджет повторов.
+        """
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as exc:
+                raise HTTPException(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    f"{self.name} service unavailable",
+                    headers={"Retry-After": str(math.ceil(exc.retry_after))},
+                )
+
+            started = time.monotonic()
+            try:
+                response = await self.client.send(upstream_request, stream=True)
+            except httpx.TransportError as exc:
+                self.breaker.record(False, time.monotonic() - started)
+                if isinstance(exc, RETRYABLE_ERRORS) and self._may_retry(upstream_request, attempt):
+                    await asyncio.sleep(settings.retry_backoff * 2 ** attempt)
+                    attempt += 1
+                    continue
+                if isinstance(exc, httpx.TimeoutException):
+                    raise HTTPException(status.HTTP_504_GATEWAY_TIMEOUT, f"{self.name} service timeout")
+                raise HTTPException(status.HTTP_502_BAD_GATEWAY, f"{self.name} service unavailable")
+            except BaseException:
+                self.breaker.abandon()
+                raise
+
+            self.breaker.record(response.status_code < 500, time.monotonic() - started)
+            if response.status_code in RETRYABLE_STATUSES and self._may_retry(upstream_request, attempt):
+                await response.aclose()
+                await asyncio.sleep(settings.retry_backoff * 2 ** attempt)
+                attempt += 1
+                continue
+            return response
+
+    async def stream(self, method: str, path: str, request: Request) -> StreamingResponse:
+        """Потоковое проксирование без разбора тел запроса и ответа.
+
+        Тело запроса передается в сервис по мере чтения, ответ сервиса
+        отдается клиенту байтами как есть вместе с кодом статуса и заголовками,
+        поэтому потребление памяти не зависит от размера данных.
+        Слот bulkhead занят до получения заголовков ответа.
+        """
+        async with self._slot():
+            upstream = await self._send(self._build_request(method, path, request))
+
+        response = StreamingResponse(_iter_upstream(upstream), status_code=upstream.status_code)
+        response.raw_headers = [
+            (key.encode("latin-1"), value.encode("latin-1"))
+            for key, value in _end_to_end_headers(upstream.headers.multi_items())
+        ]
+        return response
+
+    async def fetch(self, method: str, path: str, request: Request) -> CachedResponse:
+        """Запрос к сервису с полным чтением ответа в память.
+
+        Ответ запрашивается без сжатия (Accept-Encoding: identity), чтобы
+        его можно было отдать любому клиенту независимо от Accept-Encoding.
+        Заголовок задается явно: без него httpx запросил бы gzip и deflate.
+        """
+        upstream_request = self._build_request(
+            method, path, request, override_headers={"Accept-Encoding": "identity"},
+        )
+        async with self._slot():
+            upstream = await self._send(upstream_request)
+            try:
+                body = b"".join([chunk async for chunk in upstream.aiter_raw()])
+            finally:
+                await upstream.aclose()
+
+        return CachedResponse(
+            status_code=upstream.status_code,
+            headers=_end_to_end_headers(upstream.headers.multi_items()),
+            body=body,
+        )
+
+    async def get_json(self, path: str, params=None) -> httpx.Response:
+        """GET-запрос к сервису с полностью прочитанным ответом.
+
+        Используется шлюзом для композиции ответов из нескольких сервисов;
+        одинаковые одновременные запросы объединяются.
+        """
+        upstream_request = self.client.build_request("GET", path, params=params)
+
+        async def send() -> httpx.Response:
+            async with self._slot():
+                response = await self._send(upstream_request)
+                await response.aread()
+            return response
+
+        key = ResponseCache.make_key("GET", path, str(upstream_request.url.query, "ascii"))
+        return await self.flights.do(key, send)
+
+    def _cache_ttl(self, path: str, request: Request) -> float | None:
+        """TTL кэша для запроса или None, если запрос не кэшируется."""
+        if self.cache is None or request.method != "GET" \
+                or "authorization" in request.headers:
+            return None
+        return self.cache_ttls.get(path)
+
+    def _is_stream_route(self, path: str) -> bool:
+        """Передается ли ответ маршрута только потоком."""
+        return any(pattern.match(path) for pattern in self.stream_routes)
+
+    def _is_coalesce_route(self, path: str) -> bool:
+        """Объединяются ли запросы к маршруту без кэша (см. coalesce_routes)."""
+        return any(pattern.match(path) for pattern in self.coalesce_routes)
+
+    def _can_coalesce(self, request: Request) -> bool:
+        """Можно ли объединить запрос с такими же одновременными запросами."""
+        return settings.coalesce_requests and request.method == "GET" \
+            and not _has_body(request)
+
+    async def _coalesced_fetch(self, path: str, request: Request) -> CachedResponse:
+        """Чтение ответа через один общий запрос для одинаковых одновременных запросов."""
+        if not self._can_coalesce(request):
+            return await self.fetch(request.method, path, request)
+
+        key = (
+            ResponseCache.make_key(request.method, path, request.url.query),
+            tuple(request.headers.get(header) for header in COALESCE_KEY_HEADERS),
+        )
+        return await self.flights.do(key, lambda: self.fetch(request.method, path, request))
+
+    async def _cached(self, path: str, request: Request, ttl: float) -> Response:
+        """Ответ из кэша или из сервиса с сохранением успешного ответа.
+
+        Если ETag ответа в кэше совпадает с If-None-Match, отвечает 304 без тела.
+        """
+        key = self.cache.make_key(request.method, path, request.url.query)
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry.matches(request.headers.get("if-none-match")):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                                headers={"ETag": entry.etag, "x-cache": "HIT"})
+            return entry.to_response({"x-cache": "HIT"})
+
+        generation = self.cache.generation
+        entry = await self._coalesced_fetch(path, request)
+        if entry.status_code == status.HTTP_200_OK:
+            self.cache.set(key, entry, ttl, generation)
+        return entry.to_response({"x-cache": "MISS"})
+
     async def proxy(self, method: str, path: str, request: Request):
         # Удаляем начальный слеш из path, так как он уже есть в base_url
         clean_path = path.lstrip('/')
-        url = f"{self.base_url}/{clean_path}"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method, url,
-                params=request.query_params,
-                json=await request.json() if request.method in ("POST", "PUT", "PATCH") else None,
-                headers={key: value for key, value in request.headers.items() 
-                        if key.lower() not in ["host", "content-length"]}
-            )
-            
-            # Для DELETE запросов возвращаем None при успешном выполнении
-            if response.status_code == 204:  # No Content
-                return None
-                
-            if response.status_code >= 400:
-                raise HTTPException(response.status_code, response.text)
-            
-            # Пытаемся распарсить JSON, но если не получается, возвращаем текст
-            try:
-                return response.json()
-            except Exception:
-                return {"message": response.text, "status": response.status_code}
+
+        upstream_request = self.client.build_request(
+            method, f"/{clean_path}",
+            params=request.query_params,
+            json=await request.json() if request.method in ("POST", "PUT", "PATCH") else None,
+            headers={key: value for key, value in request.headers.items()
+                    if key.lower() not in ["host", "content-length"]}
+        )
+        async with self._slot():
+            response = await self._send(upstream_request)
+            await response.aread()
+
+        # Для DELETE запросов возвращаем None при успешном выполнении
+        if response.status_code == 204:  # No Content
+            return None
+
+        if response.status_code >= 400:
+            raise HTTPException(response.status_code, response.text)
+
+        # Пытаемся распарсить JSON, но если не получается, возвращаем текст
+        try:
+            return response.json()
+        except Exception:
+            return {"message": response.text, "status": response.status_code}
+
+# Общий кэш ответов
+response_cache = ResponseCache(settings.cache_max_entries, settings.cache_max_bytes) \
+    if settings.cache_enabled else None
+cache_ttls = RouteTTLs(settings.cache_ttls)
 
 # Прокси
-user_proxy = ServiceProxy(settings.user_service_url)
-product_proxy = ServiceProxy(settings.product_service_url)
-order_proxy = ServiceProxy(settings.order_service_url)
+user_proxy = ServiceProxy("users", settings.user_service_url, response_cache, cache_ttls)
+product_proxy = ServiceProxy("products", settings.product_service_url, response_cache, cache_ttls)
+order_proxy = ServiceProxy("orders", settings.order_service_url, response_cache, cache_ttls)
+
+proxies = (user_proxy, product_proxy, order_proxy)
 
 @router.api_route("/users{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def proxy_users(path: str, request: Request):
     # Для всех запросов передаем полный путь
     target_path = f"/users{path}"
-    return await user_proxy.proxy(request.method, target_path, request)
+    return await user_proxy.forward(target_path, request)
 
 @router.api_route("/products{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def proxy_products(path: str, request: Request):
     # Для POST запросов убираем /products из пути, так как он уже включен в base_url
     target_path = f"/products{path}"
-    return await product_proxy.proxy(request.method, target_path, request)
+    return await product_proxy.forward(target_path, request)
 
 @router.api_route("/orders{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def proxy_orders(path: str, request: Request):
     # Для всех запросов передаем полный путь
     target_path = f"/orders{path}"
-    return await order_proxy.proxy(request.method, target_path, request)
\ No newline at end of file
+    return await order_proxy.forward(target_path, request)
@@ -0,0 +1,46 @@
+"""Объединение одинаковых одновременных запросов к сервисам."""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Одновременные вызовы с одинаковым ключом разделяют один запрос.
+
+    Первый вызов запускает запрос отдельной задачей, остальные ждут
+    ее результата или исключения. Отмена одного из ожидающих (например,
+    при разрыве соединения клиентом) не отменяет запрос для остальных.
+    После завершения запроса ключ освобождается.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Результат fn(), общий для всех одновременных вызовов с ключом key."""
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.leaders += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """Счетчики объединения запросов для мониторинга."""
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "shared": self.shared,
+        }
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Исключение уже получено ожидающими; забираем его, чтобы asyncio
+        # не предупреждал, если все ожидающие были отменены
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,23 @@
+import pytest
+
+
+class FakeClock:
+    """Замена time.monotonic, которую тест передвигает вручную."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    """Часы модулей кэша и устойчивости к сбоям."""
+    clock = FakeClock()
+    monkeypatch.setattr("app.cache.time", clock)
+    monkeypatch.setattr("app.resilience.time", clock)
+    return clock
@@ -0,0 +1,120 @@
+from app.cache import CachedResponse, ResponseCache, RouteTTLs
+
+
+def entry(body: bytes = b"{}", etag: str | None = None) -> CachedResponse:
+    headers = [("content-type", "application/json")]
+    if etag is not None:
+        headers.append(("etag", etag))
+    return CachedResponse(status_code=200, headers=headers, body=body)
+
+
+def key(path: str, query: str = "") -> tuple[str, str, str]:
+    return ResponseCache.make_key("GET", path, query)
+
+
+def test_make_key_ignores_parameter_order_and_trailing_slash():
+    assert key("/products/", "b=2&a=1") == key("/products", "a=1&b=2")
+    assert key("/products", "a=1") != key("/products", "a=2")
+
+
+def test_lru_eviction_by_entries(clock):
+    cache = ResponseCache(max_entries=2, max_bytes=10_000)
+    cache.set(key("/products/1"), entry(), ttl=60)
+    cache.set(key("/products/2"), entry(), ttl=60)
+    # Обращение делает запись самой свежей, вытесняется /products/2
+    assert cache.get(key("/products/1")) is not None
+
+    cache.set(key("/products/3"), entry(), ttl=60)
+
+    assert cache.get(key("/products/2")) is None
+    assert cache.get(key("/products/1")) is not None
+    assert cache.get(key("/products/3")) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_eviction_by_bytes(clock):
+    size = entry(b"x" * 100).size
+    cache = ResponseCache(max_entries=100, max_bytes=size * 2)
+    for id_ in range(3):
+        cache.set(key(f"/products/{id_}"), entry(b"x" * 100), ttl=60)
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == size * 2
+    assert cache.get(key("/products/0")) is None
+
+
+def test_entry_larger_than_cache_is_not_stored(clock):
+    cache = ResponseCache(max_entries=10, max_bytes=50)
+
+    cache.set(key("/products"), entry(b"x" * 100), ttl=60)
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_ttl_expiry(clock):
+    cache = ResponseCache(max_entries=10, max_bytes=10_000)
+    cache.set(key("/products"), entry(), ttl=30)
+
+    clock.advance(29.9)
+    assert cache.get(key("/products")) is not None
+
+    clock.advance(0.1)
+    assert cache.get(key("/products")) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_zero_ttl_is_not_stored(clock):
+    cache = ResponseCache(max_entries=10, max_bytes=10_000)
+
+    cache.set(key("/products"), entry(), ttl=0)
+
+    assert cache.get(key("/products")) is None
+
+
+def test_invalidate_removes_resource_and_nested_paths(clock):
+    cache = ResponseCache(max_entries=10, max_bytes=10_000)
+    for path in ("/products", "/products/1", "/products/1/reviews", "/productsx", "/orders"):
+        cache.set(key(path), entry(), ttl=60)
+
+    cache.invalidate("/products/")
+
+    assert cache.get(key("/products")) is None
+    assert cache.get(key("/products/1")) is None
+    assert cache.get(key("/products/1/reviews")) is None
+    assert cache.get(key("/productsx")) is not None
+    assert cache.get(key("/orders")) is not None
+
+
+def test_response_started_before_invalidation_is_not_stored(clock):
+    cache = ResponseCache(max_entries=10, max_bytes=10_000)
+    generation = cache.generation
+
+    cache.invalidate("/products")
+    cache.set(key("/products"), entry(), ttl=60, generation=generation)
+
+    assert cache.get(key("/products")) is None
+
+    cache.set(key("/products"), entry(), ttl=60, generation=cache.generation)
+    assert cache.get(key("/products")) is not None
+
+
+def test_etag_matches_if_none_match():
+    cached = entry(etag='W/"v2"')
+
+    assert cached.matches('"v2"')
+    assert cached.matches('"v1", W/"v2"')
+    assert cached.matches("*")
+    assert not cached.matches('"v1"')
+    assert not cached.matches(None)
+    assert not entry().matches("*")
+
+
+def test_route_ttls():
+    ttls = RouteTTLs({"/products": 30.0, "/products/{id}": 60.0})
+
+    assert ttls.get("/products") == 30.0
+    assert ttls.get("/products/") == 30.0
+    assert ttls.get("/products/15") == 60.0
+    assert ttls.get("/products/15/reviews") is None
+    assert ttls.get("/orders") is None
@@ -0,0 +1,132 @@
+import asyncio
+
+import httpx
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
+
+from app.cache import ResponseCache, RouteTTLs, route_pattern
+from app.routers.proxy import ServiceProxy
+
+
+def make_request(path: str, headers: dict[str, str]) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(key.encode(), value.encode()) for key, value in headers.items()],
+    })
+
+
+def make_proxy(upstream, **kwargs) -> ServiceProxy:
+    proxy = ServiceProxy("users", "http://upstream", **kwargs)
+    proxy._client = httpx.AsyncClient(
+        base_url="http://upstream", transport=httpx.MockTransport(upstream)
+    )
+    return proxy
+
+
+def recording_upstream(sent: list):
+    """Сервис, который запоминает запросы и отвечает потоком с задержкой."""
+
+    async def upstream(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        await asyncio.sleep(0.01)
+        # Ответ потоковый, как от настоящего сервиса: прокси читает его через aiter_raw
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/json", "etag": '"v1"'},
+            stream=httpx.ByteStream(b'[{"id_": 1}]'),
+        )
+
+    return upstream
+
+
+def test_fetch_requests_uncompressed_response():
+    sent = []
+
+    async def scenario():
+        proxy = make_proxy(recording_upstream(sent))
+        try:
+            return await proxy.fetch(
+                "GET", "/users",
+                make_request("/users", {"accept-encoding": "gzip, br", "accept": "application/json"}),
+            )
+        finally:
+            await proxy.close()
+
+    cached = asyncio.run(scenario())
+
+    assert sent[0].headers.get_list("accept-encoding") == ["identity"]
+    assert sent[0].headers["accept"] == "application/json"
+    assert cached.status_code == 200
+    assert cached.etag == '"v1"'
+    assert cached.body == b'[{"id_": 1}]'
+
+
+def test_uncached_get_is_streamed():
+    """GET без TTL и вне coalesce_routes идет потоком со сжатием клиента."""
+    sent = []
+
+    async def scenario():
+        proxy = make_proxy(recording_upstream(sent))
+        try:
+            responses = await asyncio.gather(*(
+                proxy.forward("/users", make_request("/users", {"accept-encoding": "gzip"}))
+                for _ in range(2)
+            ))
+            for response in responses:
+                [chunk async for chunk in response.body_iterator]
+            return responses
+        finally:
+            await proxy.close()
+
+    responses = asyncio.run(scenario())
+
+    assert all(isinstance(response, StreamingResponse) for response in responses)
+    assert len(sent) == 2
+    assert [request.headers["accept-encoding"] for request in sent] == ["gzip", "gzip"]
+
+
+def test_coalesce_routes_share_one_request():
+    sent = []
+
+    async def scenario():
+        proxy = make_proxy(recording_upstream(sent))
+        proxy.coalesce_routes = [route_pattern("/users/{id}")]
+        try:
+            return await asyncio.gather(*(
+                proxy.forward("/users/1", make_request("/users/1", {})) for _ in range(3)
+            ))
+        finally:
+            await proxy.close()
+
+    responses = asyncio.run(scenario())
+
+    assert len(sent) == 1
+    assert [response.body for response in responses] == [b'[{"id_": 1}]'] * 3
+
+
+def test_cache_miss_is_coalesced_and_cached():
+    sent = []
+
+    async def scenario():
+        proxy = make_proxy(
+            recording_upstream(sent),
+            cache=ResponseCache(max_entries=10, max_bytes=10_000),
+            cache_ttls=RouteTTLs({"/users/{id}": 60.0}),
+        )
+        try:
+            first = await asyncio.gather(*(
+                proxy.forward("/users/1", make_request("/users/1", {})) for _ in range(3)
+            ))
+            second = await proxy.forward("/users/1", make_request("/users/1", {}))
+            return first, second
+        finally:
+            await proxy.close()
+
+    first, second = asyncio.run(scenario())
+
+    assert len(sent) == 1
+    assert [response.headers["x-cache"] for response in first] == ["MISS"] * 3
+    assert second.headers["x-cache"] == "HIT"
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from app.resilience import Bulkhead, BulkheadFullError, CircuitBreaker, \
+    CircuitOpenError, RetryBudget
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=3, slow_call_threshold=1.0, open_timeout=30.0, half_open_max_calls=1,
+    )
+
+
+def fail(breaker: CircuitBreaker, times: int = 1) -> None:
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record(False, 0.1)
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = make_breaker()
+
+    fail(breaker, 2)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert error.value.retry_after == pytest.approx(30.0)
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_success_resets_failure_count(clock):
+    breaker = make_breaker()
+
+    fail(breaker, 2)
+    breaker.before_call()
+    breaker.record(True, 0.1)
+    fail(breaker, 2)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = make_breaker()
+
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record(True, 1.5)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_probe_closes_breaker(clock):
+    breaker = make_breaker()
+    fail(breaker, 3)
+
+    clock.advance(30.0)
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Пока проба не завершилась, остальные запросы отклоняются
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_half_open_failure_reopens_breaker(clock):
+    breaker = make_breaker()
+    fail(breaker, 3)
+
+    clock.advance(30.0)
+    fail(breaker)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.advance(29.0)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_abandoned_probe_frees_slot(clock):
+    breaker = make_breaker()
+    fail(breaker, 3)
+    clock.advance(30.0)
+
+    breaker.before_call()
+    breaker.abandon()
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_bulkhead_rejects_when_full():
+    async def scenario():
+        bulkhead = Bulkhead(max_concurrent=2, acquire_timeout=0.01)
+        await bulkhead.acquire()
+        await bulkhead.acquire()
+        with pytest.raises(BulkheadFullError):
+            await bulkhead.acquire()
+
+        bulkhead.release()
+        await bulkhead.acquire()
+        return bulkhead.stats()
+
+    assert asyncio.run(scenario()) == {"max_concurrent": 2, "in_use": 2, "rejected": 1}
+
+
+def test_retry_budget(clock):
+    budget = RetryBudget(ratio=0.5, min_per_second=1.0, max_tokens=2.0)
+
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    clock.advance(1.0)
+    assert budget.withdraw()
+    assert budget.stats() == {"tokens": 0.0, "exhausted": 2}
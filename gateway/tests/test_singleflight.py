@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_request():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        results = await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+        # После завершения ключ свободен, следующий вызов выполняет запрос заново
+        again = await flights.do("key", fetch)
+        return results, again, flights.stats()
+
+    results, again, stats = asyncio.run(scenario())
+
+    assert results == [1] * 5
+    assert again == 2
+    assert stats == {"in_flight": 0, "leaders": 2, "shared": 4}
+
+
+def test_error_is_shared_and_key_released():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        results = await asyncio.gather(
+            *(flights.do("key", fail) for _ in range(3)), return_exceptions=True
+        )
+        return results, flights.stats()
+
+    results, stats = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert stats["in_flight"] == 0
+
+
+def test_cancelled_waiter_does_not_cancel_request():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        first = asyncio.create_task(flights.do("key", fetch))
+        second = asyncio.create_task(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first
+
+    result, first = asyncio.run(scenario())
+
+    assert result == "ok"
+    with pytest.raises(asyncio.CancelledError):
+        first.result()
@@ -1,73 +1,483 @@
-from datetime import datetime
+import asyncio
+from datetime import date, datetime, time, timedelta
 
-from fastapi import APIRouter, HTTPException, status, Depends, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Body, Query, \
+    Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Literal, Sequence
 from uuid import UUID
 
+from sqlalchemy import Row
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database_config import async_session_maker
-from app.database.dao import OrderDAO
+from app.availability import BookingIndex, as_aware, free_slots, \
+    local_timezone
+from app.bulk import BULK_CHUNK_SIZE, BULK_MAX_ITEMS, BulkBodyError, \
+    read_bulk_items, validate_bulk_item
+
+from app.clients import ProductClient, ServiceUnavailableError, UserClient
+from app.config.booking import BookingSettings
+from app.config.services import ServicesSettings
+from app.database_config import async_session_maker, engine, \
+    idempotency_engine, read_session_router, replica_engine, \
+    settings as database_settings
+from app.database_pool import pool_stats
+from app.read_replica import pinned_to_primary
+from app.database.dao import OrderDAO, OrderStatsDAO
+from app.database.models import OrderModel, OrderStatsModel
 from app.enums import OrderStatusEnum
+from app.export import EXPORT_MEDIA_TYPES, csv_chunks, ndjson_chunks
+from app.pagination import DEFAULT_LIMIT, MAX_LIMIT, decode_cursor, \
+    encode_cursor
+from app.schemas import OrderCreateSchema, OrderSchema, OrderStatsSchema, \
+    SlotSchema
+from app.transitions import can_transition
 
 router = APIRouter()
 
+booking_settings = BookingSettings()
+booking_timezone = local_timezone(booking_settings.utc_offset)
+services_settings = ServicesSettings()
+user_client = UserClient(
+    services_settings.user_service_url,
+    ttl=services_settings.cache_ttl,
+    timeout=services_settings.timeout,
+    max_entries=services_settings.cache_max_entries,
+    concurrency=services_settings.concurrency,
+    batch_size=services_settings.batch_size
+)
+product_client = ProductClient(
+    services_settings.product_service_url,
+    ttl=services_settings.cache_ttl,
+    timeout=services_settings.timeout,
+    max_entries=services_settings.cache_max_entries,
+    concurrency=services_settings.concurrency,
+    batch_size=services_settings.batch_size
+)
+
 async def get_db() -> AsyncSession:
     """Зависимость для получения сессии БД."""
     async with async_session_maker() as session:
         yield session
 
+async def get_read_db(request: Request) -> AsyncSession:
+    """Зависимость для получения сессии БД для чтения.
+
+    Сессия открывается на реплике, если она доступна и клиент
+    не изменял данные в последние read_your_writes_window секунд.
+    """
+    async with await read_session_router.session(pinned_to_primary(request)) as session:
+        yield session
+
 async def get_order_dao(db: AsyncSession = Depends(get_db)) -> OrderDAO:
     """Зависимость для получения экземпляра OrderDAO."""
     return OrderDAO(db)
 
+async def get_read_order_dao(db: AsyncSession = Depends(get_read_db)) -> OrderDAO:
+    """Зависимость для получения экземпляра OrderDAO для чтения."""
+    return OrderDAO(db)
+
+async def get_stats_dao(db: AsyncSession = Depends(get_read_db)) -> OrderStatsDAO:
+    """Зависимость для получения экземпляра OrderStatsDAO для чтения."""
+    return OrderStatsDAO(db)
+
+def get_user_client() -> UserClient:
+    """Зависимость для получения клиента сервиса пользователей."""
+    return user_client
+
+def get_product_client() -> ProductClient:
+    """Зависимость для получения клиента сервиса услуг."""
+    return product_client
+
+async def find_invalid_references(
+    users: UserClient,
+    products: ProductClient,
+    user_ids: list[int],
+    product_ids: list[int]
+) -> tuple[set[int], set[int]]:
+    """id несуществующих пользователей и несуществующих или отключенных услуг.
+
+    Каждый уникальный id проверяется один раз, известные id берутся из кэша.
+    """
+    if not services_settings.validate_references:
+        return set(), set()
+    try:
+        found_users, found_products = await asyncio.gather(
+            users.get_many(user_ids),
+            products.get_many(product_ids)
+        )
+    except ServiceUnavailableError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc)
+        )
+    return (
+        {id_ for id_, user in found_users.items() if user is None},
+        {id_ for id_, product in found_products.items()
+         if not ProductClient.is_available(product)}
+    )
+
+async def validate_references(
+    users: UserClient,
+    products: ProductClient,
+    user_id: int | None,
+    product_id: int | None
+) -> None:
+    """Проверка пользователя и услуги заказа, 422 если их нет."""
+    invalid_users, invalid_products = await find_invalid_references(
+        users,
+        products,
+        [user_id] if user_id is not None else [],
+        [product_id] if product_id is not None else []
+    )
+    if invalid_users:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='User not found'
+        )
+    if invalid_products:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='Product not found or inactive'
+        )
+
+async def get_duration(products: ProductClient, product_id: int) -> int:
+    """Длительность услуги в минутах для расчета занятости постов."""
+    try:
+        duration = await products.get_duration(product_id)
+    except ServiceUnavailableError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc)
+        )
+    if duration is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Product not found'
+        )
+    return duration
+
+def booking_intervals(bookings: list) -> list[tuple[datetime, datetime]]:
+    """Интервалы записей по их времени и длительности."""
+    intervals = []
+    for booking_time, duration in bookings:
+        start = as_aware(booking_time, booking_timezone)
+        minutes = duration or booking_settings.default_duration
+        intervals.append((start, start + timedelta(minutes=minutes)))
+    return intervals
+
 @router.get('/ping', tags=['healthcheck'])
 async def ping() -> dict[str, str]:
     """Проверка работоспособности сервиса."""
     return {'status': 'ok'}
 
-@router.post('/orders', tags=['orders'], status_code=status.HTTP_201_CREATED)
+@router.get('/health/db', tags=['healthcheck'])
+async def database_health() -> dict:
+    """Состояние пулов соединений с БД (основной, ключи идемпотентности, реплика).
+
+    Для каждого пула: занятость и время ожидания соединения.
+    """
+    return {
+        'primary': pool_stats(engine.sync_engine.pool, database_settings.max_overflow),
+        'idempotency': pool_stats(idempotency_engine.sync_engine.pool, database_settings.idempotency_max_overflow),
+        'replica': {
+            **read_session_router.stats(),
+            'pool': pool_stats(replica_engine.sync_engine.pool, database_settings.max_overflow) if replica_engine else None,
+        },
+    }
+
+@router.post(
+    '/orders',
+    tags=['orders'],
+    status_code=status.HTTP_201_CREATED,
+    response_model=OrderSchema
+)
 async def create_order(
     user_id: int = Body(...),
     product_id: int = Body(...),
-    status: OrderStatusEnum = Body(OrderStatusEnum.CREATED),
+    order_status: OrderStatusEnum = Body(OrderStatusEnum.CREATED, alias='status'),
     booking_time: datetime = Body(None),
-    dao: OrderDAO = Depends(get_order_dao)
-) -> dict:
-    """Создание нового заказа."""
-    order = await dao.create_order(user_id, product_id, status, booking_time)
+    dao: OrderDAO = Depends(get_order_dao),
+    users: UserClient = Depends(get_user_client),
+    products: ProductClient = Depends(get_product_client)
+) -> OrderModel:
+    """Создание нового заказа.
+
+    Пользователь и услуга проверяются в своих сервисах (422, если их нет).
+    Заказ с временем записи создается, только если на все время услуги
+    есть свободный пост, иначе возвращается 409.
+    """
+    await validate_references(users, products, user_id, product_id)
+    if booking_time is None:
+        order = await dao.create_order(user_id, product_id, order_status)
+    else:
+        duration = await get_duration(products, product_id)
+        booking_time = as_aware(booking_time, booking_timezone)
+        booking_end = booking_time + timedelta(minutes=duration)
+        order = await dao.create_booking(
+            user_id, product_id, order_status, booking_time, duration,
+            lambda bookings: BookingIndex(booking_intervals(bookings)).is_free(
+                booking_time, booking_end, booking_settings.capacity
+            )
+        )
+        if order is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail='Booking slot is full'
+            )
     
+    return order
+
+async def insert_bulk_chunk(
+    dao: OrderDAO,
+    chunk: list[tuple[int, OrderCreateSchema]],
+    durations: dict[int, int | None]
+) -> list[dict]:
+    """Вставка части пакета одним INSERT ... RETURNING; результат по каждому элементу.
+
+    Если БД отклоняет INSERT, часть делится пополам и вставляется заново,
+    пока ошибка не сведется к отдельным элементам: корректные заказы
+    создаются, а ошибка возвращается только для отклоненных. Если же
+    соединение с БД потеряно или не получено из пула, ошибка возвращается
+    для всей части без повторов.
+
+    Args:
+        dao: DAO заказов
+        chunk: Пары (индекс в пакете, данные заказа)
+        durations: Длительности услуг по id; сохраняются в заказах с записью,
+            как при создании одного заказа
+    """
+    try:
+        orders = await dao.create_orders([
+            {
+                **item.model_dump(),
+                'duration': durations.get(item.product_id) if item.booking_time is not None else None
+            } for _, item in chunk
+        ])
+    except SQLAlchemyError as exc:
+        if len(chunk) > 1 and isinstance(exc, DBAPIError) and not exc.connection_invalidated:
+            middle = len(chunk) // 2
+            return [
+                *await insert_bulk_chunk(dao, chunk[:middle], durations),
+                *await insert_bulk_chunk(dao, chunk[middle:], durations)
+            ]
+        return [
+            {'index': index, 'errors': [{'loc': [], 'msg': 'Database error', 'type': 'db_error'}]}
+            for index, _ in chunk
+        ]
+    return [
+        {
+            'index': index,
+            'order': OrderSchema.model_validate(order)
+        } for (index, _), order in zip(chunk, orders)
+    ]
+
+@router.post('/orders/bulk', tags=['orders'])
+async def create_orders_bulk(
+    request: Request,
+    dao: OrderDAO = Depends(get_order_dao),
+    users: UserClient = Depends(get_user_client),
+    products: ProductClient = Depends(get_product_client)
+) -> dict:
+    """Пакетное создание заказов.
+
+    Принимает JSON-массив или NDJSON (Content-Type: application/x-ndjson).
+    Пользователи и услуги проверяются по одному разу на уникальный id.
+    Корректные заказы вставляются многострочными INSERT ... RETURNING
+    по BULK_CHUNK_SIZE штук, ошибки возвращаются для каждого элемента
+    отдельно и не прерывают остальной пакет (см. insert_bulk_chunk).
+    Занятость постов не проверяется, но длительность услуги сохраняется
+    в каждой записи, чтобы свободные слоты считались по ней.
+    """
+    try:
+        items = await read_bulk_items(request)
+    except BulkBodyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f'Too many orders, max {BULK_MAX_ITEMS}'
+        )
+
+    results: list[dict] = []
+    valid = []
+    for index, item in enumerate(items):
+        validated = validate_bulk_item(item)
+        if isinstance(validated, list):
+            results.append({'index': index, 'errors': validated})
+        else:
+            valid.append((index, validated))
+
+    invalid_users, invalid_products = await find_invalid_references(
+        users,
+        products,
+        [item.user_id for _, item in valid],
+        [item.product_id for _, item in valid]
+    )
+    if invalid_users or invalid_products:
+        checked, valid = valid, []
+        for index, item in checked:
+            errors = []
+            if item.user_id in invalid_users:
+                errors.append({'loc': ['user_id'], 'msg': 'User not found', 'type': 'not_found'})
+            if item.product_id in invalid_products:
+                errors.append({'loc': ['product_id'], 'msg': 'Product not found or inactive', 'type': 'not_found'})
+            if errors:
+                results.append({'index': index, 'errors': errors})
+            else:
+                valid.append((index, item))
+
+    try:
+        durations = await products.get_durations(
+            {item.product_id for _, item in valid if item.booking_time is not None}
+        )
+    except ServiceUnavailableError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc)
+        )
+
+    for start in range(0, len(valid), BULK_CHUNK_SIZE):
+        results.extend(await insert_bulk_chunk(dao, valid[start:start + BULK_CHUNK_SIZE], durations))
+
+    results.sort(key=lambda result: result['index'])
+    created = sum(1 for result in results if 'order' in result)
     return {
-        'order_id': str(order.order_id),
-        'user_id': order.user_id,
-        'product_id': order.product_id,
-        'status': order.status,
-        'booking_time': order.booking_time,
-        'created_to': order.created_to,
-        'update_to': order.update_to
+        'created': created,
+        'failed': len(results) - created,
+        'results': results
     }
 
-@router.get('/orders', tags=['orders'])
-async def get_orders(dao: OrderDAO = Depends(get_order_dao)) -> list[dict]:
-    """Получение списка всех заказов."""
-    orders = await dao.get_orders()
+@router.get('/orders', tags=['orders'], response_model=list[OrderSchema])
+async def get_orders(
+    response: Response,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: str | None = None,
+    user_id: int | None = None,
+    order_status: OrderStatusEnum | None = Query(None, alias='status'),
+    booking_from: datetime | None = None,
+    booking_to: datetime | None = None,
+    dao: OrderDAO = Depends(get_read_order_dao)
+) -> Sequence[Row]:
+    """Получение списка заказов от новых к старым.
+
+    Если есть следующая страница, курсор для нее возвращается
+    в заголовке X-Next-Cursor.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor'
+        )
+
+    orders = await dao.get_orders(
+        limit + 1, after, user_id, order_status, booking_from, booking_to
+    )
+    if len(orders) > limit:
+        orders = orders[:limit]
+        response.headers['X-Next-Cursor'] = encode_cursor(
+            orders[-1].created_to, orders[-1].id_
+        )
     
+    return orders
+
+@router.get('/orders/stats', tags=['orders'], response_model=list[OrderStatsSchema])
+async def get_order_stats(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    product_id: int | None = None,
+    order_status: OrderStatusEnum | None = Query(None, alias='status'),
+    dao: OrderStatsDAO = Depends(get_stats_dao)
+) -> Sequence[OrderStatsModel]:
+    """Число заказов по дням создания (UTC), услугам и статусам.
+
+    Читается из сводной таблицы, поэтому время ответа зависит от числа
+    дней и статусов в периоде, а не от числа заказов.
+    """
+    return await dao.get_stats(date_from, date_to, product_id, order_status)
+
+@router.get('/orders/export', tags=['orders'])
+async def export_orders(
+    export_format: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    created_from: datetime | None = None,
+    created_before: datetime | None = None,
+    order_status: OrderStatusEnum | None = Query(None, alias='status'),
+    dao: OrderDAO = Depends(get_read_order_dao)
+) -> StreamingResponse:
+    """Выгрузка заказов в NDJSON или CSV от старых к новым.
+
+    Заказы читаются из серверного курсора и отдаются клиенту по мере
+    чтения, поэтому память сервиса не зависит от размера выгрузки.
+    """
+    partitions = dao.stream_orders(created_from, created_before, order_status)
+    chunks = csv_chunks(partitions) if export_format == 'csv' \
+        else ndjson_chunks(partitions)
+
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="orders.{export_format}"'
+        }
+    )
+
+@router.get('/orders/availability', tags=['orders'], response_model=list[SlotSchema])
+async def get_availability(
+    product_id: int,
+    date_from: date,
+    date_to: date | None = None,
+    dao: OrderDAO = Depends(get_read_order_dao),
+    products: ProductClient = Depends(get_product_client)
+) -> list[dict]:
+    """Свободные слоты записи на услугу с date_from по date_to включительно.
+
+    Слот свободен, если на все время услуги в рабочие часы
+    есть хотя бы один незанятый пост. Время в местном часовом поясе сервиса.
+    """
+    date_to = date_to or date_from
+    if date_to < date_from or \
+            (date_to - date_from).days >= booking_settings.max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Date range must be from 1 to {booking_settings.max_days} days'
+        )
+
+    duration = await get_duration(products, product_id)
+    range_start = datetime.combine(date_from, time.min, tzinfo=booking_timezone)
+    range_end = datetime.combine(
+        date_to + timedelta(days=1), time.min, tzinfo=booking_timezone
+    )
+    index = BookingIndex(booking_intervals(
+        await dao.get_bookings(range_start, range_end)
+    ))
+
     return [
-        {
-            'order_id': str(order.order_id),
-            'user_id': order.user_id,
-            'product_id': order.product_id,
-            'status': order.status,
-            'booking_time': order.booking_time,
-            'created_to': order.created_to,
-            'update_to': order.update_to
-        } for order in orders
+        {'start': start, 'end': end}
+        for start, end in free_slots(
+            index,
+            date_from,
+            date_to,
+            timedelta(minutes=duration),
+            booking_settings.capacity,
+            booking_settings.day_start,
+            booking_settings.day_end,
+            timedelta(minutes=booking_settings.slot_step),
+            booking_timezone,
+            not_before=datetime.now(booking_timezone),
+        )
     ]
 
-@router.get('/orders/{order_id}', tags=['orders'])
+@router.get('/orders/{order_id}', tags=['orders'], response_model=OrderSchema)
 async def get_order(
     order_id: UUID,
-    dao: OrderDAO = Depends(get_order_dao)
-) -> dict:
+    dao: OrderDAO = Depends(get_read_order_dao)
+) -> OrderModel:
     """Получение информации о конкретном заказе."""
     order = await dao.get_order(order_id)
     
@@ -77,42 +487,92 @@ async def get_order(
             detail='Order not found'
         )
     
-    return {
-        'order_id': str(order.order_id),
-        'user_id': order.user_id,
-        'product_id': order.product_id,
-        'status': order.status,
-        'booking_time': order.booking_time,
-        'created_to': order.created_to,
-        'update_to': order.update_to
-    }
+    return order
 
-@router.patch('/orders/{order_id}', tags=['orders'])
-async def update_order(
+async def raise_update_error(
+    dao: OrderDAO,
     order_id: UUID,
-    user_id: int | None = None,
-    product_id: int | None = None,
-    status: OrderStatusEnum | None = None,
-    dao: OrderDAO = Depends(get_order_dao)
-) -> dict:
-    """Частичное обновление заказа."""
-    order = await dao.update_order(order_id, user_id, product_id, status)
-    
+    order_status: OrderStatusEnum | None
+) -> None:
+    """Ошибка обновления заказа: 404, если заказа нет, иначе 409.
+
+    Если переход из текущего статуса допустим, условный UPDATE не прошел
+    из-за параллельного изменения статуса, и запрос можно повторить.
+    """
+    order = await dao.get_order(order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='Order not found'
         )
+    if order_status is not None and not can_transition(order.status, order_status):
+        detail = f'Cannot change order status from {order.status} to {order_status}'
+    else:
+        detail = 'Order was changed concurrently, retry the request'
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=detail
+    )
+
+@router.patch('/orders/{order_id}', tags=['orders'], response_model=OrderSchema)
+async def update_order(
+    order_id: UUID,
+    user_id: int | None = None,
+    product_id: int | None = None,
+    order_status: OrderStatusEnum | None = Query(None, alias='status'),
+    dao: OrderDAO = Depends(get_order_dao),
+    users: UserClient = Depends(get_user_client),
+    products: ProductClient = Depends(get_product_client)
+) -> OrderModel:
+    """Частичное обновление заказа.
+
+    Новые пользователь и услуга проверяются в своих сервисах.
+    Статус меняется только по допустимому переходу, иначе возвращается 409.
+    """
+    await validate_references(users, products, user_id, product_id)
+    order = await dao.update_order(order_id, user_id, product_id, order_status)
     
-    return {
-        'order_id': str(order.order_id),
-        'user_id': order.user_id,
-        'product_id': order.product_id,
-        'status': order.status,
-        'booking_time': order.booking_time,
-        'created_to': order.created_to,
-        'update_to': order.update_to
-    }
+    if not order:
+        await raise_update_error(dao, order_id, order_status)
+    
+    return order
+
+async def change_order_status(
+    order_id: UUID,
+    order_status: OrderStatusEnum,
+    dao: OrderDAO
+) -> OrderModel:
+    """Перевод заказа в статус одним условным UPDATE ... RETURNING."""
+    order = await dao.update_order(order_id, status=order_status)
+
+    if not order:
+        await raise_update_error(dao, order_id, order_status)
+
+    return order
+
+@router.post('/orders/{order_id}/start', tags=['orders'], response_model=OrderSchema)
+async def start_order(
+    order_id: UUID,
+    dao: OrderDAO = Depends(get_order_dao)
+) -> OrderModel:
+    """Начало работ по заказу (created -> in_progress)."""
+    return await change_order_status(order_id, OrderStatusEnum.IN_PROGRESS, dao)
+
+@router.post('/orders/{order_id}/complete', tags=['orders'], response_model=OrderSchema)
+async def complete_order(
+    order_id: UUID,
+    dao: OrderDAO = Depends(get_order_dao)
+) -> OrderModel:
+    """Завершение заказа (created, in_progress -> completed)."""
+    return await change_order_status(order_id, OrderStatusEnum.COMPLETED, dao)
+
+@router.post('/orders/{order_id}/cancel', tags=['orders'], response_model=OrderSchema)
+async def cancel_order(
+    order_id: UUID,
+    dao: OrderDAO = Depends(get_order_dao)
+) -> OrderModel:
+    """Отмена заказа (created, in_progress -> cancelled)."""
+    return await change_order_status(order_id, OrderStatusEnum.CANCELLED, dao)
 
 @router.delete('/orders/{order_id}', tags=['orders'], status_code=status.HTTP_204_NO_CONTENT)
 async def delete_order(
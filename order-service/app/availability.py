@@ -0,0 +1,92 @@
+"""Расчет свободных слотов записи с учетом числа постов."""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Iterable, Iterator
+
+
+def local_timezone(utc_offset: int) -> timezone:
+    """Часовой пояс сервиса по смещению от UTC в часах."""
+    return timezone(timedelta(hours=utc_offset))
+
+
+def as_aware(value: datetime, tz: tzinfo) -> datetime:
+    """Время без часового пояса считается местным временем сервиса."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=tz)
+
+
+class BookingIndex:
+    """Занятость постов во времени по существующим записям.
+
+    Границы интервалов записей хранятся в отсортированном массиве,
+    и для каждого отрезка между соседними границами заранее посчитано
+    число одновременных записей. Максимальная занятость в окне
+    находится двоичным поиском, без перебора всех записей.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[datetime, datetime]]):
+        deltas: dict[datetime, int] = {}
+        for start, end in intervals:
+            if end <= start:
+                continue
+            deltas[start] = deltas.get(start, 0) + 1
+            deltas[end] = deltas.get(end, 0) - 1
+
+        self.points = sorted(deltas)
+        # load[i] - число записей на отрезке [points[i], points[i + 1])
+        self.load = []
+        current = 0
+        for point in self.points:
+            current += deltas[point]
+            self.load.append(current)
+
+    def max_load(self, start: datetime, end: datetime) -> int:
+        """Максимальное число одновременных записей в окне [start, end)."""
+        first = max(bisect_right(self.points, start) - 1, 0)
+        last = bisect_left(self.points, end)
+        return max(self.load[first:last], default=0)
+
+    def is_free(self, start: datetime, end: datetime, capacity: int) -> bool:
+        """Есть ли свободный пост на все окно [start, end)."""
+        return self.max_load(start, end) < capacity
+
+
+def free_slots(
+    index: BookingIndex,
+    date_from: date,
+    date_to: date,
+    duration: timedelta,
+    capacity: int,
+    day_start: time,
+    day_end: time,
+    step: timedelta,
+    tz: tzinfo,
+    not_before: datetime | None = None,
+) -> Iterator[tuple[datetime, datetime]]:
+    """Свободные слоты в рабочее время дней с date_from по date_to включительно.
+
+    Args:
+        index: Занятость постов
+        date_from: Первый день
+        date_to: Последний день
+        duration: Длительность услуги
+        capacity: Число постов
+        day_start: Начало рабочего дня
+        day_end: Конец рабочего дня, слот должен закончиться не позже
+        step: Шаг начала слотов
+        tz: Часовой пояс рабочего времени
+        not_before: Слоты, начинающиеся раньше, не возвращаются
+
+    Returns:
+        Iterator[tuple[datetime, datetime]]: Начало и конец свободных слотов.
+    """
+    day = date_from
+    while day <= date_to:
+        start = datetime.combine(day, day_start, tzinfo=tz)
+        closing = datetime.combine(day, day_end, tzinfo=tz)
+        while start + duration <= closing:
+            end = start + duration
+            if (not_before is None or start >= not_before) \
+                    and index.is_free(start, end, capacity):
+                yield start, end
+            start += step
+        day += timedelta(days=1)
@@ -0,0 +1,67 @@
+"""Разбор тела запроса пакетного создания заказов."""
+import json
+from typing import Any
+
+from fastapi import Request
+from pydantic import ValidationError
+
+from app.schemas import OrderCreateSchema
+
+# Максимальное число заказов в одном запросе
+BULK_MAX_ITEMS = 10000
+# Число заказов в одном INSERT ... RETURNING
+BULK_CHUNK_SIZE = 1000
+
+
+class BulkBodyError(ValueError):
+    """Тело запроса не является JSON-массивом или NDJSON."""
+
+
+async def read_bulk_items(request: Request) -> list[Any]:
+    """Чтение элементов пакета из JSON-массива или NDJSON.
+
+    NDJSON читается потоково построчно; строка с некорректным JSON
+    не прерывает разбор, а возвращается как BulkBodyError на своей позиции.
+
+    Raises:
+        BulkBodyError: Тело запроса нельзя разобрать целиком.
+    """
+    if 'ndjson' in request.headers.get('content-type', ''):
+        lines, tail = [], b''
+        async for chunk in request.stream():
+            *complete, tail = (tail + chunk).split(b'\n')
+            lines.extend(complete)
+        lines.append(tail)
+        return [_parse_line(line) for line in lines if line.strip()]
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise BulkBodyError('Body must be a JSON array or NDJSON')
+    if not isinstance(items, list):
+        raise BulkBodyError('Body must be a JSON array or NDJSON')
+    return items
+
+
+def validate_bulk_item(item: Any) -> OrderCreateSchema | list[dict]:
+    """Проверка одного элемента пакета.
+
+    Returns:
+        OrderCreateSchema | list[dict]: Данные заказа или список ошибок.
+    """
+    if isinstance(item, BulkBodyError):
+        return [{'loc': [], 'msg': str(item), 'type': 'json_invalid'}]
+    try:
+        return OrderCreateSchema.model_validate(item)
+    except ValidationError as exc:
+        return [
+            {'loc': list(error['loc']), 'msg': error['msg'], 'type': error['type']}
+            for error in exc.errors()
+        ]
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return BulkBodyError('Invalid JSON')
@@ -0,0 +1,177 @@
+"""Клиенты других сервисов автосервиса."""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+import httpx
+
+
+class ServiceUnavailableError(Exception):
+    """Сервис не ответил или вернул ошибку."""
+
+
+class ServiceClient:
+    """Клиент сервиса для чтения записей по id.
+
+    Держит пул соединений, хранит найденные записи в памяти ttl секунд
+    (не больше max_entries), загружает недостающие id пакетами через
+    GET resource?ids=... и объединяет одновременные запросы одного id,
+    поэтому частое и пакетное создание заказов не превращается в отдельный
+    запрос к сервису на каждый заказ. Отсутствующие id не кэшируются,
+    чтобы только что созданная запись сразу стала доступна.
+    """
+
+    resource = ''
+
+    def __init__(
+        self,
+        base_url: str,
+        ttl: float = 300.0,
+        timeout: float = 5.0,
+        max_entries: int = 10000,
+        concurrency: int = 10,
+        batch_size: int = 100,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.base_url = base_url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._cache: OrderedDict[int, tuple[dict, float]] = OrderedDict()
+        self._inflight: dict[int, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP-клиент с пулом соединений, создается при первом запросе."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                transport=self.transport,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Закрытие соединений."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(self, id_: int) -> dict | None:
+        """Запись по id или None, если ее нет.
+
+        Raises:
+            ServiceUnavailableError: Сервис недоступен.
+        """
+        return (await self.get_many([id_]))[id_]
+
+    async def get_many(self, ids: Iterable[int]) -> dict[int, dict | None]:
+        """Записи по id: из кэша, остальные пакетными запросами к сервису.
+
+        Raises:
+            ServiceUnavailableError: Сервис недоступен.
+        """
+        records, missing = {}, []
+        now = time.monotonic()
+        for id_ in set(ids):
+            cached = self._cache.get(id_)
+            if cached is not None and cached[1] > now:
+                records[id_] = cached[0]
+            else:
+                missing.append(id_)
+
+        if missing:
+            tasks = self._coalesced_fetch(missing)
+            fetched = await asyncio.gather(*(asyncio.shield(task) for task in set(tasks.values())))
+            found = {id_: record for batch in fetched for id_, record in batch.items()}
+            records.update((id_, found.get(id_)) for id_ in missing)
+        return records
+
+    def _coalesced_fetch(self, ids: list[int]) -> dict[int, asyncio.Task]:
+        """Задачи загрузки по каждому id.
+
+        Уже идущие загрузки переиспользуются, остальные id запрашиваются
+        пакетами не больше batch_size.
+        """
+        new = sorted(id_ for id_ in ids if id_ not in self._inflight)
+        for start in range(0, len(new), self.batch_size):
+            batch = new[start:start + self.batch_size]
+            task = asyncio.create_task(self._fetch(batch))
+            for id_ in batch:
+                self._inflight[id_] = task
+            task.add_done_callback(lambda done, batch=batch: self._release(batch, done))
+        return {id_: self._inflight[id_] for id_ in ids}
+
+    def _release(self, batch: list[int], task: asyncio.Task) -> None:
+        for id_ in batch:
+            if self._inflight.get(id_) is task:
+                del self._inflight[id_]
+
+    async def _fetch(self, ids: list[int]) -> dict[int, dict]:
+        """Один запрос GET resource?ids=... на пакет id."""
+        try:
+            async with self._semaphore:
+                response = await self.client.get(
+                    self.resource, params={'ids': ','.join(map(str, ids))}
+                )
+        except httpx.HTTPError as exc:
+            raise ServiceUnavailableError(f'{self.resource} service is unavailable') from exc
+        if response.status_code != 200:
+            raise ServiceUnavailableError(
+                f'{self.resource} service returned {response.status_code}'
+            )
+
+        expires = time.monotonic() + self.ttl
+        records = {record['id_']: record for record in response.json()['items']}
+        for id_, record in records.items():
+            self._cache[id_] = (record, expires)
+            self._cache.move_to_end(id_)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return records
+
+
+class UserClient(ServiceClient):
+    """Клиент сервиса пользователей."""
+
+    resource = '/users'
+
+
+class ProductClient(ServiceClient):
+    """Клиент сервиса услуг.
+
+    Кроме проверки услуги дает ее длительность для расчета занятости постов.
+    """
+
+    resource = '/products'
+
+    @staticmethod
+    def is_available(product: dict | None) -> bool:
+        """Можно ли заказать услугу: она есть и не отключена."""
+        return product is not None and product.get('is_active', True)
+
+    async def get_duration(self, product_id: int) -> int | None:
+        """Длительность услуги в минутах или None, если услуги нет.
+
+        Raises:
+            ServiceUnavailableError: Сервис услуг недоступен.
+        """
+        product = await self.get(product_id)
+        return product['schedule_time'] if product is not None else None
+
+    async def get_durations(self, product_ids: Iterable[int]) -> dict[int, int | None]:
+        """Длительности услуг по id: один пакетный запрос на недостающие id.
+
+        Raises:
+            ServiceUnavailableError: Сервис услуг недоступен.
+        """
+        products = await self.get_many(product_ids)
+        return {
+            id_: product['schedule_time'] if product is not None else None
+            for id_, product in products.items()
+        }
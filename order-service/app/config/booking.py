@@ -0,0 +1,26 @@
+from datetime import time
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class BookingSettings(BaseSettings):
+    """Настройки записи на обслуживание.
+
+    Args:
+        capacity: Число постов (подъемников), обслуживающих заказы одновременно
+        day_start: Начало рабочего дня
+        day_end: Конец рабочего дня
+        slot_step: Шаг начала слотов в минутах
+        utc_offset: Смещение местного времени сервиса от UTC в часах
+        max_days: Максимальная длина периода запроса свободных слотов в днях
+        default_duration: Длительность записей, созданных без длительности, в минутах
+    """
+
+    capacity: int = Field(2, alias='booking_capacity')
+    day_start: time = Field(time(9, 0), alias='booking_day_start')
+    day_end: time = Field(time(18, 0), alias='booking_day_end')
+    slot_step: int = Field(30, alias='booking_slot_step')
+    utc_offset: int = Field(5, alias='booking_utc_offset')
+    max_days: int = Field(31, alias='booking_max_days')
+    default_duration: int = Field(60, alias='booking_default_duration')
@@ -0,0 +1,30 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class ServicesSettings(BaseSettings):
+    """Настройки обращения к другим сервисам автосервиса.
+
+    Args:
+        user_service_url: Адрес сервиса пользователей
+        product_service_url: Адрес сервиса услуг
+        timeout: Таймаут запроса к сервису в секундах
+        cache_ttl: Время хранения найденных записей в кэше в секундах
+        cache_max_entries: Максимальное число записей в кэше каждого клиента
+        concurrency: Максимальное число одновременных запросов к каждому сервису
+        batch_size: Максимальное число id в одном запросе к сервису
+        validate_references: Проверять ли user_id и product_id при создании заказов
+    """
+
+    user_service_url: str = Field(
+        'http://host.docker.internal:8001', alias='user_service_url'
+    )
+    product_service_url: str = Field(
+        'http://host.docker.internal:8003', alias='product_service_url'
+    )
+    timeout: float = Field(5.0, alias='services_timeout')
+    cache_ttl: float = Field(300.0, alias='services_cache_ttl')
+    cache_max_entries: int = Field(10000, alias='services_cache_max_entries')
+    concurrency: int = Field(10, alias='services_concurrency')
+    batch_size: int = Field(100, alias='services_batch_size')
+    validate_references: bool = Field(True, alias='validate_order_references')
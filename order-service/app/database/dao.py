@@ -1,15 +1,35 @@
 """Модуль для работы с заказами в базе данных."""
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from uuid import UUID
-from typing import List, Optional
+from typing import AsyncIterator, Callable, List, Optional, Sequence
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, insert, update, delete, tuple_, func, cast, \
+    text, Date, Row
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.models import OrderModel
+from app.database.models import IdempotencyKeyModel, OrderModel, \
+    OrderStatsModel
 from app.enums import OrderStatusEnum
+from app.transitions import allowed_sources
 from app.database_config import async_session_maker
 
+# Ключ транзакционной блокировки, под которой проверяется занятость постов
+BOOKING_LOCK_ID = 740001
+# Насколько раньше начала окна могла начаться пересекающая его запись
+BOOKING_LOOKBACK = timedelta(days=1)
+# Колонки списка заказов: поля ответа API и id для курсора страниц
+ORDER_LIST_COLUMNS = (
+    OrderModel.id_,
+    OrderModel.order_id,
+    OrderModel.user_id,
+    OrderModel.product_id,
+    OrderModel.status,
+    OrderModel.booking_time,
+    OrderModel.created_to,
+    OrderModel.update_to,
+)
+
 
 class OrderDAO:
     """Класс для выполнения операций с заказами в базе данных."""
@@ -22,20 +42,106 @@ class OrderDAO:
         user_id: int,
         product_id: int,
         status: OrderStatusEnum = OrderStatusEnum.CREATED,
-        booking_time: datetime = None
+        booking_time: datetime = None,
+        duration: int = None
     ) -> OrderModel:
-        """Создание нового заказа."""
-        order = OrderModel(
-            user_id=user_id,
-            product_id=product_id,
-            status=status,
-            booking_time=booking_time
+        """Создание нового заказа одним INSERT ... RETURNING.
+
+        id и даты, которые заполняет сервер, возвращаются тем же запросом.
+        """
+        result = await self.db.execute(
+            insert(OrderModel).values(
+                user_id=user_id,
+                product_id=product_id,
+                status=status,
+                booking_time=booking_time,
+                duration=duration
+            ).returning(OrderModel)
         )
-        self.db.add(order)
+        order = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(order)
         return order
     
+    async def create_orders(self, orders: List[dict]) -> List[OrderModel]:
+        """Создание нескольких заказов одним INSERT ... RETURNING.
+
+        Args:
+            orders: Данные заказов (user_id, product_id, status, booking_time, duration)
+
+        Returns:
+            List[OrderModel]: Созданные заказы в порядке входных данных.
+        """
+        try:
+            result = await self.db.scalars(
+                insert(OrderModel).returning(
+                    OrderModel, sort_by_parameter_order=True
+                ),
+                orders,
+            )
+            created = result.all()
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return created
+    
+    async def create_booking(
+        self,
+        user_id: int,
+        product_id: int,
+        status: OrderStatusEnum,
+        booking_time: datetime,
+        duration: int,
+        fits: Callable[[list], bool]
+    ) -> Optional[OrderModel]:
+        """Создание заказа с записью, если для нее есть свободный пост.
+
+        Проверка занятости и вставка выполняются под транзакционной
+        блокировкой, поэтому параллельные запросы не займут один пост дважды.
+
+        Args:
+            user_id: id пользователя
+            product_id: id услуги
+            status: Статус заказа
+            booking_time: Время записи
+            duration: Длительность записи в минутах
+            fits: Проверка, помещается ли запись среди пересекающих ее записей
+
+        Returns:
+            Optional[OrderModel]: Заказ или None, если свободного поста нет.
+        """
+        if self.db.bind.dialect.name == 'postgresql':
+            await self.db.execute(select(func.pg_advisory_xact_lock(BOOKING_LOCK_ID)))
+
+        bookings = await self.get_bookings(
+            booking_time, booking_time + timedelta(minutes=duration)
+        )
+        if not fits(bookings):
+            await self.db.rollback()
+            return None
+        return await self.create_order(
+            user_id, product_id, status, booking_time, duration
+        )
+    
+    async def get_bookings(
+        self,
+        start: datetime,
+        end: datetime
+    ) -> List[tuple[datetime, Optional[int]]]:
+        """Время и длительность неотмененных записей, которые могут пересекать [start, end).
+
+        Выбираются записи, начавшиеся не раньше чем за BOOKING_LOOKBACK
+        до start, чтобы запрос шел по индексу booking_time.
+        """
+        result = await self.db.execute(
+            select(OrderModel.booking_time, OrderModel.duration).where(
+                OrderModel.status != OrderStatusEnum.CANCELLED,
+                OrderModel.booking_time >= start - BOOKING_LOOKBACK,
+                OrderModel.booking_time < end,
+            )
+        )
+        return result.all()
+    
     async def get_order(self, order_id: UUID) -> Optional[OrderModel]:
         """Получение заказа по ID."""
         result = await self.db.execute(
@@ -43,10 +149,109 @@ class OrderDAO:
         )
         return result.scalar_one_or_none()
     
-    async def get_orders(self) -> List[OrderModel]:
-        """Получение всех заказов."""
-        result = await self.db.execute(select(OrderModel))
-        return result.scalars().all()
+    @staticmethod
+    def _filters(
+        user_id: Optional[int] = None,
+        status: Optional[OrderStatusEnum] = None,
+        booking_from: Optional[datetime] = None,
+        booking_to: Optional[datetime] = None,
+    ) -> list:
+        """Условия отбора заказов для списков."""
+        filters = []
+        if user_id is not None:
+            filters.append(OrderModel.user_id == user_id)
+        if status is not None:
+            filters.append(OrderModel.status == status)
+        if booking_from is not None:
+            filters.append(OrderModel.booking_time >= booking_from)
+        if booking_to is not None:
+            filters.append(OrderModel.booking_time < booking_to)
+        return filters
+
+    async def get_orders(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, int]] = None,
+        user_id: Optional[int] = None,
+        status: Optional[OrderStatusEnum] = None,
+        booking_from: Optional[datetime] = None,
+        booking_to: Optional[datetime] = None,
+    ) -> List[Row]:
+        """Получение заказов от новых к старым.
+
+        Страницы выбираются по ключу (created_to, id) без OFFSET,
+        поэтому стоимость запроса не зависит от номера страницы.
+
+        Args:
+            limit: Максимальное число заказов
+            after: Ключ (created_to, id) последнего заказа предыдущей страницы
+            user_id: Только заказы пользователя
+            status: Только заказы в статусе
+            booking_from: Время записи не раньше
+            booking_to: Время записи раньше
+
+        Returns:
+            List[Row]: Строки с колонками ORDER_LIST_COLUMNS.
+        """
+        query = select(*ORDER_LIST_COLUMNS).where(
+            *self._filters(user_id, status, booking_from, booking_to)
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(OrderModel.created_to, OrderModel.id_) < tuple_(*after)
+            )
+        query = query.order_by(OrderModel.created_to.desc(), OrderModel.id_.desc())
+        if limit is not None:
+            query = query.limit(limit)
+
+        result = await self.db.execute(query)
+        return result.all()
+    
+    async def stream_orders(
+        self,
+        created_from: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        status: Optional[OrderStatusEnum] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence]:
+        """Потоковое чтение заказов от старых к новым.
+
+        Строки читаются из серверного курсора пачками по batch_size,
+        поэтому память не зависит от числа заказов.
+
+        Args:
+            created_from: Создан не раньше
+            created_before: Создан раньше
+            status: Только заказы в статусе
+            batch_size: Число строк в пачке
+
+        Returns:
+            AsyncIterator[Sequence]: Пачки строк с полями заказа.
+        """
+        query = select(
+            OrderModel.order_id,
+            OrderModel.user_id,
+            OrderModel.product_id,
+            OrderModel.status,
+            OrderModel.booking_time,
+            OrderModel.duration,
+            OrderModel.created_to,
+            OrderModel.update_to,
+        ).where(*self._filters(status=status))
+        if created_from is not None:
+            query = query.where(OrderModel.created_to >= created_from)
+        if created_before is not None:
+            query = query.where(OrderModel.created_to < created_before)
+        query = query.order_by(OrderModel.created_to, OrderModel.id_)
+
+        if self.db.bind.dialect.name == 'postgresql':
+            # Выгрузка может читаться дольше statement_timeout соединения
+            await self.db.execute(select(func.set_config('statement_timeout', '0', True)))
+        result = await self.db.stream(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
     
     async def update_order(
         self,
@@ -55,20 +260,36 @@ class OrderDAO:
         product_id: int = None,
         status: OrderStatusEnum = None
     ) -> Optional[OrderModel]:
-        """Обновление заказа."""
-        order = await self.get_order(order_id)
-        if not order:
-            return None
-        
+        """Обновление заказа одним UPDATE ... RETURNING.
+
+        Смена статуса выполняется, только если переход из текущего статуса
+        допустим, условие проверяется в том же запросе.
+
+        Returns:
+            Optional[OrderModel]: Заказ или None, если заказа нет
+            или переход в status недопустим.
+        """
+        values = {}
         if user_id is not None:
-            order.user_id = user_id
+            values['user_id'] = user_id
         if product_id is not None:
-            order.product_id = product_id
+            values['product_id'] = product_id
+        if status is not None:
+            values['status'] = status
+        if not values:
+            return await self.get_order(order_id)
+
+        query = update(OrderModel).where(OrderModel.order_id == order_id)
         if status is not None:
-            order.status = status
-        
+            query = query.where(OrderModel.status.in_(allowed_sources(status)))
+
+        result = await self.db.execute(
+            query.values(**values)
+            .returning(OrderModel)
+            .execution_options(populate_existing=True)
+        )
+        order = result.scalar_one_or_none()
         await self.db.commit()
-        await self.db.refresh(order)
         return order
     
     async def delete_order(self, order_id: UUID) -> bool:
@@ -78,3 +299,147 @@ class OrderDAO:
         )
         await self.db.commit()
         return result.rowcount > 0
+
+
+class OrderStatsDAO:
+    """Класс для работы со сводной статистикой заказов."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_stats(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        product_id: Optional[int] = None,
+        status: Optional[OrderStatusEnum] = None,
+    ) -> List[OrderStatsModel]:
+        """Число заказов по дням, услугам и статусам.
+
+        Args:
+            date_from: Первый день
+            date_to: Последний день включительно
+            product_id: Только заказы услуги
+            status: Только заказы в статусе
+        """
+        query = select(OrderStatsModel).where(OrderStatsModel.count > 0)
+        if date_from is not None:
+            query = query.where(OrderStatsModel.day >= date_from)
+        if date_to is not None:
+            query = query.where(OrderStatsModel.day <= date_to)
+        if product_id is not None:
+            query = query.where(OrderStatsModel.product_id == product_id)
+        if status is not None:
+            query = query.where(OrderStatsModel.status == status)
+        query = query.order_by(
+            OrderStatsModel.day, OrderStatsModel.product_id, OrderStatsModel.status
+        )
+
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def rebuild(self) -> int:
+        """Пересчет статистики по всем заказам.
+
+        На время пересчета изменения заказов блокируются,
+        чтобы триггеры не меняли статистику параллельно.
+
+        Returns:
+            int: Число строк статистики.
+        """
+        day = cast(func.timezone('UTC', OrderModel.created_to), Date)
+        try:
+            await self.db.execute(select(func.set_config('statement_timeout', '0', True)))
+            await self.db.execute(text('LOCK TABLE orders IN SHARE MODE'))
+            await self.db.execute(delete(OrderStatsModel))
+            result = await self.db.execute(
+                insert(OrderStatsModel).from_select(
+                    ['day', 'product_id', 'status', 'count'],
+                    select(
+                        day, OrderModel.product_id, OrderModel.status, func.count()
+                    ).group_by(day, OrderModel.product_id, OrderModel.status)
+                )
+            )
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return result.rowcount
+
+
+class IdempotencyDAO:
+    """Класс для работы с ключами идемпотентности."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def claim(
+        self,
+        key: str,
+        fingerprint: str,
+        lock_timeout: float
+    ) -> Optional[IdempotencyKeyModel]:
+        """Захват ключа для обработки запроса.
+
+        Ключ вставляется в незавершенной транзакции, которая остается
+        открытой до complete(). Параллельный запрос с тем же ключом ждет
+        на вставке, пока первый не завершится, и получает его ответ.
+        Если первый запрос откатился, ключ захватывает второй.
+
+        Args:
+            key: Значение Idempotency-Key
+            fingerprint: Хэш запроса
+            lock_timeout: Сколько секунд ждать запрос с тем же ключом
+
+        Returns:
+            Optional[IdempotencyKeyModel]: None, если ключ захвачен,
+            иначе сохраненный ответ.
+
+        Raises:
+            DBAPIError: Запрос с тем же ключом не завершился за lock_timeout.
+        """
+        await self.db.execute(select(func.set_config(
+            'lock_timeout', f'{int(lock_timeout * 1000)}ms', True
+        )))
+        result = await self.db.execute(
+            pg_insert(IdempotencyKeyModel)
+            .values(key=key, fingerprint=fingerprint)
+            .on_conflict_do_nothing(index_elements=['key'])
+            .returning(IdempotencyKeyModel.key)
+        )
+        if result.scalar_one_or_none() is not None:
+            return None
+
+        result = await self.db.execute(
+            select(IdempotencyKeyModel).where(IdempotencyKeyModel.key == key)
+        )
+        stored = result.scalar_one_or_none()
+        await self.db.commit()
+        if stored is None:
+            # Ключ удален очисткой между вставкой и чтением
+            return await self.claim(key, fingerprint, lock_timeout)
+        return stored
+
+    async def complete(
+        self,
+        key: str,
+        status_code: int,
+        content_type: Optional[str],
+        body: bytes
+    ) -> None:
+        """Сохранение ответа на захваченный ключ и освобождение ожидающих."""
+        await self.db.execute(
+            update(IdempotencyKeyModel)
+            .where(IdempotencyKeyModel.key == key)
+            .values(status_code=status_code, content_type=content_type, body=body)
+        )
+        await self.db.commit()
+
+    async def delete_expired(self, ttl: timedelta) -> int:
+        """Удаление ключей старше ttl. Возвращает число удаленных ключей."""
+        result = await self.db.execute(
+            delete(IdempotencyKeyModel)
+            .where(IdempotencyKeyModel.created_to < func.now() - ttl)
+        )
+        await self.db.commit()
+        return result.rowcount
@@ -1,10 +1,11 @@
 """Модуль моделей SQLAlchemy для заказов."""
-from datetime import datetime
+from datetime import date, datetime
 import uuid
 
 from app.enums import OrderStatusEnum
 
-from sqlalchemy import Integer, DateTime, func, UUID
+from sqlalchemy import Integer, Date, DateTime, func, UUID, Index, String, \
+    LargeBinary
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import ENUM as PgEnum
@@ -25,11 +26,19 @@ class OrderModel(BaseModel):
         product_id: id услуги
         status: Статус заказа
         booking_time: Время записи на обслуживание
+        duration: Длительность записи в минутах
         created_to: Дата и время создания заказа
         update_to: Дата и время обновления заказа
     """
 
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Индексы под курсорную пагинацию и фильтры GET /orders
+        Index('ix_orders_created_to_id', 'created_to', 'id'),
+        Index('ix_orders_user_id_created_to_id', 'user_id', 'created_to', 'id'),
+        Index('ix_orders_status_created_to_id', 'status', 'created_to', 'id'),
+        Index('ix_orders_booking_time', 'booking_time'),
+    )
 
     id_: Mapped[int] = mapped_column(
         name='id',
@@ -43,6 +52,8 @@ class OrderModel(BaseModel):
         type_=UUID(as_uuid=True),
         default=uuid.uuid4,
         nullable=False,
+        unique=True,
+        index=True,
     )
     user_id: Mapped[int] = mapped_column(
         name='user_id',
@@ -68,6 +79,11 @@ class OrderModel(BaseModel):
         type_=DateTime(timezone=True),
         nullable=True,
     )
+    duration: Mapped[int] = mapped_column(
+        name='duration',
+        type_=Integer,
+        nullable=True,
+    )
     created_to: Mapped[datetime] = mapped_column(
         name='created_to',
         type_=DateTime(timezone=True),
@@ -79,3 +95,92 @@ class OrderModel(BaseModel):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+
+class OrderStatsModel(BaseModel):
+    """Число заказов по дням создания (UTC), услугам и статусам.
+
+    Обновляется триггерами таблицы orders в той же транзакции,
+    что и изменение заказов.
+
+    Args:
+        day: День создания заказов
+        product_id: id услуги
+        status: Статус заказов
+        count: Число заказов
+    """
+
+    __tablename__ = 'order_stats'
+
+    day: Mapped[date] = mapped_column(
+        name='day',
+        type_=Date,
+        primary_key=True,
+    )
+    product_id: Mapped[int] = mapped_column(
+        name='product_id',
+        type_=Integer,
+        primary_key=True,
+    )
+    status: Mapped[OrderStatusEnum] = mapped_column(
+        PgEnum(
+            OrderStatusEnum,
+            name='order_status',
+            create_type=False,
+        ),
+        name='status',
+        primary_key=True,
+    )
+    count: Mapped[int] = mapped_column(
+        name='count',
+        type_=Integer,
+        nullable=False,
+        default=0,
+    )
+
+
+class IdempotencyKeyModel(BaseModel):
+    """Ответы на запросы с заголовком Idempotency-Key.
+
+    Args:
+        key: Значение Idempotency-Key
+        fingerprint: Хэш метода, пути, параметров и тела запроса
+        status_code: Код статуса ответа
+        content_type: Content-Type ответа
+        body: Тело ответа
+        created_to: Дата и время первого запроса
+    """
+
+    __tablename__ = 'idempotency_keys'
+
+    key: Mapped[str] = mapped_column(
+        name='key',
+        type_=String(length=255),
+        primary_key=True,
+    )
+    fingerprint: Mapped[str] = mapped_column(
+        name='fingerprint',
+        type_=String(length=64),
+        nullable=False,
+    )
+    status_code: Mapped[int] = mapped_column(
+        name='status_code',
+        type_=Integer,
+        nullable=True,
+    )
+    content_type: Mapped[str] = mapped_column(
+        name='content_type',
+        type_=String(length=100),
+        nullable=True,
+    )
+    body: Mapped[bytes] = mapped_column(
+        name='body',
+        type_=LargeBinary,
+        nullable=True,
+    )
+    created_to: Mapped[datetime] = mapped_column(
+        name='created_to',
+        type_=DateTime(timezone=True),
+        server_default=func.now(),
+        index=True,
+    )
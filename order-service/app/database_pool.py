@@ -0,0 +1,69 @@
+"""Пул соединений с БД с метриками ожидания соединения."""
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, считающий время получения соединения из пула.
+
+    Время включает ожидание свободного соединения и открытие нового,
+    если пул еще не заполнен. Превышения pool_timeout считаются отдельно.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self) -> 'MeteredQueuePool':
+        # Пул пересоздается при dispose(); метрики накапливаются дальше
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.wait_total, pool.wait_max = self.wait_total, self.wait_max
+        return pool
+
+
+def pool_stats(pool: Pool, max_overflow: int) -> dict:
+    """Состояние пула для мониторинга.
+
+    saturation: доля занятых соединений от максимума (pool_size + max_overflow).
+
+    Args:
+        pool: Пул соединений движка
+        max_overflow: max_overflow из настроек, с которыми создан пул
+    """
+    if not isinstance(pool, MeteredQueuePool):
+        return {'pool': type(pool).__name__}
+
+    capacity = pool.size() + max(max_overflow, 0)
+    in_use = pool.checkedout()
+    return {
+        'pool': type(pool).__name__,
+        'size': pool.size(),
+        'max_overflow': max_overflow,
+        'in_use': in_use,
+        'idle': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'saturation': round(in_use / capacity, 3) if capacity else None,
+        'checkouts': pool.checkouts,
+        'timeouts': pool.timeouts,
+        'wait_avg_ms': round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+        'wait_max_ms': round(pool.wait_max * 1000, 3),
+    }
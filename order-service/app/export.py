@@ -0,0 +1,70 @@
+"""Потоковая выгрузка заказов в NDJSON и CSV."""
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+from uuid import UUID
+
+import orjson
+
+# Поля заказа в выгрузке и порядок колонок CSV
+EXPORT_FIELDS = (
+    'order_id',
+    'user_id',
+    'product_id',
+    'status',
+    'booking_time',
+    'duration',
+    'created_to',
+    'update_to',
+)
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def _json_default(value):
+    """Сериализация значений, которые orjson не умеет кодировать."""
+    # asyncpg возвращает собственный подкласс UUID, а orjson
+    # кодирует только uuid.UUID
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+async def ndjson_chunks(partitions: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    """Строки NDJSON, по одному куску на пачку строк курсора.
+
+    orjson сам кодирует datetime и перечисления и добавляет перевод
+    строки, поэтому строки не собираются через str.
+    """
+    async for rows in partitions:
+        yield b''.join(
+            orjson.dumps(
+                row._asdict(),
+                default=_json_default,
+                option=orjson.OPT_APPEND_NEWLINE
+            )
+            for row in rows
+        )
+
+
+async def csv_chunks(partitions: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    """CSV с заголовком, по одному куску на пачку строк курсора."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue().encode()
+
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in row
+            ] for row in rows
+        )
+        yield buffer.getvalue().encode()
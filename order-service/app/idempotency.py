@@ -0,0 +1,143 @@
+"""Повтор запросов с заголовком Idempotency-Key без повторного выполнения.
+
+Модуль, IdempotencyDAO и IdempotencyKeyModel совпадают с копиями
+в user-service: у сервисов нет общего пакета, поэтому изменения
+вносятся в обе копии.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+from datetime import timedelta
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from app.database.dao import IdempotencyDAO
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Сколько хранится ответ на ключ
+IDEMPOTENCY_TTL = timedelta(hours=24)
+# Сколько секунд повтор ждет завершения первого запроса с тем же ключом
+IDEMPOTENCY_LOCK_TIMEOUT = 30.0
+# Период удаления устаревших ключей в секундах
+IDEMPOTENCY_SWEEP_INTERVAL = 600.0
+MAX_KEY_LENGTH = 255
+# SQLSTATE истечения lock_timeout в PostgreSQL
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+def request_fingerprint(request: Request, body: bytes) -> str:
+    """Хэш метода, пути, параметров и тела запроса."""
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, request.url.query):
+        digest.update(part.encode())
+        digest.update(b'\0')
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """Обработка Idempotency-Key для выбранных маршрутов.
+
+    Первый запрос с ключом выполняется и его ответ сохраняется в таблице
+    idempotency_keys. Повторы получают сохраненный ответ без обращения
+    к обработчику, а параллельные повторы ждут завершения первого запроса.
+    Ответы 5xx не сохраняются, чтобы запрос можно было повторить.
+
+    Args:
+        session_maker: Фабрика сессий БД
+        routes: Пары (метод, путь); путь может содержать параметры,
+            например '/users/{user_id}/bonus'
+    """
+
+    def __init__(
+        self,
+        app,
+        session_maker: async_sessionmaker,
+        routes: frozenset[tuple[str, str]]
+    ):
+        super().__init__(app)
+        self.session_maker = session_maker
+        self.routes = routes
+        self._patterns = [
+            (method, re.compile(re.sub(r'\{[^/]+\}', '[^/]+', path) + '$'))
+            for method, path in routes
+        ]
+
+    def _is_tracked(self, request: Request) -> bool:
+        """Обрабатывается ли Idempotency-Key для маршрута запроса."""
+        return any(
+            request.method == method and pattern.match(request.url.path)
+            for method, pattern in self._patterns
+        )
+
+    async def dispatch(
+        self,
+        request: Request,
+        call_next: RequestResponseEndpoint
+    ) -> Response:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None or not self._is_tracked(request):
+            return await call_next(request)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return JSONResponse(
+                {'detail': f'{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters'},
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request, await request.body())
+        async with self.session_maker() as session:
+            dao = IdempotencyDAO(session)
+            try:
+                stored = await dao.claim(key, fingerprint, IDEMPOTENCY_LOCK_TIMEOUT)
+            except DBAPIError as exc:
+                if getattr(exc.orig, 'sqlstate', None) != LOCK_NOT_AVAILABLE:
+                    raise
+                return JSONResponse(
+                    {'detail': f'Request with this {IDEMPOTENCY_HEADER} is in progress'},
+                    status_code=status.HTTP_409_CONFLICT
+                )
+
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    return JSONResponse(
+                        {'detail': f'{IDEMPOTENCY_HEADER} was used with a different request'},
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                return Response(
+                    stored.body,
+                    status_code=stored.status_code,
+                    media_type=stored.content_type,
+                    headers={'Idempotent-Replayed': 'true'}
+                )
+
+            response = await call_next(request)
+            body = b''.join([chunk async for chunk in response.body_iterator])
+            if response.status_code < 500:
+                await dao.complete(
+                    key, response.status_code,
+                    response.headers.get('content-type'), body
+                )
+            else:
+                await session.rollback()
+
+        stored_response = Response(body, status_code=response.status_code)
+        stored_response.raw_headers = response.raw_headers
+        return stored_response
+
+
+async def sweep_idempotency_keys(session_maker: async_sessionmaker) -> None:
+    """Периодическое удаление ключей старше IDEMPOTENCY_TTL."""
+    while True:
+        try:
+            async with session_maker() as session:
+                await IdempotencyDAO(session).delete_expired(IDEMPOTENCY_TTL)
+        except SQLAlchemyError:
+            logger.exception('Failed to delete expired idempotency keys')
+        await asyncio.sleep(IDEMPOTENCY_SWEEP_INTERVAL)
@@ -1,7 +1,42 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.api import product_client, router, user_client
+from app.database_config import idempotency_session_maker, settings
+from app.idempotency import IdempotencyMiddleware, sweep_idempotency_keys
+from app.read_replica import ReadYourWritesMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Фоновая очистка ключей идемпотентности и закрытие соединений
+    с другими сервисами при остановке."""
+    sweeper = asyncio.create_task(sweep_idempotency_keys(idempotency_session_maker))
+    yield
+    sweeper.cancel()
+    with suppress(asyncio.CancelledError):
+        await sweeper
+    await user_client.close()
+    await product_client.close()
+
+app = FastAPI(
+    title='Order Service',
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
 
-from app.api import router
+app.add_middleware(
+    IdempotencyMiddleware,
+    session_maker=idempotency_session_maker,
+    routes=frozenset({('POST', '/orders')})
+)
 
-app = FastAPI(title='Order Service')
+app.add_middleware(
+    ReadYourWritesMiddleware,
+    window=settings.read_your_writes_window
+)
 
 app.include_router(router)
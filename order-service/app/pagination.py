@@ -0,0 +1,35 @@
+"""Курсорная (keyset) пагинация списка заказов."""
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(created_to: datetime, id_: int) -> str:
+    """Непрозрачный курсор, указывающий на позицию после заказа.
+
+    Args:
+        created_to: Дата и время создания последнего заказа страницы
+        id_: id последнего заказа страницы
+
+    Returns:
+        str: Курсор для следующего запроса.
+    """
+    raw = json.dumps([created_to.isoformat(), id_]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Разбор курсора, полученного от encode_cursor.
+
+    Raises:
+        ValueError: Курсор поврежден.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_to, id_ = json.loads(raw)
+        return datetime.fromisoformat(created_to), int(id_)
+    except (ValueError, TypeError) as exc:
+        raise ValueError('Invalid cursor') from exc
@@ -0,0 +1,77 @@
+"""Pydantic-схемы заказов."""
+from datetime import date, datetime
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+from app.enums import OrderStatusEnum
+
+
+class OrderCreateSchema(BaseModel):
+    """Данные для создания заказа.
+
+    Args:
+        user_id: id пользователя
+        product_id: id услуги
+        status: Статус заказа
+        booking_time: Время записи на обслуживание
+    """
+
+    user_id: int
+    product_id: int
+    status: OrderStatusEnum = OrderStatusEnum.CREATED
+    booking_time: datetime | None = None
+
+
+class OrderSchema(BaseModel):
+    """Заказ в ответах API.
+
+    Args:
+        order_id: id заказа (UUID)
+        user_id: id пользователя
+        product_id: id услуги
+        status: Статус заказа
+        booking_time: Время записи на обслуживание
+        created_to: Дата и время создания заказа
+        update_to: Дата и время обновления заказа
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    order_id: UUID
+    user_id: int
+    product_id: int
+    status: OrderStatusEnum
+    booking_time: datetime | None = None
+    created_to: datetime
+    update_to: datetime
+
+
+class OrderStatsSchema(BaseModel):
+    """Число заказов за день по услуге и статусу.
+
+    Args:
+        day: День создания заказов (UTC)
+        product_id: id услуги
+        status: Статус заказов
+        count: Число заказов
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    day: date
+    product_id: int
+    status: OrderStatusEnum
+    count: int
+
+
+class SlotSchema(BaseModel):
+    """Свободный слот записи.
+
+    Args:
+        start: Начало слота
+        end: Окончание услуги, начатой в этот слот
+    """
+
+    start: datetime
+    end: datetime
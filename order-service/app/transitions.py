@@ -0,0 +1,27 @@
+"""Допустимые переходы между статусами заказа."""
+from app.enums import OrderStatusEnum
+
+# Статус, в который переводится заказ -> статусы, из которых это возможно.
+# Выполненный и отмененный заказы больше не меняют статус.
+ORDER_TRANSITIONS: dict[OrderStatusEnum, frozenset[OrderStatusEnum]] = {
+    OrderStatusEnum.CREATED: frozenset(),
+    OrderStatusEnum.IN_PROGRESS: frozenset({OrderStatusEnum.CREATED}),
+    OrderStatusEnum.COMPLETED: frozenset({
+        OrderStatusEnum.CREATED,
+        OrderStatusEnum.IN_PROGRESS,
+    }),
+    OrderStatusEnum.CANCELLED: frozenset({
+        OrderStatusEnum.CREATED,
+        OrderStatusEnum.IN_PROGRESS,
+    }),
+}
+
+
+def allowed_sources(target: OrderStatusEnum) -> frozenset[OrderStatusEnum]:
+    """Статусы, из которых заказ можно перевести в target."""
+    return ORDER_TRANSITIONS[target]
+
+
+def can_transition(source: OrderStatusEnum, target: OrderStatusEnum) -> bool:
+    """Можно ли перевести заказ из source в target."""
+    return source in ORDER_TRANSITIONS[target]
@@ -0,0 +1,86 @@
+"""Бенчмарк поиска заказа по order_id до и после уникального индекса.
+
+Заполняет временную копию таблицы orders и замеряет задержку запроса
+SELECT ... WHERE order_id = :order_id без индекса и с индексом.
+Рабочая таблица orders не изменяется.
+
+Запуск из каталога order-service с переменными окружения сервиса:
+    python -m benchmarks.bench_order_lookup --rows 1000000 --lookups 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config.database import DatabaseSettings
+
+TABLE = 'orders_lookup_bench'
+
+
+async def measure(conn, order_ids: list, label: str) -> None:
+    """Замер задержек поиска по списку order_id."""
+    query = text(f'SELECT * FROM {TABLE} WHERE order_id = :order_id')
+    timings = []
+    for order_id in order_ids:
+        started = time.perf_counter()
+        (await conn.execute(query, {'order_id': order_id})).one()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(
+        f'{label:<14} median {statistics.median(timings):9.3f} ms'
+        f'   p95 {timings[int(len(timings) * 0.95) - 1]:9.3f} ms'
+        f'   max {timings[-1]:9.3f} ms'
+    )
+
+
+async def main(rows: int, lookups: int) -> None:
+    load_dotenv()
+    engine = create_async_engine(DatabaseSettings().db_url)
+
+    async with engine.connect() as conn:
+        await conn.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+        await conn.execute(text(
+            f'CREATE TABLE {TABLE} (LIKE orders INCLUDING DEFAULTS)'
+        ))
+        await conn.execute(text(
+            f"INSERT INTO {TABLE} (id, order_id, user_id, product_id, status) "
+            f"SELECT i, gen_random_uuid(), i % 10000, i % 50, 'CREATED' "
+            f"FROM generate_series(1, :rows) AS i"
+        ), {'rows': rows})
+        await conn.execute(text(f'ANALYZE {TABLE}'))
+        await conn.commit()
+
+        sample = (await conn.execute(text(
+            f'SELECT order_id FROM {TABLE} TABLESAMPLE SYSTEM (1) LIMIT :n'
+        ), {'n': lookups})).scalars().all()
+        order_ids = random.sample(sample, min(lookups, len(sample)))
+        print(f'rows: {rows}, lookups: {len(order_ids)}')
+
+        await measure(conn, order_ids, 'seq scan')
+
+        await conn.execute(text(
+            f'CREATE UNIQUE INDEX ix_{TABLE}_order_id ON {TABLE} (order_id)'
+        ))
+        await conn.execute(text(f'ANALYZE {TABLE}'))
+        await conn.commit()
+
+        await measure(conn, order_ids, 'unique index')
+
+        await conn.execute(text(f'DROP TABLE {TABLE}'))
+        await conn.commit()
+
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.lookups))
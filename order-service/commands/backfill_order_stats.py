@@ -0,0 +1,22 @@
+"""Пересчет сводной статистики заказов (таблица order_stats).
+
+Статистика поддерживается триггерами таблицы orders; команда нужна,
+чтобы заполнить ее по существующим данным или исправить расхождения.
+
+Запуск из каталога order-service с переменными окружения сервиса:
+    python -m commands.backfill_order_stats
+"""
+import asyncio
+
+from app.database_config import async_session_maker
+from app.database.dao import OrderStatsDAO
+
+
+async def main() -> None:
+    async with async_session_maker() as session:
+        rows = await OrderStatsDAO(session).rebuild()
+    print(f'order_stats rebuilt: {rows} rows')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""create order_id unique index
+
+Revision ID: 8c2e4b7a9d13
+Revises: f57ad6d8eb87
+Create Date: 2026-10-18 13:02:17.540921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2e4b7a9d13'
+down_revision: Union[str, Sequence[str], None] = 'f57ad6d8eb87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицу,
+    # но не может выполняться внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_orders_order_id'),
+            'orders',
+            ['order_id'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_orders_order_id'),
+            table_name='orders',
+            postgresql_concurrently=True,
+        )
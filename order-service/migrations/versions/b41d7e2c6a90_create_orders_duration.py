@@ -0,0 +1,28 @@
+"""create orders duration
+
+Revision ID: b41d7e2c6a90
+Revises: 8c2e4b7a9d13
+Create Date: 2026-10-18 14:02:37.516820
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d7e2c6a90'
+down_revision: Union[str, Sequence[str], None] = '8c2e4b7a9d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('duration', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'duration')
@@ -0,0 +1,102 @@
+"""create order stats
+
+Revision ID: d7a3f19c5e28
+Revises: b41d7e2c6a90
+Create Date: 2026-10-18 15:40:12.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3f19c5e28'
+down_revision: Union[str, Sequence[str], None] = 'b41d7e2c6a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Триггеры уровня оператора: изменения одного INSERT/UPDATE/DELETE
+# (в том числе пакетного) агрегируются и применяются к order_stats
+# одним INSERT ... ON CONFLICT. Строки обновляются в порядке ключа,
+# чтобы параллельные транзакции не блокировали друг друга крест-накрест.
+APPLY_FUNCTION = """
+CREATE FUNCTION order_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO order_stats AS s (day, product_id, status, count)
+        SELECT (created_to AT TIME ZONE 'UTC')::date, product_id, status, count(*)
+        FROM new_rows
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (day, product_id, status)
+        DO UPDATE SET count = s.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO order_stats AS s (day, product_id, status, count)
+        SELECT (created_to AT TIME ZONE 'UTC')::date, product_id, status, -count(*)
+        FROM old_rows
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (day, product_id, status)
+        DO UPDATE SET count = s.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO order_stats AS s (day, product_id, status, count)
+        SELECT day, product_id, status, sum(delta)
+        FROM (
+            SELECT (created_to AT TIME ZONE 'UTC')::date AS day, product_id, status, 1 AS delta
+            FROM new_rows
+            UNION ALL
+            SELECT (created_to AT TIME ZONE 'UTC')::date, product_id, status, -1
+            FROM old_rows
+        ) AS changes
+        GROUP BY 1, 2, 3
+        HAVING sum(delta) <> 0
+        ORDER BY 1, 2, 3
+        ON CONFLICT (day, product_id, status)
+        DO UPDATE SET count = s.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+TRIGGERS = {
+    'order_stats_insert': 'AFTER INSERT ON orders REFERENCING NEW TABLE AS new_rows',
+    'order_stats_update': 'AFTER UPDATE ON orders REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'order_stats_delete': 'AFTER DELETE ON orders REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('order_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM('CREATED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', name='order_status', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'product_id', 'status')
+    )
+    op.execute(APPLY_FUNCTION)
+    for name, definition in TRIGGERS.items():
+        op.execute(
+            f'CREATE TRIGGER {name} {definition} '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION order_stats_apply()'
+        )
+    # Начальное заполнение по существующим заказам
+    op.execute(
+        "INSERT INTO order_stats (day, product_id, status, count) "
+        "SELECT (created_to AT TIME ZONE 'UTC')::date, product_id, status, count(*) "
+        "FROM orders GROUP BY 1, 2, 3"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f'DROP TRIGGER {name} ON orders')
+    op.execute('DROP FUNCTION order_stats_apply()')
+    op.drop_table('order_stats')
@@ -0,0 +1,43 @@
+"""create orders pagination indexes
+
+Revision ID: f57ad6d8eb87
+Revises: 335b2b232163
+Create Date: 2026-10-18 12:10:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f57ad6d8eb87'
+down_revision: Union[str, Sequence[str], None] = '335b2b232163'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Индексы для keyset-пагинации и фильтров списка заказов
+INDEXES = (
+    ('ix_orders_created_to_id', ['created_to', 'id']),
+    ('ix_orders_user_id_created_to_id', ['user_id', 'created_to', 'id']),
+    ('ix_orders_status_created_to_id', ['status', 'created_to', 'id']),
+    ('ix_orders_booking_time', ['booking_time']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицу,
+    # но не может выполняться внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'orders', columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='orders', postgresql_concurrently=True, if_exists=True)
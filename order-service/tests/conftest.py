@@ -1,11 +1,19 @@
+import os
+
+# Соединения пула привязаны к циклу событий, а TestClient запускает свой,
+# поэтому в тестах каждая сессия открывает отдельное соединение
+os.environ.setdefault('ORDER_DB_NULL_POOL', 'true')
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
+from app.api import get_product_client, get_user_client
 from app.database_config import async_session_maker
 from app.database.models import BaseModel
 from app.main import app
+from tests.stubs import make_clients, make_upstream
 
 # Тестовая база данных
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test_db.db"
@@ -38,7 +46,12 @@ async def clean_db(db_session):
 def http_client() -> TestClient:
     """Фикстура для тестового клиента FastAPI.
 
+    Сервисы пользователей и услуг заменены заглушкой из tests.stubs.
+
     Returns:
         TestClient: Клиент для тестирования FastAPI приложений.
     """
+    users, products = make_clients(make_upstream())
+    app.dependency_overrides[get_user_client] = lambda: users
+    app.dependency_overrides[get_product_client] = lambda: products
     return TestClient(app)
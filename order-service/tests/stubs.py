@@ -0,0 +1,70 @@
+"""Заглушки сервисов пользователей и услуг для тестов."""
+from collections import Counter
+
+import httpx
+from fastapi import FastAPI, HTTPException, Query
+
+from app.clients import ProductClient, UserClient
+
+USERS = {
+    1: {'id_': 1, 'first_name': 'Иван', 'last_name': 'Иванов'},
+    2: {'id_': 2, 'first_name': 'Петр', 'last_name': 'Петров'},
+}
+PRODUCTS = {
+    1: {'id_': 1, 'name': 'Замена масла', 'schedule_time': 60, 'is_active': True},
+    2: {'id_': 2, 'name': 'Шиномонтаж', 'schedule_time': 30, 'is_active': True},
+    3: {'id_': 3, 'name': 'Покраска', 'schedule_time': 240, 'is_active': False},
+}
+
+
+def make_upstream(users: dict = USERS, products: dict = PRODUCTS) -> FastAPI:
+    """Приложение, отвечающее как сервисы пользователей и услуг.
+
+    Число запросов по каждому пути хранится в app.state.requests;
+    пакетный запрос учитывается и по пути ресурса, и по каждому id.
+    """
+    upstream = FastAPI()
+    upstream.state.requests = Counter()
+
+    def get_many(resource: str, records: dict, ids: str) -> dict:
+        upstream.state.requests[resource] += 1
+        ids = [int(id_) for id_ in ids.split(',')]
+        for id_ in ids:
+            upstream.state.requests[f'{resource}/{id_}'] += 1
+        return {
+            'items': [records[id_] for id_ in ids if id_ in records],
+            'missing': [id_ for id_ in ids if id_ not in records],
+        }
+
+    @upstream.get('/users')
+    async def get_users(ids: str = Query(...)) -> dict:
+        return get_many('/users', users, ids)
+
+    @upstream.get('/products')
+    async def get_products(ids: str = Query(...)) -> dict:
+        return get_many('/products', products, ids)
+
+    @upstream.get('/users/{user_id}')
+    async def get_user(user_id: int) -> dict:
+        upstream.state.requests[f'/users/{user_id}'] += 1
+        if user_id not in users:
+            raise HTTPException(status_code=404, detail='User not found')
+        return users[user_id]
+
+    @upstream.get('/products/{product_id}')
+    async def get_product(product_id: int) -> dict:
+        upstream.state.requests[f'/products/{product_id}'] += 1
+        if product_id not in products:
+            raise HTTPException(status_code=404, detail='Product not found')
+        return products[product_id]
+
+    return upstream
+
+
+def make_clients(upstream: FastAPI) -> tuple[UserClient, ProductClient]:
+    """Клиенты сервисов, отправляющие запросы в заглушку."""
+    transport = httpx.ASGITransport(app=upstream)
+    return (
+        UserClient('http://users', transport=transport),
+        ProductClient('http://products', transport=transport),
+    )
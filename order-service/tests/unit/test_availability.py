@@ -0,0 +1,55 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from app.availability import BookingIndex, free_slots
+
+TZ = timezone(timedelta(hours=5))
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 3, 2, hour, minute, tzinfo=TZ)
+
+
+def test_max_load_counts_overlapping_bookings():
+    index = BookingIndex([
+        (at(9), at(11)),
+        (at(10), at(12)),
+        (at(11), at(13)),
+    ])
+
+    assert index.max_load(at(8), at(9)) == 0
+    assert index.max_load(at(9), at(10)) == 1
+    assert index.max_load(at(10), at(12)) == 2
+    assert index.max_load(at(12, 30), at(14)) == 1
+    assert index.max_load(at(13), at(14)) == 0
+
+
+def test_bookings_not_overlapping_each_other_share_one_post():
+    index = BookingIndex([(at(9), at(10)), (at(10), at(11))])
+
+    assert index.is_free(at(9), at(11), capacity=2)
+    assert not index.is_free(at(9), at(11), capacity=1)
+
+
+def test_free_slots_honor_duration_and_capacity():
+    index = BookingIndex([
+        (at(9), at(10)),
+        (at(9), at(11)),
+    ])
+
+    slots = list(free_slots(
+        index,
+        date(2026, 3, 2),
+        date(2026, 3, 2),
+        duration=timedelta(hours=1),
+        capacity=2,
+        day_start=time(9, 0),
+        day_end=time(12, 0),
+        step=timedelta(minutes=30),
+        tz=TZ,
+    ))
+
+    assert slots == [
+        (at(10), at(11)),
+        (at(10, 30), at(11, 30)),
+        (at(11), at(12)),
+    ]
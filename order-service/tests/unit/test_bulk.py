@@ -0,0 +1,93 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import DBAPIError, TimeoutError
+
+from app.api import insert_bulk_chunk
+from app.schemas import OrderCreateSchema
+
+
+class BulkDAO:
+    """OrderDAO, отклоняющий INSERT целиком, если в нем есть заказ с user_id из rejected."""
+
+    def __init__(self, rejected: set[int], error: Exception | None = None):
+        self.rejected = rejected
+        self.error = error
+        self.inserts = []
+        self.rows = []
+
+    async def create_orders(self, orders: list[dict]) -> list[SimpleNamespace]:
+        self.inserts.append(len(orders))
+        if self.error is not None:
+            raise self.error
+        if any(order['user_id'] in self.rejected for order in orders):
+            raise DBAPIError('INSERT', {}, Exception('value out of range'))
+        self.rows.extend(orders)
+        now = datetime(2026, 1, 1)
+        return [
+            SimpleNamespace(order_id=uuid4(), created_to=now, update_to=now, **order)
+            for order in orders
+        ]
+
+
+def make_chunk(user_ids: list[int]) -> list[tuple[int, OrderCreateSchema]]:
+    return [
+        (index, OrderCreateSchema(user_id=user_id, product_id=1))
+        for index, user_id in enumerate(user_ids)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_chunk_inserted_at_once():
+    dao = BulkDAO(set())
+
+    results = await insert_bulk_chunk(dao, make_chunk(list(range(1, 9))), {})
+
+    assert [result['order'].user_id for result in results] == list(range(1, 9))
+    assert dao.inserts == [8]
+
+
+@pytest.mark.asyncio
+async def test_rejected_items_isolated_by_bisection():
+    dao = BulkDAO({3, 7})
+
+    results = await insert_bulk_chunk(dao, make_chunk(list(range(1, 9))), {})
+
+    assert [result['index'] for result in results] == list(range(8))
+    assert [result['index'] for result in results if 'errors' in result] == [2, 6]
+    assert [result['order'].user_id for result in results if 'order' in result] == [1, 2, 4, 5, 6, 8]
+    assert results[2]['errors'][0]['type'] == 'db_error'
+    # 8 -> 4 + 4 -> 2 + 2 + 2 + 2 -> 1 + 1 + 1 + 1
+    assert len(dao.inserts) == 11
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('error', [
+    TimeoutError(),
+    DBAPIError('INSERT', {}, Exception('connection lost'), connection_invalidated=True),
+])
+async def test_connection_errors_not_retried(error):
+    dao = BulkDAO(set(), error)
+
+    results = await insert_bulk_chunk(dao, make_chunk(list(range(1, 9))), {})
+
+    assert all(result['errors'][0]['type'] == 'db_error' for result in results)
+    assert len(results) == 8
+    assert dao.inserts == [8]
+
+
+@pytest.mark.asyncio
+async def test_bookings_store_product_duration():
+    dao = BulkDAO(set())
+    booking_time = datetime(2026, 1, 1, 10)
+    chunk = [
+        (0, OrderCreateSchema(user_id=1, product_id=1, booking_time=booking_time)),
+        (1, OrderCreateSchema(user_id=2, product_id=2, booking_time=booking_time)),
+        (2, OrderCreateSchema(user_id=3, product_id=1)),
+    ]
+
+    await insert_bulk_chunk(dao, chunk, {1: 60, 2: 30})
+
+    assert [row['duration'] for row in dao.rows] == [60, 30, None]
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.clients import ProductClient, ServiceUnavailableError
+from tests.stubs import make_clients, make_upstream
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_coalesced_and_cached():
+    upstream = make_upstream()
+    users, _ = make_clients(upstream)
+
+    results = await asyncio.gather(*(users.get_many([1, 2, 404]) for _ in range(10)))
+    again = await users.get_many([1, 2])
+
+    assert all(result[1]['id_'] == 1 and result[404] is None for result in results)
+    assert again[2]['id_'] == 2
+    assert upstream.state.requests['/users/1'] == 1
+    assert upstream.state.requests['/users/2'] == 1
+    assert upstream.state.requests['/users'] == 1
+    # Отсутствующие id не кэшируются
+    assert (await users.get(404)) is None
+    assert upstream.state.requests['/users/404'] == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_ids_are_fetched_in_batches():
+    upstream = make_upstream()
+    users, _ = make_clients(upstream)
+    users.batch_size = 2
+
+    found = await users.get_many([1, 2, 3, 404, 405])
+
+    assert found[1]['id_'] == 1 and found[2]['id_'] == 2
+    assert found[3] is None and found[405] is None
+    assert upstream.state.requests['/users'] == 3
+
+
+@pytest.mark.asyncio
+async def test_product_availability_and_duration():
+    _, products = make_clients(make_upstream())
+
+    found = await products.get_many([1, 3, 404])
+
+    assert ProductClient.is_available(found[1])
+    assert not ProductClient.is_available(found[3])
+    assert not ProductClient.is_available(found[404])
+    assert await products.get_duration(1) == 60
+
+
+@pytest.mark.asyncio
+async def test_product_durations_loaded_in_one_request():
+    upstream = make_upstream()
+    _, products = make_clients(upstream)
+
+    durations = await products.get_durations([1, 2, 404])
+
+    assert durations == {1: 60, 2: 30, 404: None}
+    assert upstream.state.requests['/products'] == 1
+
+
+@pytest.mark.asyncio
+async def test_unavailable_service():
+    users, _ = make_clients(make_upstream())
+    users.base_url = 'http://127.0.0.1:1'
+    users.transport = None
+
+    with pytest.raises(ServiceUnavailableError):
+        await users.get(1)
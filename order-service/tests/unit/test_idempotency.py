@@ -0,0 +1,291 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import Body, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.requests import Request
+
+from app.database_config import engine, idempotency_engine, \
+    idempotency_session_maker
+from app.idempotency import IDEMPOTENCY_HEADER, LOCK_NOT_AVAILABLE, \
+    MAX_KEY_LENGTH, IdempotencyMiddleware, request_fingerprint
+from app.main import app as service_app
+
+
+def make_request(path: str = '/orders', query: str = '') -> Request:
+    return Request({
+        'type': 'http',
+        'method': 'POST',
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [],
+    })
+
+
+def test_fingerprint_depends_on_request():
+    fingerprint = request_fingerprint(make_request(), b'{"user_id": 1}')
+
+    assert fingerprint == request_fingerprint(make_request(), b'{"user_id": 1}')
+    assert fingerprint != request_fingerprint(make_request(), b'{"user_id": 2}')
+    assert fingerprint != request_fingerprint(make_request(query='a=1'), b'{"user_id": 1}')
+    assert fingerprint != request_fingerprint(make_request('/orders/bulk'), b'{"user_id": 1}')
+
+
+def test_tracked_routes_support_path_parameters():
+    middleware = IdempotencyMiddleware(
+        None,
+        session_maker=None,
+        routes=frozenset({('POST', '/orders'), ('POST', '/orders/{order_id}/cancel')})
+    )
+
+    assert middleware._is_tracked(make_request())
+    assert middleware._is_tracked(make_request('/orders/5f1c/cancel'))
+    assert not middleware._is_tracked(make_request('/orders/bulk'))
+    assert not middleware._is_tracked(make_request('/orders/5f1c/cancel/extra'))
+
+
+class ClaimingDAO:
+    """IdempotencyDAO, который, как настоящий, держит соединение сессии
+    от захвата ключа до сохранения ответа."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def claim(self, key, fingerprint, lock_timeout):
+        await self.db.execute(text('SELECT 1'))
+
+    async def complete(self, key, status_code, content_type, body):
+        await self.db.commit()
+
+
+def make_session_maker(path, pool_size: int) -> async_sessionmaker:
+    engine = create_async_engine(
+        f'sqlite+aiosqlite:///{path}',
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=1.0,
+    )
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def make_app(middleware_session_maker, handler_session_maker) -> FastAPI:
+    app = FastAPI()
+
+    @app.post('/orders', status_code=201)
+    async def create_order() -> dict:
+        async with handler_session_maker() as session:
+            await session.execute(text('SELECT 1'))
+            await asyncio.sleep(0.05)
+        return {}
+
+    app.add_middleware(
+        IdempotencyMiddleware,
+        session_maker=middleware_session_maker,
+        routes=frozenset({('POST', '/orders')})
+    )
+    return app
+
+
+async def post_with_keys(app: FastAPI, count: int) -> list[httpx.Response]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        return await asyncio.gather(*(
+            client.post('/orders', headers={'Idempotency-Key': f'key-{i}'})
+            for i in range(count)
+        ))
+
+
+@pytest.mark.asyncio
+async def test_keyed_requests_do_not_exhaust_handler_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr('app.idempotency.IdempotencyDAO', ClaimingDAO)
+    app = make_app(
+        make_session_maker(tmp_path / 'keys.db', pool_size=2),
+        make_session_maker(tmp_path / 'orders.db', pool_size=2),
+    )
+
+    responses = await post_with_keys(app, 10)
+
+    assert [response.status_code for response in responses] == [201] * 10
+
+
+@pytest.mark.asyncio
+async def test_shared_pool_is_exhausted_by_keyed_requests(tmp_path, monkeypatch):
+    # Почему у middleware отдельный пул: в общем пуле соединения заняты
+    # захваченными ключами, и обработчики ждут до pool_timeout
+    monkeypatch.setattr('app.idempotency.IdempotencyDAO', ClaimingDAO)
+    session_maker = make_session_maker(tmp_path / 'orders.db', pool_size=2)
+
+    with pytest.raises(exc.TimeoutError):
+        await post_with_keys(make_app(session_maker, session_maker), 10)
+
+
+def test_middleware_uses_separate_pool():
+    middleware = next(m for m in service_app.user_middleware if m.cls is IdempotencyMiddleware)
+
+    assert middleware.kwargs['session_maker'] is idempotency_session_maker
+    assert idempotency_engine is not engine
+
+
+class KeyStore:
+    """Таблица idempotency_keys в памяти.
+
+    locked: claim завершается ошибкой lock_timeout, как если бы запрос
+    с тем же ключом выполнялся дольше IDEMPOTENCY_LOCK_TIMEOUT.
+    """
+
+    def __init__(self):
+        self.keys = {}
+        self.locked = False
+
+
+class StubSession:
+    """Сессия, откат которой удаляет незавершенные захваченные ключи."""
+
+    def __init__(self, store: KeyStore):
+        self.store = store
+        self.claimed = []
+
+    async def rollback(self):
+        for key in self.claimed:
+            del self.store.keys[key]
+        self.claimed.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.rollback()
+
+
+class StubIdempotencyDAO:
+    """IdempotencyDAO поверх KeyStore."""
+
+    def __init__(self, db: StubSession):
+        self.db = db
+
+    async def claim(self, key, fingerprint, lock_timeout):
+        if self.db.store.locked:
+            raise exc.DBAPIError('INSERT', {}, SimpleNamespace(sqlstate=LOCK_NOT_AVAILABLE))
+        if key in self.db.store.keys:
+            return self.db.store.keys[key]
+        self.db.store.keys[key] = SimpleNamespace(
+            fingerprint=fingerprint, status_code=None, content_type=None, body=None
+        )
+        self.db.claimed.append(key)
+        return None
+
+    async def complete(self, key, status_code, content_type, body):
+        stored = self.db.store.keys[key]
+        stored.status_code, stored.content_type, stored.body = status_code, content_type, body
+        self.db.claimed.remove(key)
+
+
+@pytest.fixture
+def key_store(monkeypatch) -> KeyStore:
+    monkeypatch.setattr('app.idempotency.IdempotencyDAO', StubIdempotencyDAO)
+    return KeyStore()
+
+
+@pytest.fixture
+def keyed_app(key_store) -> FastAPI:
+    """Приложение с IdempotencyMiddleware на POST /orders.
+
+    app.state.calls — сколько раз выполнен обработчик, app.state.fail —
+    сколько следующих вызовов ответят 503.
+    """
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.fail = 0
+
+    @app.post('/orders', status_code=201)
+    async def create_order(order: dict = Body(...)):
+        app.state.calls += 1
+        if app.state.fail:
+            app.state.fail -= 1
+            return JSONResponse({'detail': 'Unavailable'}, status_code=503)
+        return {'id': app.state.calls, **order}
+
+    @app.post('/orders/bulk', status_code=201)
+    async def create_orders_bulk():
+        app.state.calls += 1
+        return {'id': app.state.calls}
+
+    app.add_middleware(
+        IdempotencyMiddleware,
+        session_maker=lambda: StubSession(key_store),
+        routes=frozenset({('POST', '/orders')})
+    )
+    return app
+
+
+def post_order(app: FastAPI, order: dict, key: str | None = 'key-1', path: str = '/orders'):
+    headers = {IDEMPOTENCY_HEADER: key} if key is not None else {}
+    return TestClient(app).post(path, json=order, headers=headers)
+
+
+def test_replay_returns_stored_response(keyed_app, key_store):
+    first = post_order(keyed_app, {'user_id': 1})
+    replay = post_order(keyed_app, {'user_id': 1})
+
+    assert first.status_code == 201
+    assert 'idempotent-replayed' not in first.headers
+    assert replay.status_code == 201
+    assert replay.headers['idempotent-replayed'] == 'true'
+    assert replay.headers['content-type'] == 'application/json'
+    assert replay.json() == first.json() == {'id': 1, 'user_id': 1}
+    assert keyed_app.state.calls == 1
+    assert key_store.keys['key-1'].status_code == 201
+
+
+def test_key_reused_with_different_request(keyed_app):
+    post_order(keyed_app, {'user_id': 1})
+    response = post_order(keyed_app, {'user_id': 2})
+
+    assert response.status_code == 422
+    assert keyed_app.state.calls == 1
+
+
+def test_server_errors_are_not_stored(keyed_app, key_store):
+    keyed_app.state.fail = 1
+
+    failed = post_order(keyed_app, {'user_id': 1})
+    assert failed.status_code == 503
+    assert key_store.keys == {}
+
+    retried = post_order(keyed_app, {'user_id': 1})
+    assert retried.status_code == 201
+    assert 'idempotent-replayed' not in retried.headers
+    assert keyed_app.state.calls == 2
+
+
+def test_key_in_progress(keyed_app, key_store):
+    key_store.locked = True
+
+    response = post_order(keyed_app, {'user_id': 1})
+
+    assert response.status_code == 409
+    assert keyed_app.state.calls == 0
+
+
+@pytest.mark.parametrize('key', ['', 'k' * (MAX_KEY_LENGTH + 1)])
+def test_invalid_key(keyed_app, key):
+    response = post_order(keyed_app, {'user_id': 1}, key=key)
+
+    assert response.status_code == 400
+    assert keyed_app.state.calls == 0
+
+
+@pytest.mark.parametrize('key, path', [(None, '/orders'), ('key-1', '/orders/bulk')])
+def test_requests_without_key_or_untracked_are_not_stored(keyed_app, key_store, key, path):
+    post_order(keyed_app, {'user_id': 1}, key=key, path=path)
+    post_order(keyed_app, {'user_id': 1}, key=key, path=path)
+
+    assert keyed_app.state.calls == 2
+    assert key_store.keys == {}
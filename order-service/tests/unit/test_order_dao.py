@@ -1,8 +1,31 @@
 import pytest
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from uuid import uuid4
 
+from sqlalchemy import event
+
+from app.availability import BookingIndex
 from app.enums import OrderStatusEnum
-from app.database.dao import OrderDAO
+from app.database.dao import OrderDAO, OrderStatsDAO
+from app.database.models import OrderModel, OrderStatsModel
+from app.schemas import OrderSchema
+
+
+@contextmanager
+def count_statements(session):
+    """Список SQL-запросов, выполненных через сессию внутри блока."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.bind.sync_engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
 
 
 @pytest.mark.asyncio
@@ -67,4 +90,182 @@ async def test_delete_order(db_session, clean_db):
     
     # Проверяем, что заказ действительно удален
     deleted_order = await dao.get_order(order.order_id)
-    assert deleted_order is None
\ No newline at end of file
+    assert deleted_order is None
+
+@pytest.mark.asyncio
+async def test_get_orders_keyset_pagination(db_session):
+    dao = OrderDAO(db_session)
+    created_to = datetime(2026, 1, 1, 10, 0)
+    # По два заказа с одинаковым created_to, чтобы проверить сортировку по id
+    db_session.add_all([
+        OrderModel(
+            user_id=501,
+            product_id=1,
+            status=OrderStatusEnum.CREATED,
+            created_to=created_to + timedelta(minutes=i // 2),
+        ) for i in range(5)
+    ])
+    await db_session.commit()
+
+    # Проходим все страницы по курсору
+    orders, after = [], None
+    while page := await dao.get_orders(limit=2, after=after, user_id=501):
+        orders.extend(page)
+        after = (page[-1].created_to, page[-1].id_)
+
+    keys = [(order.created_to, order.id_) for order in orders]
+    assert len(set(keys)) == 5
+    assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_get_orders_filters(db_session):
+    dao = OrderDAO(db_session)
+    booking_time = datetime(2026, 2, 1, 9, 0)
+    await dao.create_order(502, 1, OrderStatusEnum.CREATED, booking_time)
+    await dao.create_order(502, 1, OrderStatusEnum.CANCELLED, booking_time)
+    await dao.create_order(502, 1, OrderStatusEnum.CREATED, booking_time + timedelta(days=1))
+
+    orders = await dao.get_orders(
+        user_id=502,
+        status=OrderStatusEnum.CREATED,
+        booking_from=booking_time,
+        booking_to=booking_time + timedelta(hours=1),
+    )
+
+    assert len(orders) == 1
+    assert orders[0].status == OrderStatusEnum.CREATED
+
+
+@pytest.mark.asyncio
+async def test_create_orders_keeps_input_order(db_session):
+    dao = OrderDAO(db_session)
+    orders = await dao.create_orders([
+        {'user_id': 503, 'product_id': i, 'status': OrderStatusEnum.CREATED}
+        for i in range(1, 6)
+    ])
+
+    assert [order.product_id for order in orders] == [1, 2, 3, 4, 5]
+    assert all(order.order_id is not None for order in orders)
+    assert len(await dao.get_orders(user_id=503)) == 5
+
+
+@pytest.mark.asyncio
+async def test_create_booking_refuses_full_slot(db_session):
+    dao = OrderDAO(db_session)
+    booking_time = datetime(2026, 3, 3, 10, 0)
+
+    async def book(start):
+        # Один пост: запись помещается, если не пересекает другие записи
+        return await dao.create_booking(
+            504, 1, OrderStatusEnum.CREATED, start, 60,
+            lambda bookings: BookingIndex(
+                (time, time + timedelta(minutes=duration))
+                for time, duration in bookings
+            ).is_free(start, start + timedelta(minutes=60), capacity=1)
+        )
+
+    order = await book(booking_time)
+    assert order.duration == 60
+
+    assert await book(booking_time + timedelta(minutes=30)) is None
+    assert await book(booking_time + timedelta(hours=1)) is not None
+
+
+@pytest.mark.asyncio
+async def test_update_order_rejects_illegal_transition(db_session):
+    dao = OrderDAO(db_session)
+    order = await dao.create_order(505, 1)
+
+    completed = await dao.update_order(order.order_id, status=OrderStatusEnum.COMPLETED)
+    assert completed.status == OrderStatusEnum.COMPLETED
+
+    # Из выполненного заказа нельзя вернуться в созданный или отменить его
+    assert await dao.update_order(order.order_id, status=OrderStatusEnum.CREATED) is None
+    assert await dao.update_order(order.order_id, status=OrderStatusEnum.CANCELLED) is None
+    assert (await dao.get_order(order.order_id)).status == OrderStatusEnum.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_stream_orders_in_batches(db_session):
+    dao = OrderDAO(db_session)
+    created_to = datetime(2026, 4, 1, 10, 0)
+    db_session.add_all([
+        OrderModel(
+            user_id=506,
+            product_id=i,
+            status=OrderStatusEnum.CREATED,
+            created_to=created_to + timedelta(minutes=i),
+        ) for i in range(5)
+    ])
+    await db_session.commit()
+
+    batches = [
+        batch async for batch in dao.stream_orders(
+            created_from=created_to,
+            created_before=created_to + timedelta(hours=1),
+            batch_size=2
+        )
+    ]
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [row.product_id for batch in batches for row in batch] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_get_stats_filters(db_session):
+    dao = OrderStatsDAO(db_session)
+    db_session.add_all([
+        OrderStatsModel(day=date(2026, 5, 1), product_id=601, status=OrderStatusEnum.CREATED, count=3),
+        OrderStatsModel(day=date(2026, 5, 2), product_id=601, status=OrderStatusEnum.CREATED, count=1),
+        OrderStatsModel(day=date(2026, 5, 2), product_id=601, status=OrderStatusEnum.CANCELLED, count=0),
+        OrderStatsModel(day=date(2026, 5, 3), product_id=601, status=OrderStatusEnum.CREATED, count=2),
+    ])
+    await db_session.commit()
+
+    stats = await dao.get_stats(date(2026, 5, 1), date(2026, 5, 2), product_id=601)
+
+    # Строки с нулевым числом заказов не возвращаются
+    assert [(row.day.day, row.status, row.count) for row in stats] == [
+        (1, OrderStatusEnum.CREATED, 3),
+        (2, OrderStatusEnum.CREATED, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_order_single_statement(db_session):
+    dao = OrderDAO(db_session)
+
+    with count_statements(db_session) as statements:
+        order = await dao.create_order(507, 1)
+
+    # Значения по умолчанию возвращаются INSERT ... RETURNING без отдельного SELECT
+    assert len(statements) == 1
+    assert statements[0].startswith('INSERT')
+    assert order.id_ is not None
+    assert order.created_to is not None
+
+
+@pytest.mark.asyncio
+async def test_update_order_single_statement(db_session):
+    dao = OrderDAO(db_session)
+    order = await dao.create_order(508, 1)
+
+    with count_statements(db_session) as statements:
+        updated = await dao.update_order(order.order_id, product_id=2)
+
+    assert len(statements) == 1
+    assert statements[0].startswith('UPDATE')
+    assert updated.product_id == 2
+
+
+@pytest.mark.asyncio
+async def test_get_orders_rows_match_response_schema(db_session):
+    # Строки ORDER_LIST_COLUMNS сериализуются той же схемой, что и OrderModel
+    dao = OrderDAO(db_session)
+    order = await dao.create_order(509, 1, OrderStatusEnum.CREATED, datetime(2026, 2, 3, 9, 0))
+
+    rows = await dao.get_orders(user_id=509)
+
+    assert len(rows) == 1
+    assert OrderSchema.model_validate(rows[0]) == OrderSchema.model_validate(order)
@@ -0,0 +1,18 @@
+import pytest
+from datetime import datetime
+
+from app.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    created_to = datetime(2026, 1, 1, 10, 30, 15, 123456)
+
+    cursor = encode_cursor(created_to, 42)
+
+    assert decode_cursor(cursor) == (created_to, 42)
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'W10', 'WyJ4IiwgMV0'])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
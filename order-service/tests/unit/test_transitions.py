@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import raise_update_error
+from app.enums import OrderStatusEnum
+from app.transitions import can_transition
+
+
+class OrderLookup:
+    """OrderDAO, который находит заказ с заданным статусом или не находит ничего."""
+
+    def __init__(self, order_status: OrderStatusEnum | None):
+        self.order_status = order_status
+
+    async def get_order(self, order_id):
+        if self.order_status is None:
+            return None
+        return SimpleNamespace(order_id=order_id, status=self.order_status)
+
+
+def test_can_transition():
+    assert can_transition(OrderStatusEnum.CREATED, OrderStatusEnum.IN_PROGRESS)
+    assert can_transition(OrderStatusEnum.IN_PROGRESS, OrderStatusEnum.COMPLETED)
+    assert not can_transition(OrderStatusEnum.COMPLETED, OrderStatusEnum.CANCELLED)
+    assert not can_transition(OrderStatusEnum.CREATED, OrderStatusEnum.CREATED)
+
+
+@pytest.mark.asyncio
+async def test_update_error_for_missing_order():
+    with pytest.raises(HTTPException) as error:
+        await raise_update_error(OrderLookup(None), 'order', OrderStatusEnum.COMPLETED)
+
+    assert error.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_update_error_for_forbidden_transition():
+    with pytest.raises(HTTPException) as error:
+        await raise_update_error(
+            OrderLookup(OrderStatusEnum.COMPLETED), 'order', OrderStatusEnum.CANCELLED
+        )
+
+    assert error.value.status_code == 409
+    assert error.value.detail == 'Cannot change order status from completed to cancelled'
+
+
+@pytest.mark.asyncio
+async def test_update_error_for_concurrent_change():
+    # Условный UPDATE не прошел, но к моменту чтения заказ уже в статусе,
+    # из которого переход допустим: статус меняли параллельно
+    with pytest.raises(HTTPException) as error:
+        await raise_update_error(
+            OrderLookup(OrderStatusEnum.IN_PROGRESS), 'order', OrderStatusEnum.COMPLETED
+        )
+
+    assert error.value.status_code == 409
+    assert error.value.detail == 'Order was changed concurrently, retry the request'
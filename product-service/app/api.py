@@ -1,28 +1,87 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Body, Header, \
+    Response, Query, Request
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database_config import async_session_maker
+from app.catalog import catalog_cache, etag_matches
+from app.database_config import async_session_maker, engine, \
+    read_session_router, replica_engine, settings
+from app.database_pool import pool_stats
+from app.read_replica import pinned_to_primary
 from app.database.dao import ProductDAO
+from app.database.models import ProductModel
+from app.schemas import ProductBatchSchema, ProductSchema
 
 router = APIRouter()
 
+# Максимальное количество ID в одном запросе GET /products?ids=
+MAX_BATCH_IDS = 500
+
+def parse_ids(ids: str) -> list[int]:
+    """Разбор списка ID через запятую без повторов, в порядке запроса.
+
+    Совпадает с parse_ids в user-service: у сервисов отдельные
+    контексты сборки и нет общего пакета, изменения вносятся в обе копии.
+    """
+    try:
+        parsed = list(dict.fromkeys(int(id_) for id_ in ids.split(',') if id_.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='ids must be a comma-separated list of integers'
+        )
+    if not parsed or len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f'ids must contain 1-{MAX_BATCH_IDS} values'
+        )
+    return parsed
+
 async def get_db() -> AsyncSession:
     """Зависимость для получения сессии БД."""
     async with async_session_maker() as session:
         yield session
 
+async def get_read_db(request: Request) -> AsyncSession:
+    """Зависимость для получения сессии БД для чтения.
+
+    Сессия открывается на реплике, если она доступна и клиент
+    не изменял данные в последние read_your_writes_window секунд.
+    """
+    async with await read_session_router.session(pinned_to_primary(request)) as session:
+        yield session
+
 async def get_product_dao(db: AsyncSession = Depends(get_db)) -> ProductDAO:
     """Зависимость для получения экземпляра ProductDAO."""
     return ProductDAO(db)
 
+async def get_read_product_dao(db: AsyncSession = Depends(get_read_db)) -> ProductDAO:
+    """Зависимость для получения экземпляра ProductDAO для чтения."""
+    return ProductDAO(db)
+
 @router.get('/ping', tags=['healthcheck'])
 async def ping() -> dict[str, str]:
     """Проверка работоспособности сервиса."""
     return {'status': 'ok'}
 
-@router.post('/products', tags=['products'], status_code=status.HTTP_201_CREATED)
+@router.get('/health/db', tags=['healthcheck'])
+async def database_health() -> dict:
+    """Состояние пулов соединений с БД и реплики: занятость и время ожидания соединения."""
+    return {
+        'primary': pool_stats(engine.sync_engine.pool, settings.max_overflow),
+        'replica': {
+            **read_session_router.stats(),
+            'pool': pool_stats(replica_engine.sync_engine.pool, settings.max_overflow) if replica_engine else None,
+        },
+    }
+
+@router.post(
+    '/products',
+    tags=['products'],
+    status_code=status.HTTP_201_CREATED,
+    response_model=ProductSchema
+)
 async def create_product(
     name: str = Body(...),
     schedule_time: int = Body(...),
@@ -30,46 +89,64 @@ async def create_product(
     is_active: bool = Body(True),
     description: str = Body(None),
     dao: ProductDAO = Depends(get_product_dao)
-) -> dict:
+) -> ProductModel:
     """Создание новой услуги."""
     product = await dao.create_product(name, schedule_time, price, is_active, description)
     
-    return {
-        'id_': product.id_,
-        'name': product.name,
-        'description': product.description,
-        'schedule_time': product.schedule_time,
-        'price': product.price,
-        'is_active': product.is_active,
-        'created_to': product.created_to,
-        'update_to': product.update_to
-    }
+    return product
 
 @router.get('/products', tags=['products'])
-async def get_products(dao: ProductDAO = Depends(get_product_dao)) -> list[dict]:
-    """Получение списка всех активных услуг."""
-    products = await dao.get_products()
-    
-    return [
-        {
-            'id_': product.id_,
-            'name': product.name,
-            'description': getattr(product, 'description', None),
-            'schedule_time': product.schedule_time,
-            'price': product.price,
-            'is_active': product.is_active,
-            'created_to': product.created_to,
-            'update_to': product.update_to
-        } for product in products
-    ]
-
-@router.get('/products/{product_id}', tags=['products'])
+async def get_products(
+    ids: str | None = Query(None, description='ID услуг через запятую'),
+    if_none_match: str | None = Header(None),
+    dao: ProductDAO = Depends(get_product_dao)
+) -> Response:
+    """Получение списка всех активных услуг.
+
+    Список отдается из каталога в памяти вместе с ETag; если каталог
+    не изменился с указанного в If-None-Match, возвращается 304 без тела.
+    С параметром ids возвращаются указанные услуги, включая неактивные:
+    items в порядке ids и missing со списком ненайденных ID.
+
+    Каталог загружается с основного сервера, а не с реплики: снимок общий
+    для всех клиентов и не должен отставать от только что сделанных записей.
+    """
+    catalog = await catalog_cache.get(dao.get_all_products)
+    if ids is not None:
+        product_ids = parse_ids(ids)
+        batch = ProductBatchSchema(
+            items=[catalog.products[id_] for id_ in product_ids if id_ in catalog.products],
+            missing=[id_ for id_ in product_ids if id_ not in catalog.products]
+        )
+        return Response(batch.model_dump_json(), media_type='application/json')
+
+    headers = {'ETag': catalog.etag}
+
+    if etag_matches(if_none_match, catalog.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        catalog.active_body,
+        media_type='application/json',
+        headers=headers
+    )
+
+@router.get('/products/search', tags=['products'], response_model=list[ProductSchema])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    dao: ProductDAO = Depends(get_read_product_dao)
+) -> list[dict]:
+    """Поиск активных услуг по названию и описанию с учетом опечаток."""
+    return await dao.search_products(q, limit)
+
+@router.get('/products/{product_id}', tags=['products'], response_model=ProductSchema)
 async def get_product(
     product_id: int,
     dao: ProductDAO = Depends(get_product_dao)
 ) -> dict:
-    """Получение информации о конкретной услуге."""
-    product = await dao.get_product(product_id)
+    """Получение информации о конкретной услуге из каталога в памяти."""
+    catalog = await catalog_cache.get(dao.get_all_products)
+    product = catalog.products.get(product_id)
     
     if not product:
         raise HTTPException(
@@ -77,17 +154,9 @@ async def get_product(
             detail='Product not found'
         )
     
-    return {
-        'id_': product.id_,
-        'name': product.name,
-        'schedule_time': product.schedule_time,
-        'price': product.price,
-        'is_active': product.is_active,
-        'created_to': product.created_to,
-        'update_to': product.update_to
-    }
+    return product
 
-@router.patch('/products/{product_id}', tags=['products'])
+@router.patch('/products/{product_id}', tags=['products'], response_model=ProductSchema)
 async def update_product(
     product_id: int,
     name: str | None = None,
@@ -96,7 +165,7 @@ async def update_product(
     price: int | None = None,
     is_active: bool | None = None,
     dao: ProductDAO = Depends(get_product_dao)
-) -> dict:
+) -> ProductModel:
     """Частичное обновление услуги."""
     product = await dao.update_product(product_id, name, description, schedule_time, price, is_active)
     
@@ -106,16 +175,7 @@ async def update_product(
             detail='Product not found'
         )
     
-    return {
-        'id_': product.id_,
-        'name': product.name,
-        'description': product.description,
-        'schedule_time': product.schedule_time,
-        'price': product.price,
-        'is_active': product.is_active,
-        'created_to': product.created_to,
-        'update_to': product.update_to
-    }
+    return product
 
 @router.delete('/products/{product_id}', tags=['products'], status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
@@ -0,0 +1,124 @@
+"""Каталог услуг в памяти процесса."""
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Awaitable, Callable, Sequence
+
+from pydantic import TypeAdapter
+from sqlalchemy import RowMapping
+
+from app.database.models import ProductModel
+from app.schemas import ProductSchema
+from app.search import SearchIndex
+
+
+_product_list = TypeAdapter(list[ProductSchema])
+
+
+def product_to_dict(product: ProductModel) -> dict:
+    """Представление услуги в ответах API."""
+    return ProductSchema.model_validate(product).model_dump()
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Состояние каталога на момент загрузки.
+
+    Args:
+        version: Версия каталога, по которой он загружен
+        loaded_at: Момент загрузки по time.monotonic()
+        products: Все услуги по id
+        active_body: JSON списка активных услуг, готовый к отправке
+        etag: ETag списка активных услуг
+    """
+
+    version: int
+    loaded_at: float
+    products: dict[int, dict]
+    active_body: bytes
+    etag: str
+
+    @cached_property
+    def search_index(self) -> SearchIndex:
+        """Индекс поиска по активным услугам, строится при первом поиске."""
+        return SearchIndex(
+            product for product in self.products.values() if product['is_active']
+        )
+
+
+class CatalogCache:
+    """Каталог услуг в памяти, привязанный к счетчику версий.
+
+    Запись в каталог увеличивает версию, и при следующем чтении каталог
+    загружается заново одним запросом (одновременные читатели ждут одну
+    загрузку). Версия хранится в памяти процесса, поэтому изменения,
+    сделанные в обход этого процесса, становятся видны не позже чем
+    через ttl секунд.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self.version = 0
+        self.loads = 0
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Отметка изменения каталога."""
+        self.version += 1
+
+    async def get(
+        self,
+        load: Callable[[], Awaitable[Sequence[RowMapping]]]
+    ) -> CatalogSnapshot:
+        """Актуальный каталог; при необходимости загружается через load."""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+
+            version = self.version
+            snapshot = self._build(version, await load())
+            self.loads += 1
+            # Каталог, изменившийся во время загрузки, не сохраняется
+            if version == self.version:
+                self._snapshot = snapshot
+            return snapshot
+
+    def _is_fresh(self, snapshot: CatalogSnapshot | None) -> bool:
+        return snapshot is not None and snapshot.version == self.version \
+            and time.monotonic() - snapshot.loaded_at < self.ttl
+
+    @staticmethod
+    def _build(version: int, products: Sequence[RowMapping]) -> CatalogSnapshot:
+        schemas = _product_list.validate_python(products)
+        active_body = _product_list.dump_json(
+            [schema for schema in schemas if schema.is_active]
+        )
+        return CatalogSnapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            products={schema.id_: schema.model_dump() for schema in schemas},
+            active_body=active_body,
+            etag=f'"{hashlib.sha256(active_body).hexdigest()[:32]}"',
+        )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Совпадает ли ETag с одним из значений заголовка If-None-Match."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag in (
+        value.strip().removeprefix('W/') for value in if_none_match.split(',')
+    )
+
+
+catalog_cache = CatalogCache()
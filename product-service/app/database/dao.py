@@ -2,11 +2,25 @@
 from uuid import UUID
 from typing import List, Optional
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, insert, update, delete, func, literal, or_, \
+    RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.catalog import catalog_cache, product_to_dict
 from app.database.models import ProductModel
 
+# Колонки каталога услуг: поля ответа API
+PRODUCT_LIST_COLUMNS = (
+    ProductModel.id_,
+    ProductModel.name,
+    ProductModel.description,
+    ProductModel.schedule_time,
+    ProductModel.price,
+    ProductModel.is_active,
+    ProductModel.created_to,
+    ProductModel.update_to,
+)
+
 
 class ProductDAO:
     """Класс для выполнения операций с продуктами в базе данных."""
@@ -22,17 +36,22 @@ class ProductDAO:
         is_active: bool = True,
         description: str = None
     ) -> ProductModel:
-        """Создание нового продукта."""
-        product = ProductModel(
-            name=name,
-            schedule_time=schedule_time,
-            price=price,
-            is_active=is_active,
-            description=description
+        """Создание нового продукта одним INSERT ... RETURNING.
+
+        id и даты, которые заполняет сервер, возвращаются тем же запросом.
+        """
+        result = await self.db.execute(
+            insert(ProductModel).values(
+                name=name,
+                schedule_time=schedule_time,
+                price=price,
+                is_active=is_active,
+                description=description
+            ).returning(ProductModel)
         )
-        self.db.add(product)
+        product = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(product)
+        catalog_cache.invalidate()
         return product
     
     async def get_product(self, product_id: int) -> Optional[ProductModel]:
@@ -49,6 +68,58 @@ class ProductDAO:
         )
         return result.scalars().all()
     
+    async def get_all_products(self) -> List[RowMapping]:
+        """Получение всех продуктов, включая неактивные, для каталога в памяти.
+
+        Returns:
+            List[RowMapping]: Строки с колонками PRODUCT_LIST_COLUMNS.
+        """
+        result = await self.db.execute(
+            select(*PRODUCT_LIST_COLUMNS).order_by(ProductModel.id_)
+        )
+        return result.mappings().all()
+    
+    async def search_products(self, query: str, limit: int) -> List[dict]:
+        """Поиск активных услуг по названию и описанию.
+
+        В PostgreSQL совпадения ищутся по search_vector (русская морфология)
+        и по сходству триграмм с названием и описанием, чтобы находились
+        слова с опечатками; ранг складывается из ts_rank и сходства с
+        названием. В других СУБД поиск идет по индексу каталога в памяти.
+
+        Args:
+            query: Поисковый запрос
+            limit: Максимальное количество результатов
+
+        Returns:
+            Услуги по убыванию релевантности
+        """
+        if self.db.bind.dialect.name != 'postgresql':
+            catalog = await catalog_cache.get(self.get_all_products)
+            return [
+                catalog.products[product_id]
+                for product_id in catalog.search_index.search(query, limit)
+            ]
+
+        ts_query = func.websearch_to_tsquery('russian', query)
+        text = literal(query)
+        rank = func.ts_rank(ProductModel.search_vector, ts_query) \
+            + func.word_similarity(text, ProductModel.name)
+        result = await self.db.execute(
+            select(ProductModel)
+            .where(
+                ProductModel.is_active == True,
+                or_(
+                    ProductModel.search_vector.bool_op('@@')(ts_query),
+                    text.bool_op('<%')(ProductModel.name),
+                    text.bool_op('<%')(ProductModel.description),
+                )
+            )
+            .order_by(rank.desc(), ProductModel.id_)
+            .limit(limit)
+        )
+        return [product_to_dict(product) for product in result.scalars()]
+    
     async def update_product(
         self,
         product_id: int,
@@ -58,24 +129,35 @@ class ProductDAO:
         price: int = None,
         is_active: bool = None
     ) -> Optional[ProductModel]:
-        """Обновление продукта."""
-        product = await self.get_product(product_id)
-        if not product:
-            return None
-        
+        """Обновление продукта одним UPDATE ... RETURNING.
+
+        Returns:
+            Optional[ProductModel]: Продукт или None, если его нет.
+        """
+        values = {}
         if name is not None:
-            product.name = name
+            values['name'] = name
         if description is not None:
-            product.description = description
+            values['description'] = description
         if schedule_time is not None:
-            product.schedule_time = schedule_time
+            values['schedule_time'] = schedule_time
         if price is not None:
-            product.price = price
+            values['price'] = price
         if is_active is not None:
-            product.is_active = is_active
-        
+            values['is_active'] = is_active
+        if not values:
+            return await self.get_product(product_id)
+
+        result = await self.db.execute(
+            update(ProductModel)
+            .where(ProductModel.id_ == product_id)
+            .values(**values)
+            .returning(ProductModel)
+            .execution_options(populate_existing=True)
+        )
+        product = result.scalar_one_or_none()
         await self.db.commit()
-        await self.db.refresh(product)
+        catalog_cache.invalidate()
         return product
     
     async def delete_product(self, product_id: int) -> bool:
@@ -84,4 +166,5 @@ class ProductDAO:
             delete(ProductModel).where(ProductModel.id_ == product_id)
         )
         await self.db.commit()
+        catalog_cache.invalidate()
         return result.rowcount > 0
\ No newline at end of file
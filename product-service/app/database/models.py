@@ -1,7 +1,9 @@
 """Модуль моделей SQLAlchemy для услуг."""
 from datetime import datetime
 
-from sqlalchemy import Integer, String, DateTime, func, Boolean
+from sqlalchemy import Integer, String, DateTime, func, Boolean, Computed, \
+    Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -9,6 +11,12 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 class BaseModel(AsyncAttrs, DeclarativeBase):
     pass
 
+# Документ для полнотекстового поиска: название весомее описания
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+)
+
 class ProductModel(BaseModel):
     """Модель услуг
 
@@ -20,10 +28,22 @@ class ProductModel(BaseModel):
         description: Описание услуги
         created_to: Дата и время создания услуги
         update_to: Дата и время обновления услуги
+        search_vector: Документ полнотекстового поиска по названию и описанию
 
     """
 
     __tablename__ = 'products'
+    __table_args__ = (
+        Index('ix_products_search_vector', 'search_vector', postgresql_using='gin'),
+        Index(
+            'ix_products_name_trgm', 'name',
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+        ),
+        Index(
+            'ix_products_description_trgm', 'description',
+            postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}
+        ),
+    )
 
     id_: Mapped[int] = mapped_column(
         name='id',
@@ -69,3 +89,9 @@ class ProductModel(BaseModel):
         server_default=func.now(),
         onupdate=func.now(),
     )
+    search_vector: Mapped[str] = mapped_column(
+        Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        name='search_vector',
+        type_=TSVECTOR,
+        deferred=True,
+    )
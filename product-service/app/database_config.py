@@ -5,15 +5,54 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, \
     async_sessionmaker
 
 from app.config.database import DatabaseSettings
+from app.database_pool import MeteredQueuePool
+from app.read_replica import ReadSessionRouter
 
 load_dotenv()
 
 settings = DatabaseSettings()
 
 DATABASE_URL = settings.db_url
-DATABASE_PARAMS = {'poolclass': NullPool}
+DATABASE_PARAMS = {
+    'connect_args': {
+        'prepared_statement_cache_size': settings.statement_cache_size,
+        'statement_cache_size': settings.statement_cache_size,
+        'server_settings': {'statement_timeout': str(settings.statement_timeout)},
+    },
+}
+if settings.null_pool:
+    DATABASE_PARAMS['poolclass'] = NullPool
+else:
+    DATABASE_PARAMS.update(
+        poolclass=MeteredQueuePool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+    )
 
 engine = create_async_engine(DATABASE_URL, **DATABASE_PARAMS)
 
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession,
                                          expire_on_commit=False)
+
+# Реплика для чтения (GET-запросы), если задана в настройках
+replica_engine = create_async_engine(
+    settings.replica_db_url,
+    **{
+        **DATABASE_PARAMS,
+        'connect_args': {
+            **DATABASE_PARAMS['connect_args'],
+            'timeout': settings.replica_connect_timeout,
+        },
+    }
+) if settings.replica_db_url else None
+
+replica_session_maker = async_sessionmaker(replica_engine, class_=AsyncSession,
+                                           expire_on_commit=False) \
+    if replica_engine is not None else None
+
+read_session_router = ReadSessionRouter(
+    async_session_maker, replica_session_maker, settings.replica_retry_interval
+)
@@ -1,7 +1,18 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from app.api import router
+from app.database_config import settings
+from app.read_replica import ReadYourWritesMiddleware
 
-app = FastAPI(title='Product Service')
+app = FastAPI(
+    title='Product Service',
+    default_response_class=ORJSONResponse
+)
+
+app.add_middleware(
+    ReadYourWritesMiddleware,
+    window=settings.read_your_writes_window
+)
 
 app.include_router(router)
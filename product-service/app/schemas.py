@@ -0,0 +1,42 @@
+"""Pydantic-схемы услуг."""
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ProductSchema(BaseModel):
+    """Услуга в ответах API.
+
+    Args:
+        id_: id услуги
+        name: Название услуги
+        description: Описание услуги
+        schedule_time: Примерное время исполнения услуги в минутах
+        price: Примерная цена услуги
+        is_active: Доступна ли услуга для заказа
+        created_to: Дата и время создания услуги
+        update_to: Дата и время обновления услуги
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id_: int
+    name: str
+    description: str | None = None
+    schedule_time: int
+    price: int
+    is_active: bool
+    created_to: datetime
+    update_to: datetime
+
+
+class ProductBatchSchema(BaseModel):
+    """Услуги, запрошенные списком ID.
+
+    Args:
+        items: Найденные услуги в порядке запроса
+        missing: ID, для которых услуга не найдена
+    """
+
+    items: list[ProductSchema]
+    missing: list[int]
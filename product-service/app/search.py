@@ -0,0 +1,107 @@
+"""Поиск услуг в памяти для окружений без PostgreSQL."""
+import re
+from collections import defaultdict
+from typing import Iterable
+
+# Веса полей как у setweight в search_vector: A для названия, B для описания
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+# Минимальное сходство по триграммам для слова с опечаткой
+SIMILARITY_THRESHOLD = 0.4
+MIN_STEM_LENGTH = 3
+
+TOKEN_RE = re.compile(r'\w+')
+# Окончания русских слов, от длинных к коротким
+ENDINGS = sorted(
+    (
+        'ами', 'ями', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'иях', 'ией',
+        'ой', 'ей', 'ий', 'ый', 'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ом', 'ем',
+        'ам', 'ям', 'ах', 'ях', 'ую', 'юю', 'ов', 'ев', 'ия',
+        'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+    ),
+    key=len,
+    reverse=True,
+)
+
+
+def stem(word: str) -> str:
+    """Грубая основа слова: без окончания, если основа не короче трех букв."""
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[:-len(ending)]
+    return word
+
+
+def terms(text: str | None) -> list[str]:
+    """Основы слов текста в нижнем регистре."""
+    if not text:
+        return []
+    return [stem(token) for token in TOKEN_RE.findall(text.lower().replace('ё', 'е'))]
+
+
+def trigrams(word: str) -> set[str]:
+    """Триграммы слова, дополненного пробелами, как в pg_trgm."""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(left: set[str], right: set[str]) -> float:
+    """Доля общих триграмм двух слов."""
+    return len(left & right) / len(left | right)
+
+
+class SearchIndex:
+    """Инвертированный индекс услуг по основам слов названия и описания.
+
+    Слово запроса, которого нет в индексе, сопоставляется с похожими
+    по триграммам словами, поэтому опечатки не мешают поиску. Услуга
+    получает вес найденных слов с учетом поля и сходства, как при
+    ранжировании в PostgreSQL.
+
+    Args:
+        products: Услуги в виде словарей с полями id_, name, description
+    """
+
+    def __init__(self, products: Iterable[dict]):
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._by_trigram: dict[str, set[str]] = defaultdict(set)
+        self._trigrams: dict[str, set[str]] = {}
+
+        for product in products:
+            for field, weight in (('name', NAME_WEIGHT), ('description', DESCRIPTION_WEIGHT)):
+                for term in terms(product.get(field)):
+                    postings = self._postings[term]
+                    postings[product['id_']] = max(postings.get(product['id_'], 0.0), weight)
+
+        for term in self._postings:
+            self._trigrams[term] = trigrams(term)
+            for trigram in self._trigrams[term]:
+                self._by_trigram[trigram].add(term)
+
+    def _matches(self, term: str) -> dict[str, float]:
+        """Слова индекса, подходящие к слову запроса, со степенью сходства."""
+        if term in self._postings:
+            return {term: 1.0}
+
+        query_trigrams = trigrams(term)
+        candidates = set().union(*(self._by_trigram.get(t, ()) for t in query_trigrams))
+        matches = {}
+        for candidate in candidates:
+            score = similarity(query_trigrams, self._trigrams[candidate])
+            if score >= SIMILARITY_THRESHOLD:
+                matches[candidate] = score
+        return matches
+
+    def search(self, query: str, limit: int) -> list[int]:
+        """Id услуг, подходящих под запрос, по убыванию релевантности."""
+        scores: dict[int, float] = defaultdict(float)
+        for term in dict.fromkeys(terms(query)):
+            best: dict[int, float] = {}
+            for match, score in self._matches(term).items():
+                for product_id, weight in self._postings[match].items():
+                    best[product_id] = max(best.get(product_id, 0.0), weight * score)
+            for product_id, score in best.items():
+                scores[product_id] += score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [product_id for product_id, _ in ranked[:limit]]
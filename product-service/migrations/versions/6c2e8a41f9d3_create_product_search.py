@@ -0,0 +1,51 @@
+"""create product search
+
+Revision ID: 6c2e8a41f9d3
+Revises: 210ececa532a
+Create Date: 2026-10-18 19:05:37.281946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2e8a41f9d3'
+down_revision: Union[str, Sequence[str], None] = '210ececa532a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('products', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+    ))
+    op.create_index('ix_products_search_vector', 'products', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+    op.create_index('ix_products_name_trgm', 'products', ['name'],
+                    unique=False, postgresql_using='gin',
+                    postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_products_description_trgm', 'products', ['description'],
+                    unique=False, postgresql_using='gin',
+                    postgresql_ops={'description': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_description_trgm', table_name='products')
+    op.drop_index('ix_products_name_trgm', table_name='products')
+    op.drop_index('ix_products_search_vector', table_name='products')
+    op.drop_column('products', 'search_vector')
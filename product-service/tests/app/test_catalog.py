@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime
+
+from hamcrest import assert_that, equal_to, is_not
+
+from app.catalog import CatalogCache, etag_matches
+from app.database.models import ProductModel
+
+
+def make_product(id_: int, price: int = 1000, is_active: bool = True) -> ProductModel:
+    return ProductModel(
+        id_=id_,
+        name=f'Услуга {id_}',
+        schedule_time=60,
+        price=price,
+        is_active=is_active,
+        created_to=datetime(2026, 1, 1),
+        update_to=datetime(2026, 1, 1),
+    )
+
+
+class TestCatalogCache:
+    def test_reloads_only_after_invalidate(self) -> None:
+        """Каталог загружается один раз до изменения версии."""
+        products = [make_product(1), make_product(2, is_active=False)]
+        calls = []
+
+        async def load():
+            calls.append(1)
+            return products
+
+        async def scenario():
+            cache = CatalogCache()
+            first, second = await asyncio.gather(cache.get(load), cache.get(load))
+            products[0] = make_product(1, price=1500)
+            cache.invalidate()
+            third = await cache.get(load)
+            return first, second, third
+
+        first, second, third = asyncio.run(scenario())
+
+        assert_that(actual_or_assertion=len(calls), matcher=equal_to(2))
+        assert_that(actual_or_assertion=second.etag, matcher=equal_to(first.etag))
+        assert_that(actual_or_assertion=third.etag, matcher=is_not(equal_to(first.etag)))
+        assert_that(actual_or_assertion=sorted(first.products), matcher=equal_to([1, 2]))
+        assert_that(actual_or_assertion=first.active_body.count(b'"id_"'), matcher=equal_to(1))
+
+    def test_etag_matches(self) -> None:
+        """Разбор заголовка If-None-Match."""
+        assert_that(actual_or_assertion=etag_matches('"a", W/"b"', '"b"'), matcher=equal_to(True))
+        assert_that(actual_or_assertion=etag_matches('*', '"b"'), matcher=equal_to(True))
+        assert_that(actual_or_assertion=etag_matches('"a"', '"b"'), matcher=equal_to(False))
+        assert_that(actual_or_assertion=etag_matches(None, '"b"'), matcher=equal_to(False))
@@ -0,0 +1,31 @@
+from hamcrest import assert_that, equal_to
+
+from app.search import SearchIndex, stem
+
+PRODUCTS = [
+    {'id_': 1, 'name': 'Замена масла', 'description': 'Замена моторного масла и фильтра'},
+    {'id_': 2, 'name': 'Шиномонтаж', 'description': 'Сезонная замена шин'},
+    {'id_': 3, 'name': 'Диагностика двигателя', 'description': None},
+]
+
+
+class TestSearchIndex:
+    def test_stem(self) -> None:
+        """Разные формы слова приводятся к одной основе."""
+        assert_that(actual_or_assertion=stem('масла'), matcher=equal_to(stem('масло')))
+        assert_that(actual_or_assertion=stem('замены'), matcher=equal_to(stem('замена')))
+
+    def test_ranks_name_above_description(self) -> None:
+        """Совпадение в названии важнее совпадения в описании."""
+        index = SearchIndex(PRODUCTS)
+
+        assert_that(actual_or_assertion=index.search('замена масла', 10), matcher=equal_to([1, 2]))
+        assert_that(actual_or_assertion=index.search('замена', 1), matcher=equal_to([1]))
+
+    def test_finds_misspelled_words(self) -> None:
+        """Слова с опечатками находятся по триграммам."""
+        index = SearchIndex(PRODUCTS)
+
+        assert_that(actual_or_assertion=index.search('шиномантаж', 10), matcher=equal_to([2]))
+        assert_that(actual_or_assertion=index.search('диогностика', 10), matcher=equal_to([3]))
+        assert_that(actual_or_assertion=index.search('кондиционер', 10), matcher=equal_to([]))
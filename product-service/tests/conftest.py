@@ -1,3 +1,9 @@
+import os
+
+# Соединения пула привязаны к циклу событий, а TestClient запускает свой,
+# поэтому в тестах каждая сессия открывает отдельное соединение
+os.environ.setdefault('PRODUCT_DB_NULL_POOL', 'true')
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -1,28 +1,128 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Body, \
+    Request
+from typing import Sequence
 from uuid import UUID
 
+from sqlalchemy import RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database_config import async_session_maker
+from app.database_config import async_session_maker, engine, \
+    idempotency_engine, read_session_router, replica_engine, settings
+from app.database_pool import pool_stats
+from app.read_replica import pinned_to_primary
 from app.database.dao import UserDAO
+from app.database.models import UserModel
+from app.normalization import normalize_email, normalize_phone
+from app.schemas import BONUS_DELTA_LIMIT, BonusChangeSchema, UserBatchSchema, \
+    UserSchema
 
 router = APIRouter()
 
+# Максимальное количество ID в одном запросе GET /users?ids=
+MAX_BATCH_IDS = 500
+# Максимальное количество изменений в одном запросе POST /users/bonus
+BONUS_BULK_MAX_ITEMS = 1000
+
+def parse_ids(ids: str) -> list[int]:
+    """Разбор списка ID через запятую без повторов, в порядке запроса.
+
+    Совпадает с parse_ids в product-service: у сервисов отдельные
+    контексты сборки и нет общего пакета, изменения вносятся в обе копии.
+    """
+    try:
+        parsed = list(dict.fromkeys(int(id_) for id_ in ids.split(',') if id_.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='ids must be a comma-separated list of integers'
+        )
+    if not parsed or len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f'ids must contain 1-{MAX_BATCH_IDS} values'
+        )
+    return parsed
+
 async def get_db() -> AsyncSession:
     """Зависимость для получения сессии БД."""
     async with async_session_maker() as session:
         yield session
 
+async def get_read_db(request: Request) -> AsyncSession:
+    """Зависимость для получения сессии БД для чтения.
+
+    Сессия открывается на реплике, если она доступна и клиент
+    не изменял данные в последние read_your_writes_window секунд.
+    """
+    async with await read_session_router.session(pinned_to_primary(request)) as session:
+        yield session
+
+async def get_user_list_db(request: Request) -> AsyncSession:
+    """Зависимость для получения сессии БД для GET /users.
+
+    Запрос с ids читается с основного сервера: так другие сервисы проверяют
+    пользователей перед созданием записей (order-service при создании
+    заказа), а cookie read-your-writes у них нет, поэтому только что
+    созданный пользователь на отстающей реплике оказался бы ненайденным.
+    """
+    pinned = 'ids' in request.query_params or pinned_to_primary(request)
+    async with await read_session_router.session(pinned) as session:
+        yield session
+
 async def get_user_dao(db: AsyncSession = Depends(get_db)) -> UserDAO:
     """Зависимость для получения экземпляра UserDAO."""
     return UserDAO(db)
 
+async def get_read_user_dao(db: AsyncSession = Depends(get_read_db)) -> UserDAO:
+    """Зависимость для получения экземпляра UserDAO для чтения."""
+    return UserDAO(db)
+
+async def get_user_list_dao(db: AsyncSession = Depends(get_user_list_db)) -> UserDAO:
+    """Зависимость для получения экземпляра UserDAO для GET /users."""
+    return UserDAO(db)
+
+def normalize_contacts(
+    email: str | None,
+    phone: str | None
+) -> tuple[str | None, str | None]:
+    """Email в нижнем регистре и телефон в формате E.164; 422, если формат неверный."""
+    try:
+        return (
+            normalize_email(email) if email is not None else None,
+            normalize_phone(phone) if phone is not None else None
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc)
+        )
+
 @router.get('/ping', tags=['healthcheck'])
 async def ping() -> dict[str, str]:
     """Проверка работоспособности сервиса."""
     return {'status': 'ok'}
 
-@router.post('/users', tags=['users'], status_code=status.HTTP_201_CREATED)
+@router.get('/health/db', tags=['healthcheck'])
+async def database_health() -> dict:
+    """Состояние пулов соединений с БД (основной, ключи идемпотентности, реплика).
+
+    Для каждого пула: занятость и время ожидания соединения.
+    """
+    return {
+        'primary': pool_stats(engine.sync_engine.pool, settings.max_overflow),
+        'idempotency': pool_stats(idempotency_engine.sync_engine.pool, settings.idempotency_max_overflow),
+        'replica': {
+            **read_session_router.stats(),
+            'pool': pool_stats(replica_engine.sync_engine.pool, settings.max_overflow) if replica_engine else None,
+        },
+    }
+
+@router.post(
+    '/users',
+    tags=['users'],
+    status_code=status.HTTP_201_CREATED,
+    response_model=UserSchema
+)
 async def create_user(
     first_name: str,
     last_name: str,
@@ -31,46 +131,87 @@ async def create_user(
     phone: str = None,
     bonus_score: int = 0,
     dao: UserDAO = Depends(get_user_dao)
-) -> dict:
-    """Создание нового пользователя."""
+) -> UserModel:
+    """Создание нового пользователя.
+
+    Email сохраняется в нижнем регистре, телефон в формате E.164. Если
+    email или телефон уже заняты, возвращается 409.
+    """
+    email, phone = normalize_contacts(email, phone)
     user = await dao.create_user(first_name, last_name, patronymic, email, phone, bonus_score)
     
-    return {
-        'id_': user.id_,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'patronymic': user.patronymic,
-        'email': user.email,
-        'phone': user.phone,
-        'bonus_score': user.bonus_score,
-        'created_to': user.created_to,
-        'update_to': user.update_to
-    }
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='User with this email or phone already exists'
+        )
+    
+    return user
+
+@router.get('/users', tags=['users'], response_model=list[UserSchema] | UserBatchSchema)
+async def get_users(
+    ids: str | None = Query(None, description='ID пользователей через запятую'),
+    dao: UserDAO = Depends(get_user_list_dao)
+) -> Sequence[RowMapping] | UserBatchSchema:
+    """Получение списка всех пользователей.
+
+    С параметром ids возвращаются только указанные пользователи (одним
+    запросом к основному серверу БД): items в порядке ids и missing
+    со списком ненайденных ID.
+    """
+    if ids is not None:
+        user_ids = parse_ids(ids)
+        found = {user.id_: user for user in await dao.get_users_by_ids(user_ids)}
+        return UserBatchSchema(
+            items=[found[id_] for id_ in user_ids if id_ in found],
+            missing=[id_ for id_ in user_ids if id_ not in found]
+        )
+
+    return await dao.get_users()
+
+@router.get('/users/by-email/{email}', tags=['users'], response_model=UserSchema)
+async def get_user_by_email(
+    email: str,
+    dao: UserDAO = Depends(get_read_user_dao)
+) -> UserModel:
+    """Поиск пользователя по email без учета регистра."""
+    email, _ = normalize_contacts(email, None)
+    user = await dao.get_user_by_email(email)
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='User not found'
+        )
+    
+    return user
+
+@router.get('/users/by-phone/{phone}', tags=['users'], response_model=UserSchema)
+async def get_user_by_phone(
+    phone: str,
+    dao: UserDAO = Depends(get_read_user_dao)
+) -> UserModel:
+    """Поиск пользователя по телефону.
 
-@router.get('/users', tags=['users'])
-async def get_users(dao: UserDAO = Depends(get_user_dao)) -> list[dict]:
-    """Получение списка всех пользователей."""
-    users = await dao.get_users()
+    Телефон принимается в любом распространенном формате
+    (+7 900 123-45-67, 89001234567, 9001234567) и приводится к E.164.
+    """
+    _, phone = normalize_contacts(None, phone)
+    user = await dao.get_user_by_phone(phone)
     
-    return [
-        {
-            'id_': user.id_,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'patronymic': user.patronymic,
-            'email': user.email,
-            'phone': user.phone,
-            'bonus_score': user.bonus_score,
-            'created_to': user.created_to,
-            'update_to': user.update_to
-        } for user in users
-    ]
-
-@router.get('/users/{user_id}', tags=['users'])
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='User not found'
+        )
+    
+    return user
+
+@router.get('/users/{user_id}', tags=['users'], response_model=UserSchema)
 async def get_user(
     user_id: int,
-    dao: UserDAO = Depends(get_user_dao)
-) -> dict:
+    dao: UserDAO = Depends(get_read_user_dao)
+) -> UserModel:
     """Получение информации о конкретном пользователе."""
     user = await dao.get_user(user_id)
     
@@ -80,19 +221,9 @@ async def get_user(
             detail='User not found'
         )
     
-    return {
-        'id_': user.id_,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'patronymic': user.patronymic,
-        'email': user.email,
-        'phone': user.phone,
-        'bonus_score': user.bonus_score,
-        'created_to': user.created_to,
-        'update_to': user.update_to
-    }
+    return user
 
-@router.patch('/users/{user_id}', tags=['users'])
+@router.patch('/users/{user_id}', tags=['users'], response_model=UserSchema)
 async def update_user(
     user_id: int,
     first_name: str | None = None,
@@ -104,8 +235,13 @@ async def update_user(
     car_info: str | None = None,
     additional_info: str | None = None,
     dao: UserDAO = Depends(get_user_dao)
-) -> dict:
-    """Частичное обновление пользователя."""
+) -> UserModel:
+    """Частичное обновление пользователя.
+
+    Email и телефон приводятся к тому же виду, что при создании; пустая
+    строка в email или phone не очищает контакт, а отклоняется с 422.
+    """
+    email, phone = normalize_contacts(email, phone)
     user = await dao.update_user(user_id, first_name, last_name, patronymic, email, phone, bonus_score, car_info, additional_info)
     
     if not user:
@@ -114,20 +250,82 @@ async def update_user(
             detail='User not found'
         )
     
+    return user
+
+@router.post('/users/bonus', tags=['users'])
+async def add_bonuses(
+    changes: list[BonusChangeSchema] = Body(..., max_length=BONUS_BULK_MAX_ITEMS),
+    dao: UserDAO = Depends(get_user_dao)
+) -> dict:
+    """Пакетное атомарное изменение бонусных баллов.
+
+    Все изменения применяются одним запросом к БД. Пользователи, которых
+    нет или у которых недостаточно баллов, не изменяются и возвращаются
+    с ошибкой, остальные изменения применяются.
+    """
+    deltas = {change.user_id: change.delta for change in changes}
+    if len(deltas) != len(changes):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='user_id must be unique within a request'
+        )
+
+    applied = await dao.add_bonuses(deltas) if deltas else {}
+    failed = [user_id for user_id in deltas if user_id not in applied]
+    existing = {user.id_ for user in await dao.get_users_by_ids(failed)} if failed else set()
+
+    results = []
+    for index, change in enumerate(changes):
+        if change.user_id in applied:
+            results.append({
+                'index': index,
+                'user_id': change.user_id,
+                'bonus_score': applied[change.user_id]
+            })
+        elif change.user_id in existing:
+            results.append({
+                'index': index,
+                'user_id': change.user_id,
+                'errors': [{'loc': ['delta'], 'msg': 'Insufficient bonus score', 'type': 'insufficient'}]
+            })
+        else:
+            results.append({
+                'index': index,
+                'user_id': change.user_id,
+                'errors': [{'loc': ['user_id'], 'msg': 'User not found', 'type': 'not_found'}]
+            })
     return {
-        'id_': user.id_,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'patronymic': user.patronymic,
-        'email': user.email,
-        'phone': user.phone,
-        'bonus_score': user.bonus_score,
-        'car_info': user.car_info,
-        'additional_info': user.additional_info,
-        'created_to': user.created_to,
-        'update_to': user.update_to
+        'updated': len(applied),
+        'failed': len(failed),
+        'results': results
     }
 
+@router.post('/users/{user_id}/bonus', tags=['users'])
+async def add_bonus(
+    user_id: int,
+    delta: int = Body(..., embed=True, ge=-BONUS_DELTA_LIMIT, le=BONUS_DELTA_LIMIT),
+    dao: UserDAO = Depends(get_user_dao)
+) -> dict:
+    """Атомарное изменение бонусных баллов пользователя на delta.
+
+    Отрицательный delta списывает баллы; если баллов недостаточно,
+    возвращается 409 и баланс не меняется.
+    """
+    bonus_score = await dao.add_bonus(user_id, delta)
+
+    if bonus_score is None:
+        if not await dao.get_user(user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='User not found'
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Insufficient bonus score'
+        )
+
+    return {'id_': user_id, 'bonus_score': bonus_score}
+
 @router.delete('/users/{user_id}', tags=['users'], status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
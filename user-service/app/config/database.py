@@ -18,6 +18,36 @@ class DatabaseSettings(BaseSettings):
     host: str = Field(alias='user_postgres_host')
     db_name: str = Field(alias='user_postgres_db')
 
+    # Пул соединений; NullPool (новое соединение на каждую сессию) для тестов
+    null_pool: bool = Field(False, alias='user_db_null_pool')
+    pool_size: int = Field(10, alias='user_db_pool_size')
+    max_overflow: int = Field(10, alias='user_db_max_overflow')
+    # Сколько секунд ждать свободное соединение из пула
+    pool_timeout: float = Field(30.0, alias='user_db_pool_timeout')
+    # Через сколько секунд соединение переоткрывается
+    pool_recycle: int = Field(1800, alias='user_db_pool_recycle')
+    # Проверка соединения перед выдачей из пула
+    pool_pre_ping: bool = Field(True, alias='user_db_pool_pre_ping')
+    # Кэш подготовленных запросов asyncpg на соединение; 0 для pgbouncer
+    # в режиме transaction
+    statement_cache_size: int = Field(100, alias='user_db_statement_cache_size')
+    # statement_timeout сервера в миллисекундах; 0 отключает ограничение
+    statement_timeout: int = Field(60000, alias='user_db_statement_timeout')
+    # Отдельный пул IdempotencyMiddleware: она держит соединение с захваченным
+    # ключом, пока обработчик запроса работает со своим соединением
+    idempotency_pool_size: int = Field(5, alias='user_db_idempotency_pool_size')
+    idempotency_max_overflow: int = Field(5, alias='user_db_idempotency_max_overflow')
+
+    # Реплика для чтения; не задана — все запросы идут на основной сервер.
+    # Пользователь, пароль и имя БД те же, что у основного сервера
+    replica_host: str | None = Field(None, alias='user_replica_postgres_host')
+    replica_port: int | None = Field(None, alias='user_replica_db_port')
+    replica_connect_timeout: float = Field(2.0, alias='user_replica_connect_timeout')
+    # Сколько секунд после ошибки соединения чтения идут на основной сервер
+    replica_retry_interval: float = Field(30.0, alias='user_replica_retry_interval')
+    # Сколько секунд после изменения данных клиент читает с основного сервера
+    read_your_writes_window: float = Field(5.0, alias='user_read_your_writes_window')
+
     @property
     def db_url(self) -> str:
         """URL для асинхронного подключения к PostgreSQL.
@@ -29,4 +59,19 @@ class DatabaseSettings(BaseSettings):
             f'{ASYNC_DRIVER}://{self.user}:'
             f'{self.password}@{self.host}:'
             f'{self.internal_port}/{self.db_name}'
-        )
\ No newline at end of file
+        )
+
+    @property
+    def replica_db_url(self) -> str | None:
+        """URL для асинхронного подключения к реплике или None.
+
+        Returns:
+            str | None: Строка подключения.
+        """
+        if self.replica_host is None:
+            return None
+        return (
+            f'{ASYNC_DRIVER}://{self.user}:'
+            f'{self.password}@{self.replica_host}:'
+            f'{self.replica_port or self.internal_port}/{self.db_name}'
+        )
@@ -1,11 +1,33 @@
 """Модуль для работы с пользователями в базе данных."""
+from datetime import timedelta
 from uuid import UUID
 from typing import List, Optional
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, insert, update, delete, func, any_, bindparam, \
+    Integer, RowMapping
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.models import UserModel
+from app.database.models import IdempotencyKeyModel, UserModel
+
+# Колонки списка пользователей: поля ответа API. Списки читаются этими
+# колонками, а не ORM-объектами: строки не попадают в identity map сессии,
+# и на больших списках это вдвое быстрее и экономнее по памяти
+# (benchmarks/bench_list_reads.py)
+USER_LIST_COLUMNS = (
+    UserModel.id_,
+    UserModel.first_name,
+    UserModel.last_name,
+    UserModel.patronymic,
+    UserModel.email,
+    UserModel.phone,
+    UserModel.bonus_score,
+    UserModel.car_info,
+    UserModel.additional_info,
+    UserModel.created_to,
+    UserModel.update_to,
+)
 
 
 class UserDAO:
@@ -22,19 +44,31 @@ class UserDAO:
         email: str = None,
         phone: str = None,
         bonus_score: int = 0
-    ) -> UserModel:
-        """Создание нового пользователя."""
-        user = UserModel(
-            first_name=first_name,
-            last_name=last_name,
-            patronymic=patronymic,
-            email=email,
-            phone=phone,
-            bonus_score=bonus_score
-        )
-        self.db.add(user)
+    ) -> Optional[UserModel]:
+        """Создание нового пользователя одним INSERT ... RETURNING.
+
+        id и даты, которые заполняет сервер, возвращаются тем же запросом.
+
+        Returns:
+            Optional[UserModel]: Пользователь или None, если email или
+            телефон уже заняты.
+        """
+        try:
+            result = await self.db.execute(
+                insert(UserModel).values(
+                    first_name=first_name,
+                    last_name=last_name,
+                    patronymic=patronymic,
+                    email=email,
+                    phone=phone,
+                    bonus_score=bonus_score
+                ).returning(UserModel)
+            )
+        except IntegrityError:
+            await self.db.rollback()
+            return None
+        user = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(user)
         return user
     
     async def get_user(self, user_id: int) -> Optional[UserModel]:
@@ -44,11 +78,42 @@ class UserDAO:
         )
         return result.scalar_one_or_none()
     
-    async def get_users(self) -> List[UserModel]:
-        """Получение всех пользователей."""
-        result = await self.db.execute(select(UserModel))
+    async def get_user_by_email(self, email: str) -> Optional[UserModel]:
+        """Получение пользователя по нормализованному email (уникальный индекс)."""
+        result = await self.db.execute(
+            select(UserModel).where(UserModel.email == email)
+        )
+        return result.scalar_one_or_none()
+    
+    async def get_user_by_phone(self, phone: str) -> Optional[UserModel]:
+        """Получение пользователя по телефону в формате E.164 (уникальный индекс)."""
+        result = await self.db.execute(
+            select(UserModel).where(UserModel.phone == phone)
+        )
+        return result.scalar_one_or_none()
+    
+    async def get_users_by_ids(self, user_ids: List[int]) -> List[UserModel]:
+        """Получение пользователей по списку ID одним запросом.
+
+        Список передается одним параметром-массивом (id = ANY($1)), поэтому
+        текст запроса не зависит от количества ID. Порядок не гарантируется.
+        """
+        result = await self.db.execute(
+            select(UserModel).where(
+                UserModel.id_ == any_(bindparam('user_ids', user_ids, type_=ARRAY(Integer)))
+            )
+        )
         return result.scalars().all()
     
+    async def get_users(self) -> List[RowMapping]:
+        """Получение всех пользователей (колонки USER_LIST_COLUMNS).
+
+        Строки возвращаются как RowMapping: из него схема ответа собирается
+        быстрее, чем из атрибутов Row.
+        """
+        result = await self.db.execute(select(*USER_LIST_COLUMNS))
+        return result.mappings().all()
+    
     async def update_user(
         self,
         user_id: int,
@@ -61,36 +126,186 @@ class UserDAO:
         car_info: str = None,
         additional_info: str = None
     ) -> Optional[UserModel]:
-        """Обновление пользователя."""
-        user = await self.get_user(user_id)
-        if not user:
-            return None
-        
+        """Обновление пользователя одним UPDATE ... RETURNING.
+
+        Returns:
+            Optional[UserModel]: Пользователь или None, если его нет.
+        """
+        values = {}
         if first_name is not None:
-            user.first_name = first_name
+            values['first_name'] = first_name
         if last_name is not None:
-            user.last_name = last_name
+            values['last_name'] = last_name
         if patronymic is not None:
-            user.patronymic = patronymic
+            values['patronymic'] = patronymic
         if email is not None:
-            user.email = email
+            values['email'] = email
         if phone is not None:
-            user.phone = phone
+            values['phone'] = phone
         if bonus_score is not None:
-            user.bonus_score = bonus_score
+            values['bonus_score'] = bonus_score
         if car_info is not None:
-            user.car_info = car_info
+            values['car_info'] = car_info
         if additional_info is not None:
-            user.additional_info = additional_info
-        
+            values['additional_info'] = additional_info
+        if not values:
+            return await self.get_user(user_id)
+
+        result = await self.db.execute(
+            update(UserModel)
+            .where(UserModel.id_ == user_id)
+            .values(**values)
+            .returning(UserModel)
+            .execution_options(populate_existing=True)
+        )
+        user = result.scalar_one_or_none()
         await self.db.commit()
-        await self.db.refresh(user)
         return user
     
+    async def add_bonus(self, user_id: int, delta: int) -> Optional[int]:
+        """Атомарное изменение бонусных баллов на delta.
+
+        Выполняется одним UPDATE ... RETURNING, поэтому одновременные
+        изменения не теряются, а баланс не становится отрицательным.
+
+        Returns:
+            Optional[int]: Новый баланс или None, если пользователя нет
+            или баллов недостаточно для списания.
+        """
+        result = await self.db.execute(
+            update(UserModel)
+            .where(UserModel.id_ == user_id, UserModel.bonus_score + delta >= 0)
+            .values(bonus_score=UserModel.bonus_score + delta)
+            .returning(UserModel.bonus_score)
+            .execution_options(synchronize_session=False)
+        )
+        bonus_score = result.scalar_one_or_none()
+        await self.db.commit()
+        return bonus_score
+    
+    async def add_bonuses(self, deltas: dict[int, int]) -> dict[int, int]:
+        """Атомарное изменение бонусных баллов нескольких пользователей.
+
+        Изменения применяются одним UPDATE ... FROM unnest(...) RETURNING;
+        строки предварительно блокируются в порядке id, чтобы параллельные
+        пакеты с общими пользователями не взаимоблокировались. Пользователи,
+        у которых баллов недостаточно, не изменяются.
+
+        Args:
+            deltas: Изменение баллов по id пользователя
+
+        Returns:
+            dict[int, int]: Новый баланс по id измененных пользователей
+        """
+        user_ids = bindparam('user_ids', list(deltas), type_=ARRAY(Integer))
+        await self.db.execute(
+            select(UserModel.id_)
+            .where(UserModel.id_ == any_(user_ids))
+            .order_by(UserModel.id_)
+            .with_for_update()
+        )
+        changes = select(
+            func.unnest(user_ids).label('user_id'),
+            func.unnest(
+                bindparam('deltas', list(deltas.values()), type_=ARRAY(Integer))
+            ).label('delta'),
+        ).subquery('changes')
+        result = await self.db.execute(
+            update(UserModel)
+            .where(
+                UserModel.id_ == changes.c.user_id,
+                UserModel.bonus_score + changes.c.delta >= 0
+            )
+            .values(bonus_score=UserModel.bonus_score + changes.c.delta)
+            .returning(UserModel.id_, UserModel.bonus_score)
+            .execution_options(synchronize_session=False)
+        )
+        applied = dict(result.tuples().all())
+        await self.db.commit()
+        return applied
+    
     async def delete_user(self, user_id: int) -> bool:
         """Удаление пользователя. Возвращает True, если пользователь был удален."""
         result = await self.db.execute(
             delete(UserModel).where(UserModel.id_ == user_id)
         )
         await self.db.commit()
-        return result.rowcount > 0
\ No newline at end of file
+        return result.rowcount > 0
+
+
+class IdempotencyDAO:
+    """Класс для работы с ключами идемпотентности."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def claim(
+        self,
+        key: str,
+        fingerprint: str,
+        lock_timeout: float
+    ) -> Optional[IdempotencyKeyModel]:
+        """Захват ключа для обработки запроса.
+
+        Ключ вставляется в незавершенной транзакции, которая остается
+        открытой до complete(). Параллельный запрос с тем же ключом ждет
+        на вставке, пока первый не завершится, и получает его ответ.
+        Если первый запрос откатился, ключ захватывает второй.
+
+        Args:
+            key: Значение Idempotency-Key
+            fingerprint: Хэш запроса
+            lock_timeout: Сколько секунд ждать запрос с тем же ключом
+
+        Returns:
+            Optional[IdempotencyKeyModel]: None, если ключ захвачен,
+            иначе сохраненный ответ.
+
+        Raises:
+            DBAPIError: Запрос с тем же ключом не завершился за lock_timeout.
+        """
+        await self.db.execute(select(func.set_config(
+            'lock_timeout', f'{int(lock_timeout * 1000)}ms', True
+        )))
+        result = await self.db.execute(
+            pg_insert(IdempotencyKeyModel)
+            .values(key=key, fingerprint=fingerprint)
+            .on_conflict_do_nothing(index_elements=['key'])
+            .returning(IdempotencyKeyModel.key)
+        )
+        if result.scalar_one_or_none() is not None:
+            return None
+
+        result = await self.db.execute(
+            select(IdempotencyKeyModel).where(IdempotencyKeyModel.key == key)
+        )
+        stored = result.scalar_one_or_none()
+        await self.db.commit()
+        if stored is None:
+            # Ключ удален очисткой между вставкой и чтением
+            return await self.claim(key, fingerprint, lock_timeout)
+        return stored
+
+    async def complete(
+        self,
+        key: str,
+        status_code: int,
+        content_type: Optional[str],
+        body: bytes
+    ) -> None:
+        """Сохранение ответа на захваченный ключ и освобождение ожидающих."""
+        await self.db.execute(
+            update(IdempotencyKeyModel)
+            .where(IdempotencyKeyModel.key == key)
+            .values(status_code=status_code, content_type=content_type, body=body)
+        )
+        await self.db.commit()
+
+    async def delete_expired(self, ttl: timedelta) -> int:
+        """Удаление ключей старше ttl. Возвращает число удаленных ключей."""
+        result = await self.db.execute(
+            delete(IdempotencyKeyModel)
+            .where(IdempotencyKeyModel.created_to < func.now() - ttl)
+        )
+        await self.db.commit()
+        return result.rowcount
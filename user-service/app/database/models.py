@@ -1,7 +1,7 @@
 """Модуль моделей SQLAlchemy для пользователей."""
 from datetime import datetime
 
-from sqlalchemy import Integer, String, DateTime, func
+from sqlalchemy import Integer, String, DateTime, func, LargeBinary
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -92,3 +92,50 @@ class UserModel(BaseModel):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+
+class IdempotencyKeyModel(BaseModel):
+    """Ответы на запросы с заголовком Idempotency-Key.
+
+    Args:
+        key: Значение Idempotency-Key
+        fingerprint: Хэш метода, пути, параметров и тела запроса
+        status_code: Код статуса ответа
+        content_type: Content-Type ответа
+        body: Тело ответа
+        created_to: Дата и время первого запроса
+    """
+
+    __tablename__ = 'idempotency_keys'
+
+    key: Mapped[str] = mapped_column(
+        name='key',
+        type_=String(length=255),
+        primary_key=True,
+    )
+    fingerprint: Mapped[str] = mapped_column(
+        name='fingerprint',
+        type_=String(length=64),
+        nullable=False,
+    )
+    status_code: Mapped[int] = mapped_column(
+        name='status_code',
+        type_=Integer,
+        nullable=True,
+    )
+    content_type: Mapped[str] = mapped_column(
+        name='content_type',
+        type_=String(length=100),
+        nullable=True,
+    )
+    body: Mapped[bytes] = mapped_column(
+        name='body',
+        type_=LargeBinary,
+        nullable=True,
+    )
+    created_to: Mapped[datetime] = mapped_column(
+        name='created_to',
+        type_=DateTime(timezone=True),
+        server_default=func.now(),
+        index=True,
+    )
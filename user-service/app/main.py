@@ -1,7 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from app.api import router
+from app.database_config import idempotency_session_maker, settings
+from app.idempotency import IdempotencyMiddleware, sweep_idempotency_keys
+from app.read_replica import ReadYourWritesMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Фоновая очистка ключей идемпотентности."""
+    sweeper = asyncio.create_task(sweep_idempotency_keys(idempotency_session_maker))
+    yield
+    sweeper.cancel()
+    with suppress(asyncio.CancelledError):
+        await sweeper
+
+app = FastAPI(
+    title='User Service',
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+app.add_middleware(
+    IdempotencyMiddleware,
+    session_maker=idempotency_session_maker,
+    routes=frozenset({
+        ('POST', '/users'),
+        ('POST', '/users/bonus'),
+        ('POST', '/users/{user_id}/bonus'),
+    })
+)
 
-app = FastAPI(title='User Service')
+app.add_middleware(
+    ReadYourWritesMiddleware,
+    window=settings.read_your_writes_window
+)
 
 app.include_router(router)
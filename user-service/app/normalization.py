@@ -0,0 +1,47 @@
+"""Приведение контактов пользователя к единому виду."""
+import re
+
+# Код страны для номеров, записанных без него (8XXXXXXXXXX, XXXXXXXXXX)
+DEFAULT_COUNTRY_CODE = '7'
+
+PHONE_SEPARATORS_RE = re.compile(r'[\s\-().]')
+
+
+def normalize_phone(phone: str) -> str:
+    """Номер телефона в формате E.164: '+' и от 8 до 15 цифр.
+
+    Пробелы, дефисы, скобки и точки удаляются; международный префикс 00
+    заменяется на '+'; российские номера без кода страны (8XXXXXXXXXX,
+    7XXXXXXXXXX, XXXXXXXXXX) дополняются кодом DEFAULT_COUNTRY_CODE.
+
+    Raises:
+        ValueError: Строку нельзя привести к номеру E.164.
+    """
+    cleaned = PHONE_SEPARATORS_RE.sub('', phone)
+    if cleaned.startswith('+'):
+        digits = cleaned[1:]
+    elif cleaned.startswith('00'):
+        digits = cleaned[2:]
+    elif len(cleaned) == 11 and cleaned[0] in '78':
+        digits = DEFAULT_COUNTRY_CODE + cleaned[1:]
+    elif len(cleaned) == 10:
+        digits = DEFAULT_COUNTRY_CODE + cleaned
+    else:
+        raise ValueError(f'Invalid phone number: {phone}')
+
+    if not (digits.isascii() and digits.isdigit() and 8 <= len(digits) <= 15):
+        raise ValueError(f'Invalid phone number: {phone}')
+    return f'+{digits}'
+
+
+def normalize_email(email: str) -> str:
+    """Email без пробелов по краям в нижнем регистре.
+
+    Raises:
+        ValueError: В строке нет '@' с непустыми частями по обе стороны.
+    """
+    normalized = email.strip().lower()
+    local, _, domain = normalized.rpartition('@')
+    if not local or not domain:
+        raise ValueError(f'Invalid email: {email}')
+    return normalized
@@ -0,0 +1,114 @@
+"""Чтение с реплики БД с переходом на основной сервер."""
+import asyncio
+import logging
+import math
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Cookie, пока действует которая, чтения клиента идут на основной сервер
+PRIMARY_COOKIE = 'db_primary_until'
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+def pinned_to_primary(request: Request) -> bool:
+    """Изменял ли клиент данные недавно (read-your-writes)."""
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Cookie db_primary_until в ответ на успешный изменяющий запрос.
+
+    Cookie действует window секунд и ограничена ресурсом запроса (первым
+    сегментом пути), поэтому только чтения этого ресурса идут на основной
+    сервер и видят запись клиента, даже если реплика отстает.
+    """
+
+    def __init__(self, app: ASGIApp, window: float):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] in SAFE_METHODS or self.window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message['type'] == 'http.response.start' and message['status'] < 400:
+                resource = scope['path'].lstrip('/').split('/')[0]
+                cookie = (
+                    f'{PRIMARY_COOKIE}={time.time() + self.window:.3f}; '
+                    f'Max-Age={math.ceil(self.window)}; Path=/{resource}; '
+                    f'HttpOnly; SameSite=Lax'
+                )
+                message['headers'] = [*message.get('headers', []), (b'set-cookie', cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+class ReadSessionRouter:
+    """Выбор сессии для чтения: реплика или основной сервер.
+
+    Если реплика не задана, клиент недавно изменял данные или соединение
+    с репликой не удалось, сессия открывается на основном сервере. После
+    ошибки реплика не используется retry_interval секунд.
+
+    Args:
+        primary: Фабрика сессий основного сервера
+        replica: Фабрика сессий реплики или None
+        retry_interval: Через сколько секунд снова пробовать реплику после ошибки
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replica: async_sessionmaker | None,
+        retry_interval: float = 30.0
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.retry_interval = retry_interval
+        self.fallbacks = 0
+        self._failed_until = 0.0
+
+    @property
+    def replica_available(self) -> bool:
+        """Задана ли реплика и не было ли недавно ошибки соединения с ней."""
+        return self.replica is not None and time.monotonic() >= self._failed_until
+
+    async def session(self, pinned: bool = False) -> AsyncSession:
+        """Сессия для чтения; закрывать ее должен вызывающий код.
+
+        Соединение с репликой проверяется сразу, чтобы при ее недоступности
+        запрос прочитал данные с основного сервера, а не завершился ошибкой.
+        """
+        if pinned or not self.replica_available:
+            return self.primary()
+
+        session = self.replica()
+        try:
+            await session.connection()
+        except (OSError, SQLAlchemyError, asyncio.TimeoutError):
+            await session.close()
+            self.fallbacks += 1
+            self._failed_until = time.monotonic() + self.retry_interval
+            logger.warning('Replica is unavailable, reading from primary', exc_info=True)
+            return self.primary()
+        return session
+
+    def stats(self) -> dict:
+        """Состояние реплики для мониторинга."""
+        return {
+            'configured': self.replica is not None,
+            'available': self.replica_available,
+            'fallbacks': self.fallbacks,
+        }
@@ -0,0 +1,64 @@
+"""Pydantic-схемы пользователей."""
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+# Предел |delta| — граница колонки bonus_score (integer): больший delta
+# PostgreSQL отклоняет с ошибкой переполнения
+BONUS_DELTA_LIMIT = 2 ** 31 - 1
+
+
+class BonusChangeSchema(BaseModel):
+    """Изменение бонусных баллов пользователя.
+
+    Args:
+        user_id: id пользователя
+        delta: На сколько изменить баллы (отрицательное значение списывает)
+    """
+
+    user_id: int
+    delta: int = Field(ge=-BONUS_DELTA_LIMIT, le=BONUS_DELTA_LIMIT)
+
+
+class UserSchema(BaseModel):
+    """Пользователь в ответах API.
+
+    Args:
+        id_: id пользователя
+        first_name: Имя пользователя
+        last_name: Фамилия пользователя
+        patronymic: Отчество пользователя
+        email: Контактный email
+        phone: Контактный номер телефона
+        bonus_score: Бонусные баллы
+        car_info: Информация об автомобиле пользователя
+        additional_info: Дополнительная информация от пользователя
+        created_to: Дата и время создания пользователя
+        update_to: Дата и время обновления пользователя
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id_: int
+    first_name: str
+    last_name: str
+    patronymic: str | None = None
+    email: str
+    phone: str
+    bonus_score: int
+    car_info: str | None = None
+    additional_info: str | None = None
+    created_to: datetime
+    update_to: datetime
+
+
+class UserBatchSchema(BaseModel):
+    """Пользователи, запрошенные списком ID.
+
+    Args:
+        items: Найденные пользователи в порядке запроса
+        missing: ID, для которых пользователь не найден
+    """
+
+    items: list[UserSchema]
+    missing: list[int]
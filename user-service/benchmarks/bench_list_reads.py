@@ -0,0 +1,115 @@
+"""Бенчмарк чтения списка пользователей: ORM-объекты и Row по колонкам.
+
+Добавляет --rows пользователей в транзакции, которая в конце
+откатывается, и сравнивает чтение select(UserModel) с ORM-объектами
+и UserDAO.get_users() со строками RowMapping только нужных колонок. Для
+каждого способа замеряется время чтения, время чтения с сериализацией
+в JSON, как в GET /users, и пиковая память Python (tracemalloc).
+Рабочие данные не изменяются.
+
+Запуск из каталога user-service с переменными окружения сервиса:
+    python -m benchmarks.bench_list_reads --rows 100000 --repeat 5
+"""
+import argparse
+import asyncio
+import gc
+import statistics
+import time
+import tracemalloc
+
+import orjson
+from dotenv import load_dotenv
+from pydantic import TypeAdapter
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config.database import DatabaseSettings
+from app.database.dao import UserDAO
+from app.database.models import UserModel
+from app.schemas import UserSchema
+
+users_adapter = TypeAdapter(list[UserSchema])
+
+
+async def load_orm(session: AsyncSession) -> list:
+    """Прежний способ: ORM-объекты в identity map сессии."""
+    result = await session.execute(select(UserModel))
+    return result.scalars().all()
+
+
+async def load_rows(session: AsyncSession) -> list:
+    """Текущий способ: RowMapping только с колонками списка."""
+    return await UserDAO(session).get_users()
+
+
+def serialize(users: list) -> bytes:
+    """Сериализация списка, как в GET /users."""
+    return orjson.dumps(
+        users_adapter.dump_python(users_adapter.validate_python(users), mode='json')
+    )
+
+
+async def measure(conn, load, label: str, repeat: int) -> None:
+    """Время чтения, чтения с сериализацией и пиковая память."""
+    fetch, total = [], []
+    for _ in range(repeat):
+        # Новая сессия на каждый замер, чтобы identity map был пустым
+        async with AsyncSession(bind=conn) as session:
+            gc.collect()
+            started = time.perf_counter()
+            users = await load(session)
+            fetched = time.perf_counter()
+            serialize(users)
+            finished = time.perf_counter()
+        fetch.append((fetched - started) * 1000)
+        total.append((finished - started) * 1000)
+        del users
+
+    async with AsyncSession(bind=conn) as session:
+        gc.collect()
+        tracemalloc.start()
+        users = await load(session)
+        loaded, _ = tracemalloc.get_traced_memory()
+        serialize(users)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del users
+
+    print(
+        f'{label:<5} fetch {statistics.median(fetch):8.1f} ms'
+        f'   fetch+json {statistics.median(total):8.1f} ms'
+        f'   rows in memory {loaded / 2 ** 20:7.1f} MiB'
+        f'   peak {peak / 2 ** 20:7.1f} MiB'
+    )
+
+
+async def main(rows: int, repeat: int) -> None:
+    load_dotenv()
+    engine = create_async_engine(DatabaseSettings().db_url)
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        await conn.execute(text(
+            "INSERT INTO users (first_name, last_name, patronymic, email, phone, "
+            "bonus_score, car_info) "
+            "SELECT 'Иван', 'Петров', 'Сергеевич', 'bench' || i || '@example.com', "
+            "'+7999' || lpad(i::text, 7, '0'), i % 1000, 'Lada Vesta' "
+            "FROM generate_series(1, :rows) AS i"
+        ), {'rows': rows})
+        total = (await conn.execute(text('SELECT count(*) FROM users'))).scalar()
+        print(f'users: {total} ({rows} added), repeat: {repeat}')
+
+        await measure(conn, load_orm, 'orm', repeat)
+        await measure(conn, load_rows, 'rows', repeat)
+
+        await transaction.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
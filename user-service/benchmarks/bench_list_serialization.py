@@ -0,0 +1,146 @@
+"""Бенчмарк сериализации списка пользователей.
+
+Сравнивает прежний способ (словари, собранные вручную, и JSONResponse
+с json.dumps) с response_model=list[UserSchema] и ORJSONResponse
+на списке из --rows пользователей. Запросы идут в приложение через
+ASGI без сервера и без БД: DAO подменяется списком моделей в памяти.
+
+Запуск из каталога user-service с переменными окружения сервиса:
+    python -m benchmarks.bench_list_serialization --rows 10000 --requests 30
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse
+
+
+def make_users(rows: int) -> list:
+    """Пользователи в памяти, как после загрузки из БД."""
+    from app.database.models import UserModel
+
+    now = datetime.now(timezone.utc)
+    return [
+        UserModel(
+            id_=i,
+            first_name='Иван',
+            last_name='Петров',
+            patronymic='Сергеевич' if i % 2 else None,
+            email=f'user{i}@example.com',
+            phone=f'+7900{i:07d}',
+            bonus_score=i % 1000,
+            car_info='Lada Vesta' if i % 3 else None,
+            additional_info=None,
+            created_to=now,
+            update_to=now,
+        ) for i in range(rows)
+    ]
+
+
+def dict_app(users: list) -> FastAPI:
+    """Прежняя реализация GET /users: словари собираются в обработчике."""
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get('/users')
+    async def get_users() -> list[dict]:
+        return [
+            {
+                'id_': user.id_,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'patronymic': user.patronymic,
+                'email': user.email,
+                'phone': user.phone,
+                'bonus_score': user.bonus_score,
+                'car_info': user.car_info,
+                'additional_info': user.additional_info,
+                'created_to': user.created_to,
+                'update_to': user.update_to
+            } for user in users
+        ]
+
+    return app
+
+
+def schema_app(users: list) -> FastAPI:
+    """Текущая реализация: роутер сервиса с подмененным DAO."""
+    from fastapi.responses import ORJSONResponse
+
+    from app.api import get_read_user_dao, router
+
+    class MemoryUserDAO:
+        async def get_users(self) -> list:
+            return users
+
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(router)
+    app.dependency_overrides[get_read_user_dao] = MemoryUserDAO
+    return app
+
+
+async def request(app: FastAPI, path: str) -> bytes:
+    """GET-запрос напрямую в ASGI-приложение; тело ответа."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [],
+        'client': ('127.0.0.1', 0),
+        'server': ('bench', 80),
+    }
+    chunks = []
+
+    async def receive() -> dict:
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: dict) -> None:
+        if message['type'] == 'http.response.start':
+            assert message['status'] == 200, message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return b''.join(chunks)
+
+
+async def main(rows: int, requests: int) -> None:
+    load_dotenv()
+    users = make_users(rows)
+    apps = {'dict': dict_app(users), 'schema': schema_app(users)}
+    bodies = {label: await request(app, '/users') for label, app in apps.items()}
+    assert len({len(body) for body in bodies.values()}) == 1
+
+    # Варианты чередуются, чтобы фоновая нагрузка влияла на них одинаково;
+    # min меньше всего зависит от шума, медиана показывает типичный запрос
+    timings = {label: [] for label in apps}
+    for _ in range(requests):
+        for label, app in apps.items():
+            started = time.perf_counter()
+            await request(app, '/users')
+            timings[label].append((time.perf_counter() - started) * 1000)
+
+    print(f'rows: {rows}, requests: {requests}, body: {len(bodies["dict"]) / 1024:.0f} KiB')
+    for label, values in timings.items():
+        print(
+            f'{label:<8} min {min(values):8.1f} ms'
+            f'   median {statistics.median(values):8.1f} ms'
+            f'   per row {min(values) * 1000 / rows:6.2f} us'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--requests', type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.requests))
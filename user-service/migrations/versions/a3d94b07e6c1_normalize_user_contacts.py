@@ -0,0 +1,63 @@
+"""normalize user contacts
+
+Revision ID: a3d94b07e6c1
+Revises: 5f0a8d3c71b4
+Create Date: 2026-10-18 19:52:44.630215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d94b07e6c1'
+down_revision: Union[str, Sequence[str], None] = '5f0a8d3c71b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Те же правила, что в app.normalization; NULL, если номер не распознан
+PHONE_EXPRESSION = r"""
+CASE
+    WHEN c ~ '^\+[0-9]{8,15}$' THEN c
+    WHEN c ~ '^00[0-9]{8,15}$' THEN '+' || substr(c, 3)
+    WHEN c ~ '^[78][0-9]{10}$' THEN '+7' || substr(c, 2)
+    WHEN c ~ '^[0-9]{10}$' THEN '+7' || c
+END
+FROM (SELECT regexp_replace(phone, '[\s().-]', '', 'g') AS c) AS cleaned
+"""
+
+EMAIL_EXPRESSION = 'lower(trim(email))'
+
+# Значение обновляется, только если после нормализации оно ни с кем
+# не совпадает; такие строки остаются как есть и требуют ручного разбора
+NORMALIZE = """
+WITH normalized AS (
+    SELECT id, (SELECT {expression}) AS value FROM users
+),
+unique_values AS (
+    SELECT value FROM normalized
+    WHERE value IS NOT NULL
+    GROUP BY value
+    HAVING count(*) = 1
+)
+UPDATE users SET {column} = normalized.value
+FROM normalized
+WHERE users.id = normalized.id
+    AND users.{column} <> normalized.value
+    AND normalized.value IN (SELECT value FROM unique_values)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(NORMALIZE.format(column='email', expression=EMAIL_EXPRESSION))
+    op.execute(NORMALIZE.format(column='phone', expression=PHONE_EXPRESSION))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Исходное написание контактов не сохраняется
+    pass
@@ -0,0 +1,88 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from hamcrest import assert_that, equal_to, has_entries
+
+from app.api import MAX_BATCH_IDS, get_user_list_dao
+from app.main import app
+
+
+def make_user(id_: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id_=id_,
+        first_name='Иван',
+        last_name=f'Петров {id_}',
+        patronymic=None,
+        email=f'user{id_}@example.com',
+        phone=f'+7912000{id_:04d}',
+        bonus_score=0,
+        car_info=None,
+        additional_info=None,
+        created_to=datetime(2026, 1, 1),
+        update_to=datetime(2026, 1, 1),
+    )
+
+
+class UsersByIdsDAO:
+    """UserDAO, возвращающий существующих пользователей в произвольном порядке."""
+
+    def __init__(self, user_ids: set[int]):
+        self.user_ids = user_ids
+        self.calls = []
+
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[SimpleNamespace]:
+        self.calls.append(user_ids)
+        return [make_user(id_) for id_ in sorted(user_ids, reverse=True) if id_ in self.user_ids]
+
+
+@pytest.fixture
+def users_dao() -> UsersByIdsDAO:
+    dao = UsersByIdsDAO({1, 2, 3})
+    app.dependency_overrides[get_user_list_dao] = lambda: dao
+    yield dao
+    app.dependency_overrides.clear()
+
+
+class TestGetUsersByIds:
+    def test_items_in_request_order(self, http_client: TestClient, users_dao: UsersByIdsDAO) -> None:
+        """items в порядке ids без повторов, ненайденные ID — в missing,
+        пользователи загружаются одним запросом к DAO."""
+        response = http_client.get('/users', params={'ids': '3,404,1,3, 2'})
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(200))
+        body = response.json()
+        assert_that(
+            actual_or_assertion=[user['id_'] for user in body['items']],
+            matcher=equal_to([3, 1, 2]),
+        )
+        assert_that(actual_or_assertion=body['missing'], matcher=equal_to([404]))
+        assert_that(
+            actual_or_assertion=body['items'][0],
+            matcher=has_entries({'email': 'user3@example.com', 'phone': '+79120000003'}),
+        )
+        assert_that(actual_or_assertion=users_dao.calls, matcher=equal_to([[3, 404, 1, 2]]))
+
+    @pytest.mark.parametrize('ids', [
+        'abc',
+        '1,x',
+        '',
+        ',',
+        ','.join(map(str, range(1, MAX_BATCH_IDS + 2))),
+    ])
+    def test_invalid_ids(self, http_client: TestClient, users_dao: UsersByIdsDAO, ids: str) -> None:
+        """Нечисловые ID, пустой список и больше MAX_BATCH_IDS ID — 422 без запроса к БД."""
+        response = http_client.get('/users', params={'ids': ids})
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(422))
+        assert_that(actual_or_assertion=users_dao.calls, matcher=equal_to([]))
+
+    def test_max_batch(self, http_client: TestClient, users_dao: UsersByIdsDAO) -> None:
+        """MAX_BATCH_IDS ID — допустимый размер запроса."""
+        response = http_client.get('/users', params={
+            'ids': ','.join(map(str, range(1, MAX_BATCH_IDS + 1)))
+        })
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(200))
+        assert_that(actual_or_assertion=len(response.json()['missing']), matcher=equal_to(MAX_BATCH_IDS - 3))
@@ -0,0 +1,149 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from hamcrest import assert_that, equal_to, has_entries
+
+from app.api import get_user_dao
+from app.main import app
+from app.schemas import BONUS_DELTA_LIMIT
+
+
+def create_user(client: TestClient, bonus_score: int) -> int:
+    """Создание пользователя с заданным балансом, возвращает его id."""
+    response = client.post('/users', params={
+        'first_name': 'Иван',
+        'last_name': 'Петров',
+        'email': f'ivan{bonus_score}@example.com',
+        'phone': f'+7912{bonus_score:07d}',
+        'bonus_score': bonus_score,
+    })
+    assert_that(actual_or_assertion=response.status_code, matcher=equal_to(201))
+    return response.json()['id_']
+
+
+def bonus_score(client: TestClient, user_id: int) -> int:
+    return client.get(f'/users/{user_id}').json()['bonus_score']
+
+
+class BonusDAO:
+    """UserDAO с балансами в памяти для пакетного изменения баллов."""
+
+    def __init__(self, balances: dict[int, int]):
+        self.balances = balances
+
+    async def add_bonuses(self, deltas: dict[int, int]) -> dict[int, int]:
+        applied = {}
+        for user_id, delta in deltas.items():
+            if user_id in self.balances and self.balances[user_id] + delta >= 0:
+                self.balances[user_id] += delta
+                applied[user_id] = self.balances[user_id]
+        return applied
+
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[SimpleNamespace]:
+        return [SimpleNamespace(id_=user_id) for user_id in user_ids if user_id in self.balances]
+
+
+@pytest.fixture
+def bonus_dao() -> BonusDAO:
+    """Подмена UserDAO для POST /users/bonus (UPDATE ... FROM unnest
+    выполняется только в PostgreSQL)."""
+    dao = BonusDAO({1: 100, 2: 10})
+    app.dependency_overrides[get_user_dao] = lambda: dao
+    yield dao
+    app.dependency_overrides.clear()
+
+
+class TestAddBonus:
+    def test_add_and_spend(self, sqlite_client: TestClient) -> None:
+        """Начисление и списание возвращают новый баланс."""
+        user_id = create_user(sqlite_client, 100)
+
+        response = sqlite_client.post(f'/users/{user_id}/bonus', json={'delta': 50})
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(200))
+        assert_that(
+            actual_or_assertion=response.json(),
+            matcher=equal_to({'id_': user_id, 'bonus_score': 150}),
+        )
+
+        response = sqlite_client.post(f'/users/{user_id}/bonus', json={'delta': -150})
+        assert_that(actual_or_assertion=response.json()['bonus_score'], matcher=equal_to(0))
+        assert_that(actual_or_assertion=bonus_score(sqlite_client, user_id), matcher=equal_to(0))
+
+    def test_insufficient_bonus_score(self, sqlite_client: TestClient) -> None:
+        """Списание больше баланса — 409, баланс не меняется."""
+        user_id = create_user(sqlite_client, 100)
+
+        response = sqlite_client.post(f'/users/{user_id}/bonus', json={'delta': -101})
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(409))
+        assert_that(
+            actual_or_assertion=response.json(),
+            matcher=has_entries({'detail': 'Insufficient bonus score'}),
+        )
+        assert_that(actual_or_assertion=bonus_score(sqlite_client, user_id), matcher=equal_to(100))
+
+    def test_unknown_user(self, sqlite_client: TestClient) -> None:
+        """Изменение баллов несуществующего пользователя — 404."""
+        response = sqlite_client.post('/users/404/bonus', json={'delta': 10})
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(404))
+
+    @pytest.mark.parametrize('delta', [BONUS_DELTA_LIMIT + 1, -BONUS_DELTA_LIMIT - 1, 10 ** 20])
+    def test_delta_out_of_range(self, sqlite_client: TestClient, delta: int) -> None:
+        """delta за пределами integer отклоняется с 422, а не ошибкой БД."""
+        user_id = create_user(sqlite_client, 100)
+
+        response = sqlite_client.post(f'/users/{user_id}/bonus', json={'delta': delta})
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(422))
+        assert_that(actual_or_assertion=bonus_score(sqlite_client, user_id), matcher=equal_to(100))
+
+
+class TestAddBonuses:
+    def test_results_per_item(self, http_client: TestClient, bonus_dao: BonusDAO) -> None:
+        """Результат по каждому элементу: новый баланс, нехватка баллов
+        или отсутствующий пользователь."""
+        response = http_client.post('/users/bonus', json=[
+            {'user_id': 1, 'delta': -30},
+            {'user_id': 2, 'delta': -20},
+            {'user_id': 404, 'delta': 5},
+        ])
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(200))
+        assert_that(actual_or_assertion=response.json(), matcher=equal_to({
+            'updated': 1,
+            'failed': 2,
+            'results': [
+                {'index': 0, 'user_id': 1, 'bonus_score': 70},
+                {
+                    'index': 1,
+                    'user_id': 2,
+                    'errors': [{'loc': ['delta'], 'msg': 'Insufficient bonus score', 'type': 'insufficient'}],
+                },
+                {
+                    'index': 2,
+                    'user_id': 404,
+                    'errors': [{'loc': ['user_id'], 'msg': 'User not found', 'type': 'not_found'}],
+                },
+            ],
+        }))
+        assert_that(actual_or_assertion=bonus_dao.balances, matcher=equal_to({1: 70, 2: 10}))
+
+    def test_duplicate_user_id(self, http_client: TestClient, bonus_dao: BonusDAO) -> None:
+        """Повтор user_id в запросе — 422 без изменений."""
+        response = http_client.post('/users/bonus', json=[
+            {'user_id': 1, 'delta': 10},
+            {'user_id': 1, 'delta': 10},
+        ])
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(422))
+        assert_that(actual_or_assertion=bonus_dao.balances, matcher=equal_to({1: 100, 2: 10}))
+
+    def test_delta_out_of_range(self, http_client: TestClient, bonus_dao: BonusDAO) -> None:
+        """delta за пределами integer отклоняется с 422."""
+        response = http_client.post('/users/bonus', json=[
+            {'user_id': 1, 'delta': BONUS_DELTA_LIMIT + 1},
+        ])
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(422))
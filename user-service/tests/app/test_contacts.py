@@ -0,0 +1,109 @@
+import pytest
+from fastapi.testclient import TestClient
+from hamcrest import assert_that, equal_to, has_entries
+
+
+def create_user(client: TestClient, email: str, phone: str):
+    return client.post('/users', params={
+        'first_name': 'Иван',
+        'last_name': 'Петров',
+        'email': email,
+        'phone': phone,
+    })
+
+
+class TestContacts:
+    def test_contacts_normalized_on_create(self, sqlite_client: TestClient) -> None:
+        """Email сохраняется в нижнем регистре, телефон — в формате E.164."""
+        response = create_user(sqlite_client, ' Ivan.Petrov@Mail.RU ', '8 (912) 345-67-89')
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(201))
+        assert_that(
+            actual_or_assertion=response.json(),
+            matcher=has_entries({'email': 'ivan.petrov@mail.ru', 'phone': '+79123456789'}),
+        )
+
+    @pytest.mark.parametrize('email, phone', [
+        ('ivan@example.com', '12'),
+        ('ivan@example.com', 'abc'),
+        ('ivan.example.com', '+79123456789'),
+    ])
+    def test_invalid_contacts_on_create(self, sqlite_client: TestClient, email: str, phone: str) -> None:
+        """Некорректные email и телефон — 422, пользователь не создается."""
+        response = create_user(sqlite_client, email, phone)
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(422))
+        assert_that(actual_or_assertion=sqlite_client.get('/users').json(), matcher=equal_to([]))
+
+    def test_contacts_normalized_on_update(self, sqlite_client: TestClient) -> None:
+        """PATCH приводит контакты к тому же виду, что и создание."""
+        user_id = create_user(sqlite_client, 'ivan@example.com', '+79123456789').json()['id_']
+
+        response = sqlite_client.patch(f'/users/{user_id}', params={
+            'email': 'IVAN@Example.org',
+            'phone': '9001234567',
+        })
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(200))
+        assert_that(
+            actual_or_assertion=response.json(),
+            matcher=has_entries({'email': 'ivan@example.org', 'phone': '+79001234567'}),
+        )
+
+    @pytest.mark.parametrize('phone', ['', 'abc'])
+    def test_invalid_phone_on_update(self, sqlite_client: TestClient, phone: str) -> None:
+        """Пустой или некорректный телефон в PATCH — 422, контакты не меняются."""
+        user_id = create_user(sqlite_client, 'ivan@example.com', '+79123456789').json()['id_']
+
+        response = sqlite_client.patch(f'/users/{user_id}', params={'phone': phone})
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(422))
+        assert_that(
+            actual_or_assertion=sqlite_client.get(f'/users/{user_id}').json()['phone'],
+            matcher=equal_to('+79123456789'),
+        )
+
+    @pytest.mark.parametrize('email', ['ivan@example.com', 'Ivan@EXAMPLE.com', ' ivan@example.com'])
+    def test_get_by_email(self, sqlite_client: TestClient, email: str) -> None:
+        """Поиск по email без учета регистра."""
+        user_id = create_user(sqlite_client, 'Ivan@Example.com', '+79123456789').json()['id_']
+
+        response = sqlite_client.get(f'/users/by-email/{email}')
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(200))
+        assert_that(actual_or_assertion=response.json()['id_'], matcher=equal_to(user_id))
+
+    @pytest.mark.parametrize('phone', ['+79123456789', '8 912 345-67-89', '9123456789'])
+    def test_get_by_phone(self, sqlite_client: TestClient, phone: str) -> None:
+        """Поиск по телефону в любой распространенной записи."""
+        user_id = create_user(sqlite_client, 'ivan@example.com', '89123456789').json()['id_']
+
+        response = sqlite_client.get(f'/users/by-phone/{phone}')
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(200))
+        assert_that(actual_or_assertion=response.json()['id_'], matcher=equal_to(user_id))
+
+    @pytest.mark.parametrize('path, status_code', [
+        ('/users/by-email/nobody@example.com', 404),
+        ('/users/by-phone/+79000000000', 404),
+        ('/users/by-email/not-an-email', 422),
+        ('/users/by-phone/12', 422),
+    ])
+    def test_lookup_not_found_or_invalid(self, sqlite_client: TestClient, path: str, status_code: int) -> None:
+        """Неизвестный контакт — 404, некорректный — 422."""
+        create_user(sqlite_client, 'ivan@example.com', '+79123456789')
+
+        assert_that(actual_or_assertion=sqlite_client.get(path).status_code, matcher=equal_to(status_code))
+
+    @pytest.mark.parametrize('email, phone', [
+        ('IVAN@example.com', '+79000000000'),
+        ('other@example.com', '8 (912) 345-67-89'),
+    ])
+    def test_duplicate_contacts_on_create(self, sqlite_client: TestClient, email: str, phone: str) -> None:
+        """Занятый email или телефон в другой записи — 409, а не 500."""
+        create_user(sqlite_client, 'ivan@example.com', '+79123456789')
+
+        response = create_user(sqlite_client, email, phone)
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(409))
+        assert_that(actual_or_assertion=len(sqlite_client.get('/users').json()), matcher=equal_to(1))
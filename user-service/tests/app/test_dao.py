@@ -0,0 +1,83 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from hamcrest import assert_that, equal_to, has_length, not_none, starts_with
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, \
+    create_async_engine
+
+from app.database.dao import UserDAO
+from app.database.models import BaseModel
+from app.schemas import UserSchema
+
+
+@asynccontextmanager
+async def sqlite_session():
+    """Сессия с пустой базой SQLite в памяти и список выполненных запросов."""
+    engine = create_async_engine('sqlite+aiosqlite:///:memory:')
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        'before_cursor_execute',
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    async with async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)() as session:
+        yield session, statements
+    await engine.dispose()
+
+
+class TestUserDAO:
+    @pytest.mark.asyncio
+    async def test_create_user_single_statement(self) -> None:
+        """Создание пользователя — один INSERT ... RETURNING без SELECT после commit."""
+        async with sqlite_session() as (session, statements):
+            user = await UserDAO(session).create_user('Иван', 'Петров', None, 'ivan@example.com', '+79123456789')
+
+            assert_that(actual_or_assertion=statements, matcher=has_length(1))
+            assert_that(actual_or_assertion=statements[0], matcher=starts_with('INSERT'))
+            assert_that(actual_or_assertion=user.id_, matcher=not_none())
+            assert_that(actual_or_assertion=user.created_to, matcher=not_none())
+
+    @pytest.mark.asyncio
+    async def test_update_user_single_statement(self) -> None:
+        """Обновление пользователя — один UPDATE ... RETURNING без SELECT до и после."""
+        async with sqlite_session() as (session, statements):
+            dao = UserDAO(session)
+            user = await dao.create_user('Иван', 'Петров', None, 'ivan@example.com', '+79123456789')
+            statements.clear()
+
+            updated = await dao.update_user(user.id_, first_name='Пётр', car_info='Lada Vesta')
+
+            assert_that(actual_or_assertion=statements, matcher=has_length(1))
+            assert_that(actual_or_assertion=statements[0], matcher=starts_with('UPDATE'))
+            assert_that(actual_or_assertion=updated.first_name, matcher=equal_to('Пётр'))
+            assert_that(actual_or_assertion=updated.car_info, matcher=equal_to('Lada Vesta'))
+            assert_that(actual_or_assertion=updated.last_name, matcher=equal_to('Петров'))
+
+    @pytest.mark.asyncio
+    async def test_update_missing_user(self) -> None:
+        """Обновление несуществующего пользователя возвращает None."""
+        async with sqlite_session() as (session, _):
+            assert_that(
+                actual_or_assertion=await UserDAO(session).update_user(1, first_name='Пётр'),
+                matcher=equal_to(None),
+            )
+
+    @pytest.mark.asyncio
+    async def test_list_rows_match_response_schema(self) -> None:
+        """Строки USER_LIST_COLUMNS сериализуются той же схемой, что и UserModel."""
+        async with sqlite_session() as (session, _):
+            dao = UserDAO(session)
+            user = await dao.create_user('Иван', 'Петров', None, 'ivan@example.com', '+79123456789', 10)
+            await dao.update_user(user.id_, car_info='Lada Vesta')
+
+            rows = await dao.get_users()
+
+            assert_that(actual_or_assertion=rows, matcher=has_length(1))
+            assert_that(
+                actual_or_assertion=UserSchema.model_validate(rows[0]),
+                matcher=equal_to(UserSchema.model_validate(await dao.get_user(user.id_))),
+            )
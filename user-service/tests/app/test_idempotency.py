@@ -0,0 +1,19 @@
+from hamcrest import assert_that, is_, is_not
+
+from app.database_config import engine, idempotency_engine, \
+    idempotency_session_maker
+from app.idempotency import IdempotencyMiddleware
+from app.main import app
+
+
+class TestIdempotencyPool:
+    def test_middleware_uses_separate_pool(self) -> None:
+        """IdempotencyMiddleware держит соединения из отдельного пула,
+        чтобы запросы с ключами не занимали пул обработчиков."""
+        middleware = next(m for m in app.user_middleware if m.cls is IdempotencyMiddleware)
+
+        assert_that(
+            actual_or_assertion=middleware.kwargs['session_maker'],
+            matcher=is_(idempotency_session_maker),
+        )
+        assert_that(actual_or_assertion=idempotency_engine, matcher=is_not(engine))
@@ -0,0 +1,43 @@
+import pytest
+from hamcrest import assert_that, equal_to
+
+from app.normalization import normalize_email, normalize_phone
+
+
+class TestNormalization:
+    @pytest.mark.parametrize('phone', [
+        '+7 (912) 345-67-89',
+        '8 912 345 67 89',
+        '79123456789',
+        '9123456789',
+        '0079123456789',
+    ])
+    def test_phone_to_e164(self, phone: str) -> None:
+        """Распространенные записи номера приводятся к E.164.
+
+        Args:
+            phone: Номер телефона в исходной записи
+        """
+        assert_that(
+            actual_or_assertion=normalize_phone(phone),
+            matcher=equal_to('+79123456789'),
+        )
+
+    @pytest.mark.parametrize('phone', ['12', 'abc', '+7 912 345-67-8a', '+1234567890123456'])
+    def test_invalid_phone(self, phone: str) -> None:
+        """Строки, не являющиеся номером, отклоняются.
+
+        Args:
+            phone: Некорректный номер
+        """
+        with pytest.raises(ValueError):
+            normalize_phone(phone)
+
+    def test_email(self) -> None:
+        """Email приводится к нижнему регистру без пробелов по краям."""
+        assert_that(
+            actual_or_assertion=normalize_email(' Ivan.Petrov@Mail.RU '),
+            matcher=equal_to('ivan.petrov@mail.ru'),
+        )
+        with pytest.raises(ValueError):
+            normalize_email('ivan.petrov')
@@ -0,0 +1,211 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from hamcrest import assert_that, equal_to, has_entries, starts_with
+from sqlalchemy.exc import OperationalError
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from app import api, read_replica
+from app.read_replica import PRIMARY_COOKIE, ReadSessionRouter, \
+    ReadYourWritesMiddleware, pinned_to_primary
+
+
+class FakeSession:
+    """Сессия, соединение которой открывается или завершается ошибкой."""
+
+    def __init__(self, name: str, fails: bool = False):
+        self.name = name
+        self.fails = fails
+        self.connects = 0
+        self.closed = False
+
+    async def connection(self) -> None:
+        self.connects += 1
+        if self.fails:
+            raise OperationalError('SELECT 1', {}, OSError('connection refused'))
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def __aenter__(self) -> 'FakeSession':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+class FakeSessionMaker:
+    """Фабрика, запоминающая выданные сессии."""
+
+    def __init__(self, name: str, fails: bool = False):
+        self.name = name
+        self.fails = fails
+        self.sessions = []
+
+    def __call__(self) -> FakeSession:
+        session = FakeSession(self.name, self.fails)
+        self.sessions.append(session)
+        return session
+
+
+def make_request(cookie: str | None = None, query: str = '') -> Request:
+    """Запрос GET /users с cookie db_primary_until."""
+    headers = [(b'cookie', f'{PRIMARY_COOKIE}={cookie}'.encode())] if cookie is not None else []
+    return Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': '/users',
+        'query_string': query.encode(),
+        'headers': headers,
+    })
+
+
+async def status_endpoint(request: Request) -> Response:
+    return Response(status_code=int(request.query_params.get('status', 200)))
+
+
+@pytest.fixture
+def rw_client() -> TestClient:
+    """Клиент приложения с ReadYourWritesMiddleware и окном 5 секунд."""
+    app = Starlette(routes=[
+        Route('/users', status_endpoint, methods=['GET', 'POST']),
+        Route('/users/{user_id}', status_endpoint, methods=['PATCH']),
+    ])
+    return TestClient(ReadYourWritesMiddleware(app, window=5.0))
+
+
+class TestPinnedToPrimary:
+    def test_future_cookie(self) -> None:
+        """Cookie с моментом в будущем направляет чтения на основной сервер."""
+        assert_that(
+            actual_or_assertion=pinned_to_primary(make_request(str(time.time() + 5))),
+            matcher=equal_to(True),
+        )
+
+    @pytest.mark.parametrize('cookie', [None, '', '0', str(time.time() - 5), 'abc', '1e3x'])
+    def test_missing_expired_or_invalid_cookie(self, cookie: str | None) -> None:
+        """Без cookie, с истекшей или некорректной cookie читается реплика."""
+        assert_that(
+            actual_or_assertion=pinned_to_primary(make_request(cookie)),
+            matcher=equal_to(False),
+        )
+
+
+class TestReadYourWritesMiddleware:
+    def test_cookie_on_successful_write(self, rw_client: TestClient) -> None:
+        """Успешное изменение ставит cookie на ресурс запроса на window секунд."""
+        response = rw_client.patch('/users/1')
+
+        cookie = response.headers['set-cookie']
+        assert_that(actual_or_assertion=cookie, matcher=starts_with(f'{PRIMARY_COOKIE}='))
+        assert_that(actual_or_assertion='Path=/users;' in cookie, matcher=equal_to(True))
+        assert_that(actual_or_assertion='Max-Age=5;' in cookie, matcher=equal_to(True))
+        until = float(cookie.split(';')[0].split('=')[1])
+        assert_that(actual_or_assertion=0 < until - time.time() <= 5, matcher=equal_to(True))
+
+    @pytest.mark.parametrize('method, status_code', [
+        ('get', 200),
+        ('post', 400),
+        ('post', 422),
+        ('post', 500),
+    ])
+    def test_no_cookie(self, rw_client: TestClient, method: str, status_code: int) -> None:
+        """Чтения и неуспешные изменения cookie не ставят."""
+        response = getattr(rw_client, method)('/users', params={'status': status_code})
+
+        assert_that(actual_or_assertion=response.status_code, matcher=equal_to(status_code))
+        assert_that(actual_or_assertion='set-cookie' in response.headers, matcher=equal_to(False))
+
+    def test_disabled_window(self) -> None:
+        """С window = 0 cookie не ставится."""
+        app = Starlette(routes=[Route('/users', status_endpoint, methods=['POST'])])
+        response = TestClient(ReadYourWritesMiddleware(app, window=0)).post('/users')
+
+        assert_that(actual_or_assertion='set-cookie' in response.headers, matcher=equal_to(False))
+
+
+class TestReadSessionRouter:
+    @pytest.mark.asyncio
+    async def test_without_replica(self) -> None:
+        """Без реплики сессии открываются на основном сервере."""
+        router = ReadSessionRouter(FakeSessionMaker('primary'), None)
+
+        session = await router.session()
+
+        assert_that(actual_or_assertion=session.name, matcher=equal_to('primary'))
+        assert_that(
+            actual_or_assertion=router.stats(),
+            matcher=has_entries({'configured': False, 'available': False, 'fallbacks': 0}),
+        )
+
+    @pytest.mark.asyncio
+    async def test_replica_and_pinned(self) -> None:
+        """Чтения идут на реплику, закрепленные за клиентом — на основной сервер."""
+        replica = FakeSessionMaker('replica')
+        router = ReadSessionRouter(FakeSessionMaker('primary'), replica)
+
+        assert_that(actual_or_assertion=(await router.session()).name, matcher=equal_to('replica'))
+        assert_that(actual_or_assertion=(await router.session(pinned=True)).name, matcher=equal_to('primary'))
+        assert_that(actual_or_assertion=len(replica.sessions), matcher=equal_to(1))
+
+    @pytest.mark.asyncio
+    async def test_fallback_and_backoff(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """При ошибке соединения чтение идет на основной сервер, а реплика
+        не проверяется retry_interval секунд."""
+        now = 1000.0
+        monkeypatch.setattr(read_replica, 'time', SimpleNamespace(monotonic=lambda: now, time=time.time))
+        replica = FakeSessionMaker('replica', fails=True)
+        router = ReadSessionRouter(FakeSessionMaker('primary'), replica, retry_interval=30.0)
+
+        session = await router.session()
+
+        assert_that(actual_or_assertion=session.name, matcher=equal_to('primary'))
+        assert_that(actual_or_assertion=replica.sessions[0].closed, matcher=equal_to(True))
+        assert_that(
+            actual_or_assertion=router.stats(),
+            matcher=has_entries({'configured': True, 'available': False, 'fallbacks': 1}),
+        )
+
+        now += 29.0
+        assert_that(actual_or_assertion=(await router.session()).name, matcher=equal_to('primary'))
+        assert_that(actual_or_assertion=len(replica.sessions), matcher=equal_to(1))
+
+        now += 1.0
+        replica.fails = False
+        assert_that(actual_or_assertion=(await router.session()).name, matcher=equal_to('replica'))
+        assert_that(actual_or_assertion=router.stats()['fallbacks'], matcher=equal_to(1))
+
+
+class TestUserListSession:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('query, cookie, pinned', [
+        ('', None, False),
+        ('ids=1,2', None, True),
+        ('', str(time.time() + 5), True),
+    ])
+    async def test_batch_reads_from_primary(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        query: str,
+        cookie: str | None,
+        pinned: bool
+    ) -> None:
+        """GET /users?ids= читается с основного сервера даже без cookie:
+        так order-service видит только что созданного пользователя."""
+        calls = []
+
+        async def session(pinned: bool = False) -> FakeSession:
+            calls.append(pinned)
+            return FakeSession('primary' if pinned else 'replica')
+
+        monkeypatch.setattr(api.read_session_router, 'session', session)
+
+        async for _ in api.get_user_list_db(make_request(cookie, query)):
+            pass
+
+        assert_that(actual_or_assertion=calls, matcher=equal_to([pinned]))
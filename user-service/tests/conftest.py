@@ -1,6 +1,21 @@
+import os
+
+# Соединения пула привязаны к циклу событий, а TestClient запускает свой,
+# поэтому в тестах каждая сессия открывает отдельное соединение
+os.environ.setdefault('USER_DB_NULL_POOL', 'true')
+
+import asyncio
+from typing import Iterator
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, \
+    async_sessionmaker, create_async_engine
 
+from app.api import get_read_user_dao, get_user_dao, get_user_list_dao
+from app.database.dao import UserDAO
+from app.database.models import BaseModel
 from app.main import app
 
 
@@ -12,3 +27,29 @@ def http_client() -> TestClient:
         TestClient: Клиент для тестирования FastAPI приложений.
     """
     return TestClient(app)
+
+
+async def create_tables(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+
+@pytest.fixture
+def sqlite_client(tmp_path) -> Iterator[TestClient]:
+    """Тестовый клиент, UserDAO которого работает с пустой базой SQLite.
+
+    Returns:
+        TestClient: Клиент для тестирования FastAPI приложений.
+    """
+    engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "users.db"}', poolclass=NullPool)
+    asyncio.run(create_tables(engine))
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_sqlite_user_dao() -> UserDAO:
+        async with session_maker() as session:
+            yield UserDAO(session)
+
+    for dependency in (get_user_dao, get_read_user_dao, get_user_list_dao):
+        app.dependency_overrides[dependency] = get_sqlite_user_dao
+    yield TestClient(app)
+    app.dependency_overrides.clear()